@@ -11,6 +11,8 @@ from alembic import context
 # Import your models
 from models.base import Base
 from models.reading import Reading
+from models.rollup import ReadingRollup
+from models.device_latest import DeviceLatest
 from models.device import Device
 from models.user import User
 
@@ -0,0 +1,40 @@
+"""Add readings natural key
+
+Revision ID: 3e1f6c2a9b47
+Revises: 7a24577ad39b
+Create Date: 2026-10-15 09:12:31.418702
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e1f6c2a9b47'
+down_revision: Union[str, None] = '7a24577ad39b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Remove existing duplicates, keeping the first row written for each natural key
+    op.execute(
+        """
+        DELETE FROM readings a
+        USING readings b
+        WHERE a.device_id = b.device_id
+          AND a.reading_type = b.reading_type
+          AND a.timestamp = b.timestamp
+          AND a.id > b.id
+        """
+    )
+    op.create_unique_constraint(
+        'uq_readings_device_type_timestamp',
+        'readings',
+        ['device_id', 'reading_type', 'timestamp'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_readings_device_type_timestamp', 'readings', type_='unique')
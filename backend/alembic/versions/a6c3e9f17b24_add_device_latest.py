@@ -0,0 +1,45 @@
+"""Add device latest
+
+Revision ID: a6c3e9f17b24
+Revises: f2b8d4e6a917
+Create Date: 2026-10-15 22:31:48.265904
+
+Backfilled from readings; last_seen starts out as the latest reading's timestamp.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c3e9f17b24'
+down_revision: Union[str, None] = 'f2b8d4e6a917'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('device_latest',
+    sa.Column('device_id', sa.Integer(), nullable=False),
+    sa.Column('reading_type', postgresql.ENUM('TEMPERATURE', 'HUMIDITY', name='readingtype', create_type=False), nullable=False),
+    sa.Column('value', sa.Float(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('last_seen', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['device_id'], ['devices.id'], ),
+    sa.PrimaryKeyConstraint('device_id', 'reading_type')
+    )
+    op.execute("""
+        INSERT INTO device_latest (device_id, reading_type, value, "timestamp", last_seen)
+        SELECT DISTINCT ON (device_id, reading_type)
+            device_id, reading_type, value, "timestamp", "timestamp"
+        FROM readings
+        WHERE value <> 'NaN'  -- PostgreSQL treats NaN as equal to itself
+        ORDER BY device_id, reading_type, "timestamp" DESC
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('device_latest')
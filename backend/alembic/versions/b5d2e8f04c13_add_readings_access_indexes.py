@@ -0,0 +1,49 @@
+"""Add readings access indexes
+
+Revision ID: b5d2e8f04c13
+Revises: 3e1f6c2a9b47
+Create Date: 2026-10-15 10:41:07.205539
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d2e8f04c13'
+down_revision: Union[str, None] = '3e1f6c2a9b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The unique index replaces the natural key constraint and also covers value
+    op.create_index(
+        'ix_readings_device_type_timestamp',
+        'readings',
+        ['device_id', 'reading_type', 'timestamp'],
+        unique=True,
+        postgresql_include=['value'],
+    )
+    op.drop_constraint('uq_readings_device_type_timestamp', 'readings', type_='unique')
+    op.create_index(
+        'ix_readings_timestamp_brin',
+        'readings',
+        ['timestamp'],
+        unique=False,
+        postgresql_using='brin',
+    )
+    # Redundant with the primary key, and only slows down inserts
+    op.drop_index('ix_readings_id', table_name='readings')
+
+
+def downgrade() -> None:
+    op.create_index('ix_readings_id', 'readings', ['id'], unique=False)
+    op.drop_index('ix_readings_timestamp_brin', table_name='readings')
+    op.create_unique_constraint(
+        'uq_readings_device_type_timestamp',
+        'readings',
+        ['device_id', 'reading_type', 'timestamp'],
+    )
+    op.drop_index('ix_readings_device_type_timestamp', table_name='readings')
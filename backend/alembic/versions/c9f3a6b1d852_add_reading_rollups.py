@@ -0,0 +1,45 @@
+"""Add reading rollups
+
+Revision ID: c9f3a6b1d852
+Revises: e4a7c1d93f26
+Create Date: 2026-10-15 13:20:16.094417
+
+Existing readings are not rolled up here; backfill with scripts/rebuild_rollups.py
+before enabling READINGS_USE_ROLLUPS.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9f3a6b1d852'
+down_revision: Union[str, None] = 'e4a7c1d93f26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('reading_rollups',
+    sa.Column('resolution', sa.Integer(), nullable=False),
+    sa.Column('device_id', sa.Integer(), nullable=False),
+    sa.Column('reading_type', postgresql.ENUM('TEMPERATURE', 'HUMIDITY', name='readingtype', create_type=False), nullable=False),
+    sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('min_value', sa.Float(), nullable=False),
+    sa.Column('max_value', sa.Float(), nullable=False),
+    sa.Column('sum_value', sa.Float(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('first_timestamp', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('first_value', sa.Float(), nullable=False),
+    sa.Column('last_timestamp', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('last_value', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['device_id'], ['devices.id'], ),
+    sa.PrimaryKeyConstraint('resolution', 'device_id', 'reading_type', 'bucket')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('reading_rollups')
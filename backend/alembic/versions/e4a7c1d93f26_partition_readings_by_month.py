@@ -0,0 +1,111 @@
+"""Partition readings by month
+
+Revision ID: e4a7c1d93f26
+Revises: b5d2e8f04c13
+Create Date: 2026-10-15 11:58:44.613027
+
+Converts `readings` into a table range partitioned on timestamp, one partition per
+month, and copies the existing rows across. Copying runs inside the migration
+transaction; on large tables schedule it in a maintenance window. Further
+partitions are created ahead of time by the ingestion service (db.partitions).
+Rows outside every monthly partition go to the DEFAULT partition readings_default
+instead of failing the insert.
+
+"""
+from datetime import UTC, datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7c1d93f26'
+down_revision: Union[str, None] = 'b5d2e8f04c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+
+def _month_start(moment: datetime) -> datetime:
+    moment = moment.astimezone(UTC) if moment.tzinfo else moment.replace(tzinfo=UTC)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(start: datetime) -> datetime:
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+def _create_indexes(table: str) -> None:
+    op.create_index(
+        'ix_readings_device_type_timestamp',
+        table,
+        ['device_id', 'reading_type', 'timestamp'],
+        unique=True,
+        postgresql_include=['value'],
+    )
+    op.create_index(
+        'ix_readings_timestamp_brin',
+        table,
+        ['timestamp'],
+        unique=False,
+        postgresql_using='brin',
+    )
+
+
+def _move_to_new_table(partitioned: bool) -> None:
+    """Rename readings aside, create the new table, copy the rows and drop the old one."""
+    op.rename_table('readings', 'readings_old')
+    op.drop_index('ix_readings_device_type_timestamp', table_name='readings_old')
+    op.drop_index('ix_readings_timestamp_brin', table_name='readings_old')
+    op.execute('ALTER TABLE readings_old RENAME CONSTRAINT readings_pkey TO readings_old_pkey')
+    op.execute('ALTER SEQUENCE readings_id_seq OWNED BY NONE')
+
+    primary_key = 'PRIMARY KEY (id, "timestamp")' if partitioned else 'PRIMARY KEY (id)'
+    partition_clause = ' PARTITION BY RANGE ("timestamp")' if partitioned else ''
+    op.execute(f"""
+        CREATE TABLE readings (
+            id integer NOT NULL DEFAULT nextval('readings_id_seq'),
+            device_id integer NOT NULL REFERENCES devices (id),
+            reading_type readingtype NOT NULL,
+            value double precision NOT NULL,
+            "timestamp" timestamp with time zone NOT NULL DEFAULT now(),
+            CONSTRAINT readings_pkey {primary_key}
+        ){partition_clause}
+    """)
+    op.execute('ALTER SEQUENCE readings_id_seq OWNED BY readings.id')
+
+    if partitioned:
+        oldest = op.get_bind().execute(sa.text('SELECT min("timestamp") FROM readings_old')).scalar()
+        now = datetime.now(UTC)
+        start = _month_start(oldest or now)
+        last = _month_start(now)
+        for _ in range(MONTHS_AHEAD):
+            last = _next_month(last)
+        while start <= last:
+            end = _next_month(start)
+            op.execute(
+                f'CREATE TABLE "readings_p{start:%Y%m%d}" PARTITION OF readings '
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+            start = end
+        op.execute('CREATE TABLE readings_default PARTITION OF readings DEFAULT')
+
+    op.execute("""
+        INSERT INTO readings (id, device_id, reading_type, value, "timestamp")
+        SELECT id, device_id, reading_type, value, "timestamp" FROM readings_old
+    """)
+    op.drop_table('readings_old')
+    _create_indexes('readings')
+
+
+def upgrade() -> None:
+    _move_to_new_table(partitioned=True)
+
+
+def downgrade() -> None:
+    # Partitions are dropped together with the partitioned table
+    _move_to_new_table(partitioned=False)
@@ -0,0 +1,31 @@
+"""Add readings keyset index
+
+Revision ID: f2b8d4e6a917
+Revises: c9f3a6b1d852
+Create Date: 2026-10-15 21:52:31.480215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b8d4e6a917'
+down_revision: Union[str, None] = 'c9f3a6b1d852'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Created on the partitioned parent, so every partition gets it
+    op.create_index(
+        'ix_readings_type_timestamp_id',
+        'readings',
+        ['reading_type', 'timestamp', 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_readings_type_timestamp_id', table_name='readings')
@@ -0,0 +1,167 @@
+"""
+Downsampling benchmark.
+
+Reduces a synthetic series of one million irregularly spaced readings, with a few
+short spikes, to `--points` points with window averaging, LTTB and the min/max
+envelope. Reports the time taken by each algorithm and how many of the spikes
+survive in its output.
+
+With `--database`, the series is also stored in a scratch SQLite database (or the
+database at `--database-url`) and the full `get_by_device` path is timed for each
+algorithm: the query, the fetch into arrays and the reduction.
+
+Usage:
+    PYTHONPATH=src python -m scripts.bench_downsampling [--readings 1000000] [--points 500]
+        [--repeat 5] [--database] [--database-url URL] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from datetime import UTC, datetime
+
+import numpy as np
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import models
+from api_service.core.downsampling import DownsamplingAlgorithm, lttb, minmax
+from api_service.crud.crud_reading import reading as crud_reading
+from models.base import Base
+from models.reading import ReadingType
+
+
+def make_series(count: int, spikes: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(42)
+    x = np.cumsum(rng.uniform(5, 55, count))
+    y = 20 + 5 * np.sin(x / 86400 * 2 * np.pi) + rng.normal(0, 0.2, count)
+    spike_at = np.sort(rng.choice(count, spikes, replace=False))
+    y[spike_at] += rng.choice([-30.0, 30.0], spikes)
+    return x, y, spike_at
+
+
+def average(x: np.ndarray, y: np.ndarray, n_windows: int) -> tuple[np.ndarray, np.ndarray]:
+    """Equal-width window means, as returned for `downsample=average`."""
+    window = np.minimum(((x - x[0]) * (n_windows / (x[-1] - x[0]))).astype(np.int64), n_windows - 1)
+    counts = np.bincount(window, minlength=n_windows)
+    sums = np.bincount(window, weights=y, minlength=n_windows)
+    occupied = counts > 0
+    return np.flatnonzero(occupied), sums[occupied] / counts[occupied]
+
+
+def spikes_kept(values: np.ndarray, y: np.ndarray, spike_at: np.ndarray) -> int:
+    """Count spikes whose value (within 1 unit) appears in the output."""
+    return sum(bool(np.any(np.abs(values - y[i]) < 1.0)) for i in spike_at)
+
+
+def timed(func, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+async def run_database(args, x: np.ndarray, y: np.ndarray) -> dict:
+    """Time `get_by_device` for each algorithm on the series stored in a database."""
+    engine = create_async_engine(args.database_url)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    results = {}
+    try:
+        async with session_factory() as session:
+            device = models.Device(device_id="bench-downsampling", is_active=True)
+            session.add(device)
+            await session.commit()
+            rows = [
+                {
+                    "device_id": device.id,
+                    "reading_type": ReadingType.TEMPERATURE,
+                    "value": float(value),
+                    "timestamp": datetime.fromtimestamp(1_700_000_000 + float(at), UTC),
+                }
+                for at, value in zip(x, y)
+            ]
+            for start in range(0, len(rows), 10_000):
+                await session.execute(insert(models.Reading), rows[start:start + 10_000])
+            await session.commit()
+
+            for algorithm in DownsamplingAlgorithm:
+                best = float("inf")
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    points = await crud_reading.get_by_device(
+                        session,
+                        device_id=device.id,
+                        reading_type=ReadingType.TEMPERATURE,
+                        threshold=args.points,
+                        algorithm=algorithm,
+                    )
+                    best = min(best, time.perf_counter() - started)
+                results[f"db_{algorithm.value}_ms"] = round(best * 1000, 2)
+                results[f"db_{algorithm.value}_points"] = len(points)
+
+            await session.execute(delete(models.Reading).where(models.Reading.device_id == device.id))
+            await session.execute(delete(models.Device).where(models.Device.id == device.id))
+            await session.commit()
+    finally:
+        await engine.dispose()
+    return results
+
+
+def run(args) -> dict:
+    x, y, spike_at = make_series(args.readings, args.spikes)
+
+    avg_time, (_, avg_values) = timed(lambda: average(x, y, args.points), args.repeat)
+    lttb_time, lttb_idx = timed(lambda: lttb(x, y, args.points), args.repeat)
+    minmax_time, minmax_idx = timed(lambda: minmax(x, y, args.points), args.repeat)
+
+    results = {
+        "readings": args.readings,
+        "points": args.points,
+        "spikes": args.spikes,
+        "average_ms": round(avg_time * 1000, 2),
+        "average_points": len(avg_values),
+        "average_spikes_kept": spikes_kept(avg_values, y, spike_at),
+        "lttb_ms": round(lttb_time * 1000, 2),
+        "lttb_points": len(lttb_idx),
+        "lttb_spikes_kept": spikes_kept(y[lttb_idx], y, spike_at),
+        "minmax_ms": round(minmax_time * 1000, 2),
+        "minmax_points": len(minmax_idx),
+        "minmax_spikes_kept": spikes_kept(y[minmax_idx], y, spike_at),
+    }
+    if args.database:
+        results.update(asyncio.run(run_database(args, x, y)))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readings", type=int, default=1_000_000)
+    parser.add_argument("--points", type=int, default=500)
+    parser.add_argument("--spikes", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per algorithm; the best time is reported")
+    parser.add_argument("--database", action="store_true", help="Also time get_by_device against a database")
+    parser.add_argument("--database-url", default=None, help="Async SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--json", action="store_true", help="Print the results as a single JSON object")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.database_url is None:
+            args.database_url = f"sqlite+aiosqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+        results = run(args)
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for key, value in results.items():
+            print(f"{key:<22} {value}")
+
+
+if __name__ == "__main__":
+    main()
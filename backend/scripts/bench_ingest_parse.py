@@ -0,0 +1,96 @@
+"""
+Micro-benchmark of the ingestion per-message hot path.
+
+Compares the previous per-message path (regex plus substring scan, payload decoding,
+a dict, a `ReadingCreate` model and an ORM `Reading`) with the current one
+(`MQTTClientService.parse_message` producing a plain tuple) and reports messages
+per second on a single core. No broker or database is needed.
+
+Usage:
+    PYTHONPATH=src python -m scripts.bench_ingest_parse [--messages 200000]
+"""
+
+import argparse
+import random
+import re
+import time
+from datetime import UTC, datetime
+
+from aiomqtt import Topic
+
+from config import settings
+from ingestion_service.local_broker import LocalMessage
+from ingestion_service.mqtt_client import MQTTClientService
+from models import Reading
+from schemas import ReadingCreate
+
+LEGACY_PATTERN = r"harvco/harvco-temp-sensor-([^/]+)/sensor/(?:temperature|humidity)/state"
+
+
+def legacy_parse(message, device_pks: dict[str, int]) -> Reading:
+    """The per-message path as it was before the tuple fast path."""
+    topic = message.topic.value
+    payload = message.payload.decode()
+    device_id = re.match(LEGACY_PATTERN, topic).group(1)
+    reading_type = "temperature" if "temperature" in topic else "humidity"
+    value = None if payload.lower() == "nan" else float(payload)
+    if value is None or value != value:
+        return None
+    reading_data = ReadingCreate(**{
+        "device_id": device_id,
+        "reading_type": reading_type,
+        "value": value,
+        "timestamp": datetime.now(UTC),
+    })
+    return Reading(
+        device_id=device_pks[reading_data.device_id],
+        reading_type=reading_data.reading_type,
+        value=reading_data.value,
+        timestamp=reading_data.timestamp,
+    )
+
+
+def fast_parse(service: MQTTClientService, message, device_pks: dict[str, int]) -> tuple:
+    """The current per-message path: parse to a tuple and resolve the device key."""
+    device_id, reading_type, value, timestamp = service.parse_message(message)
+    return device_pks[device_id], reading_type, value, timestamp
+
+
+def make_messages(count: int, devices: int) -> list[LocalMessage]:
+    rng = random.Random(42)
+    messages = []
+    for _ in range(count):
+        device = f"{rng.randrange(devices):06x}"
+        reading_type = rng.choice(("temperature", "humidity"))
+        topic = f"harvco/harvco-temp-sensor-{device}/sensor/{reading_type}/state"
+        messages.append(LocalMessage(Topic(topic), f"{rng.uniform(0, 100):.1f}".encode()))
+    return messages
+
+
+def measure(label: str, fn, messages: list) -> float:
+    started = time.perf_counter()
+    for message in messages:
+        fn(message)
+    elapsed = time.perf_counter() - started
+    rate = len(messages) / elapsed
+    print(f"{label:<8} {rate:>12,.0f} msg/s  ({elapsed * 1e6 / len(messages):.2f} us/msg)")
+    return rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--devices", type=int, default=100)
+    args = parser.parse_args()
+
+    messages = make_messages(args.messages, args.devices)
+    device_pks = {f"{i:06x}": i + 1 for i in range(args.devices)}
+    service = MQTTClientService(settings, session_factory=None, writer=None, device_cache=None)
+
+    before = measure("before", lambda m: legacy_parse(m, device_pks), messages)
+    after = measure("after", lambda m: fast_parse(service, m, device_pks), messages)
+    print(f"speedup  {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Script to rebuild the reading rollups from raw readings.
+
+Recomputes whole UTC days; run it once after adding the rollup tables, or to repair
+a range after readings were modified outside the ingestion path.
+
+Usage:
+    python -m scripts.rebuild_rollups [--start 2024-01-01] [--end 2024-02-01]
+"""
+
+import argparse
+import asyncio
+from datetime import datetime
+
+from db import AsyncSessionFactory
+from db.rollups import rebuild_rollups
+
+
+async def rebuild(start, end) -> None:
+    async with AsyncSessionFactory() as session:
+        total = await rebuild_rollups(session, start=start, end=end)
+    print(f"Rebuilt rollups from {total} readings")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild reading rollups")
+    parser.add_argument("--start", type=datetime.fromisoformat, default=None, help="Start date (UTC)")
+    parser.add_argument("--end", type=datetime.fromisoformat, default=None, help="End date (UTC)")
+    args = parser.parse_args()
+    asyncio.run(rebuild(args.start, args.end))
@@ -16,8 +16,9 @@ from api_service.api.deps import (
     PaginationParams,
 )
 from api_service.crud import device as crud_device
+from config import settings
 from models.user import User
-from schemas.device import DeviceCreate, DeviceUpdate, DeviceOut
+from schemas.device import DeviceCreate, DeviceUpdate, DeviceOut, DeviceSummary
 
 router = APIRouter()
 
@@ -84,6 +85,29 @@ async def read_devices(
     return devices
 
 
+@router.get("/summary", response_model=List[DeviceSummary])
+async def read_device_summaries(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_active_user)],
+) -> List[DeviceSummary]:
+    """
+    Retrieve the dashboard summary of every device of the current user.
+
+    Each device carries its latest temperature and humidity and their min, max
+    and average over the last 24 hours, all computed by a single query.
+
+    Args:
+        db: Database session
+        current_user: Current authenticated user
+
+    Returns:
+        List[DeviceSummary]: Device summaries
+    """
+    return await crud_device.get_summaries(
+        db, owner_id=current_user.id, use_latest_table=settings.READINGS_USE_LATEST
+    )
+
+
 @router.get("/{device_id}", response_model=DeviceOut)
 async def read_device(
     device_id: int,
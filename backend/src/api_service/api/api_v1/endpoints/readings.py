@@ -4,67 +4,57 @@ Reading endpoints for sensor reading retrieval.
 This module provides endpoints for retrieving sensor readings.
 """
 
-from typing import List, Annotated, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from models.device import Device
-from models.reading import Reading
+from typing import List, Annotated, Optional, Union
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from config import settings
 
 from api_service.api.deps import (
     get_db,
     get_current_active_user,
     get_pagination,
     get_date_range,
+    get_session_factory,
     PaginationParams,
     DateRangeParams,
 )
+from api_service.core.columnar import (
+    ARROW_STREAM,
+    COLUMNAR_JSON,
+    MSGPACK,
+    columnar_response,
+    group_series,
+    negotiate,
+    series_response,
+)
+from api_service.core.downsampling import DownsamplingAlgorithm
+from api_service.core.pagination import decode_cursor, encode_cursor
+from api_service.core.export import MEDIA_TYPES, ExportFormat, encode_export
 from api_service.crud import reading as crud_reading, device as crud_device
 from models.user import User
 from models.reading import ReadingType
-from schemas.reading import ReadingOut, ReadingStatistics
-
-
-async def apply_device_offsets(
-    db: AsyncSession, readings: List[Reading]
-) -> List[Reading]:
-    """Apply device offsets to readings."""
-    # Group readings by device to minimize database queries
-    readings_by_device = {}
-    for reading in readings:
-        if reading.device_id not in readings_by_device:
-            readings_by_device[reading.device_id] = []
-        readings_by_device[reading.device_id].append(reading)
-
-    # Get all needed devices in one query
-    device_ids = list(readings_by_device.keys())
-    devices = await db.execute(select(Device).where(Device.id.in_(device_ids)))
-    devices = {d.id: d for d in devices.scalars().all()}
-
-    # Apply offsets
-    for device_id, device_readings in readings_by_device.items():
-        device = devices.get(device_id)
-        if device:
-            for reading in device_readings:
-                if reading.reading_type == ReadingType.TEMPERATURE:
-                    # Use 0.0 if temperature_offset is None
-                    offset = device.temperature_offset or 0.0
-                    reading.value += offset
-                elif reading.reading_type == ReadingType.HUMIDITY:
-                    # Use 0.0 if humidity_offset is None
-                    offset = device.humidity_offset or 0.0
-                    reading.value += offset
-
-    # Apply device offsets before returning
-    readings = await apply_device_offsets(db, readings)
-    return readings
+from schemas.reading import (
+    ReadingOut,
+    ReadingSeriesOut,
+    ReadingSeriesRequest,
+    ReadingStatistics,
+)
 
 
 router = APIRouter()
 
 
-@router.get("", response_model=List[ReadingOut])
+@router.get(
+    "",
+    response_model=List[ReadingOut],
+    responses={
+        200: {"content": {COLUMNAR_JSON: {}, MSGPACK: {}, ARROW_STREAM: {}}},
+        406: {"description": "Arrow requested but pyarrow is not installed"},
+    },
+)
 async def read_readings(
+    response: Response,
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[User, Depends(get_current_active_user)],
     pagination: Annotated[PaginationParams, Depends(get_pagination)],
@@ -73,23 +63,51 @@ async def read_readings(
     reading_type: Optional[ReadingType] = Query(
         None, description="Filter by reading type"
     ),
-) -> List[ReadingOut]:
+    max_points: int = Query(
+        500, ge=1, le=10000, description="Maximum points per reading type for a device series"
+    ),
+    downsample: DownsamplingAlgorithm = Query(
+        DownsamplingAlgorithm.AVERAGE,
+        description="How a device series longer than max_points is reduced",
+    ),
+    cursor: Optional[str] = Query(
+        None, description="X-Next-Cursor of the previous page, instead of skip"
+    ),
+    accept: Annotated[Optional[str], Header()] = None,
+) -> Union[List[ReadingOut], Response]:
     """
     Retrieve readings with optional filters.
 
+    Content negotiation: besides the default JSON list of readings, the Accept
+    header can request the columnar layout (one `t`/`v` array pair per device and
+    reading type) as application/vnd.harvco.columnar+json, application/msgpack or
+    application/vnd.apache.arrow.stream.
+
+    Listings without device_id are paged newest first. A full page carries an
+    opaque X-Next-Cursor header; passing it back as `cursor` fetches the next
+    page by keyset, at constant cost however deep. `skip` still works.
+
     Args:
+        response: Response, for the X-Next-Cursor header
         db: Database session
         current_user: Current authenticated user
         pagination: Pagination parameters
         date_range: Date range filter
         device_id: Optional device ID filter
         reading_type: Optional reading type filter
+        max_points: Above this many readings, a device series is averaged into
+            this many time windows per reading type
+        downsample: "average" for window means, "lttb" or "minmax" to keep
+            actual readings, including spikes
+        cursor: Keyset cursor of the previous page of a listing
+        accept: Accept header
 
     Returns:
-        List[ReadingOut]: List of readings
+        Union[List[ReadingOut], Response]: List of readings, or the columnar encoding
 
     Raises:
-        HTTPException: If device_id is provided and user doesn't own the device
+        HTTPException: If device_id is provided and user doesn't own the device,
+            or the cursor is invalid
     """
     if device_id:
         if not await crud_device.is_owner(
@@ -105,20 +123,160 @@ async def read_readings(
             start_date=date_range.start_date,
             end_date=date_range.end_date,
             reading_type=reading_type,
+            threshold=max_points,
+            use_rollups=settings.READINGS_USE_ROLLUPS,
+            algorithm=downsample,
         )
     else:
+        after = None
+        if cursor is not None:
+            try:
+                after = decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+                )
         readings = await crud_reading.get_readings_by_type(
             db,
             reading_type=reading_type,
-            skip=pagination.skip,
+            skip=0 if after else pagination.skip,
             limit=pagination.limit,
             start_date=date_range.start_date,
             end_date=date_range.end_date,
+            after=after,
         )
+        if len(readings) == pagination.limit:
+            response.headers["X-Next-Cursor"] = encode_cursor(
+                readings[-1].timestamp, readings[-1].id
+            )
 
+    media_type = negotiate(accept)
+    if media_type is not None:
+        columnar = columnar_response(readings, media_type)
+        if "X-Next-Cursor" in response.headers:
+            columnar.headers["X-Next-Cursor"] = response.headers["X-Next-Cursor"]
+        return columnar
     return readings
 
 
+@router.post(
+    "/series",
+    response_model=ReadingSeriesOut,
+    responses={
+        200: {"content": {MSGPACK: {}, ARROW_STREAM: {}}},
+        406: {"description": "Arrow requested but pyarrow is not installed"},
+    },
+)
+async def read_series(
+    series_in: ReadingSeriesRequest,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[User, Depends(get_current_active_user)],
+    accept: Annotated[Optional[str], Header()] = None,
+) -> Response:
+    """
+    Retrieve downsampled series for several devices at once.
+
+    All devices are authorized with one query and every series comes from one
+    grouped SQL statement, averaged into at most `max_points` time windows. The
+    response uses the columnar layout, as JSON by default or as MessagePack or
+    Arrow through the Accept header.
+
+    Args:
+        series_in: Devices, reading types, time range and point budget
+        db: Database session
+        current_user: Current authenticated user
+        accept: Accept header
+
+    Returns:
+        Response: One `t`/`v` series per device and reading type
+
+    Raises:
+        HTTPException: If the user doesn't own all of the devices
+    """
+    device_ids = list(dict.fromkeys(series_in.device_ids))
+    owned = await crud_device.get_owned_ids(db, device_ids=device_ids, user_id=current_user.id)
+    if len(owned) != len(device_ids):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Not enough permissions to access devices {sorted(set(device_ids) - owned)}",
+        )
+
+    rows = await crud_reading.get_series(
+        db,
+        device_ids=device_ids,
+        start_date=series_in.start_date,
+        end_date=series_in.end_date,
+        reading_types=series_in.reading_types,
+        max_points=series_in.max_points,
+    )
+    series = group_series(
+        (row.device_id, row.reading_type, float(row.epoch), float(row.value)) for row in rows
+    )
+    return series_response(series, negotiate(accept) or "application/json")
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_readings(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    session_factory: Annotated[async_sessionmaker[AsyncSession], Depends(get_session_factory)],
+    current_user: Annotated[User, Depends(get_current_active_user)],
+    date_range: Annotated[DateRangeParams, Depends(get_date_range)],
+    device_id: int = Query(..., description="Device ID"),
+    reading_type: Optional[ReadingType] = Query(
+        None, description="Filter by reading type"
+    ),
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="ndjson or csv"),
+) -> StreamingResponse:
+    """
+    Stream every raw reading of a device in a date range as NDJSON or CSV.
+
+    Readings are read through a server-side cursor and written out batch by
+    batch, so memory use is constant however long the range is.
+
+    Args:
+        db: Database session, used for the permission check
+        session_factory: Opens the session that outlives the request handler
+            while the response streams
+        current_user: Current authenticated user
+        date_range: Date range filter
+        device_id: Device ID
+        reading_type: Optional reading type filter
+        format: Output format
+
+    Returns:
+        StreamingResponse: Calibrated readings in time order
+
+    Raises:
+        HTTPException: If user doesn't own the device
+    """
+    if not await crud_device.is_owner(db, device_id=device_id, user_id=current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions to access this device",
+        )
+
+    async def content():
+        async with session_factory() as session:
+            batches = crud_reading.stream_by_device(
+                session,
+                device_id=device_id,
+                start_date=date_range.start_date,
+                end_date=date_range.end_date,
+                reading_type=reading_type,
+                batch_size=settings.READINGS_EXPORT_BATCH_SIZE,
+            )
+            async for chunk in encode_export(batches, format):
+                yield chunk
+
+    return StreamingResponse(
+        content(),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="readings-{device_id}.{format.value}"'
+        },
+    )
+
+
 @router.get("/statistics", response_model=ReadingStatistics)
 async def get_reading_statistics(
     db: Annotated[AsyncSession, Depends(get_db)],
@@ -149,33 +307,15 @@ async def get_reading_statistics(
             detail="Not enough permissions to access this device",
         )
 
-    # Get the device to access its offset
-    device = await crud_device.get(db, id=device_id)
-    if not device:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Device not found"
-        )
-
     stats = await crud_reading.get_statistics(
         db,
         device_id=device_id,
         reading_type=reading_type,
         start_date=date_range.start_date,
         end_date=date_range.end_date,
+        use_rollups=settings.READINGS_USE_ROLLUPS,
     )
 
-    # Apply the appropriate offset to all statistics
-    offset = 0.0  # Default to 0.0
-    if device:
-        if reading_type == ReadingType.TEMPERATURE:
-            offset = device.temperature_offset or 0.0
-        else:
-            offset = device.humidity_offset or 0.0
-
-    stats["min"] += offset
-    stats["max"] += offset
-    stats["avg"] += offset
-
     return stats
 
 
@@ -208,7 +348,10 @@ async def get_latest_reading(
         )
 
     reading = await crud_reading.get_latest_by_device(
-        db, device_id=device_id, reading_type=reading_type
+        db,
+        device_id=device_id,
+        reading_type=reading_type,
+        use_latest_table=settings.READINGS_USE_LATEST,
     )
 
     if not reading:
@@ -217,16 +360,6 @@ async def get_latest_reading(
             detail="No readings found for this device",
         )
 
-    # Apply the device offset
-    device = await crud_device.get(db, id=device_id)
-    if device:
-        if reading.reading_type == ReadingType.TEMPERATURE:
-            offset = device.temperature_offset or 0.0
-            reading.value += offset
-        elif reading.reading_type == ReadingType.HUMIDITY:
-            offset = device.humidity_offset or 0.0
-            reading.value += offset
-
     return reading
 
 
@@ -249,27 +382,21 @@ async def get_device_averages(
     Returns:
         List[dict]: List of device averages
     """
-    # First, get all the user's devices
-    devices_query = select(Device).where(Device.owner_id == current_user.id)
-    result = await db.execute(devices_query)
-    user_devices = {device.id: device.device_id for device in result.scalars().all()}
-
     averages = await crud_reading.get_device_averages(
         db,
         reading_type=reading_type,
         start_date=date_range.start_date,
         end_date=date_range.end_date,
+        owner_id=current_user.id,
+        use_rollups=settings.READINGS_USE_ROLLUPS,
     )
 
-    # Filter and format the response
-    filtered_averages = [
+    return [
         {
-            "device_id": user_devices[device_id],  # Use the device_id string
-            "internal_id": device_id,  # Include the internal ID
-            "average": avg,
+            "device_id": row.device_id,
+            "internal_id": row.internal_id,
+            "name": row.name,
+            "average": float(row.average),
         }
-        for device_id, avg in averages
-        if device_id in user_devices
+        for row in averages
     ]
-
-    return filtered_averages
@@ -13,10 +13,10 @@ from datetime import datetime
 
 from fastapi import Depends, HTTPException, status, Query
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 import jwt
 
-from db import get_session
+from db import AsyncSessionFactory, get_session
 from api_service.core import security
 from config import settings
 from api_service.crud.crud_user import user as crud_user
@@ -37,6 +37,16 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async for session in get_session():
         yield session
 
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """
+    Dependency that provides the session factory, for work that outlives the
+    request's session, such as streaming responses.
+
+    Returns:
+        async_sessionmaker[AsyncSession]: Session factory
+    """
+    return AsyncSessionFactory
+
 async def get_current_user(
     db: AsyncSession = Depends(get_db),
     token: str = Depends(oauth2_scheme)
@@ -0,0 +1,152 @@
+"""
+Columnar encodings of reading series for charts.
+
+Instead of one object per reading, each (device, reading type) series is sent as
+parallel arrays of epoch seconds and values:
+
+    {"series": [{"device_id": 1, "reading_type": "temperature", "t": [...], "v": [...]}]}
+
+The layout is built straight from database rows and encoded as JSON or
+MessagePack, or as an Arrow IPC stream holding one long table with `device_id`,
+`reading_type`, `t` and `v` columns. Arrow needs the optional `pyarrow` package.
+"""
+
+import json
+from typing import Iterable, Optional
+
+import msgpack
+import numpy as np
+from fastapi import HTTPException, Response, status
+
+from db.rollups import as_utc
+
+COLUMNAR_JSON = "application/vnd.harvco.columnar+json"
+MSGPACK = "application/msgpack"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+# Also accepted for MessagePack
+_ALIASES = {"application/x-msgpack": MSGPACK}
+_DEFAULT_TYPES = ("application/json", "application/*", "*/*")
+
+
+def negotiate(accept: Optional[str]) -> Optional[str]:
+    """Pick a columnar media type from an Accept header.
+
+    Args:
+        accept (Optional[str]): Accept header value
+
+    Returns:
+        Optional[str]: The preferred columnar media type, or None when the client
+            prefers (or accepts) plain JSON
+    """
+    if not accept:
+        return None
+
+    candidates = []
+    for position, entry in enumerate(accept.split(",")):
+        media_type, *params = (part.strip() for part in entry.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            candidates.append((-quality, position, media_type.lower()))
+
+    for _, _, media_type in sorted(candidates):
+        media_type = _ALIASES.get(media_type, media_type)
+        if media_type in (COLUMNAR_JSON, MSGPACK, ARROW_STREAM):
+            return media_type
+        if media_type in _DEFAULT_TYPES:
+            return None
+    return None
+
+
+def group_series(points: Iterable[tuple]) -> list[dict]:
+    """Group points into per device and reading type series, in point order.
+
+    Args:
+        points: `(device_id, reading_type, epoch_seconds, value)` tuples
+
+    Returns:
+        list[dict]: Series with `t` (epoch seconds) and `v` arrays
+    """
+    series: dict[tuple, dict] = {}
+    for device_id, reading_type, t, v in points:
+        entry = series.get((device_id, reading_type))
+        if entry is None:
+            entry = series[(device_id, reading_type)] = {
+                "device_id": device_id,
+                "reading_type": reading_type.value,
+                "t": [],
+                "v": [],
+            }
+        entry["t"].append(t)
+        entry["v"].append(v)
+    return list(series.values())
+
+
+def to_series(rows: Iterable) -> list[dict]:
+    """Group reading rows into per device and reading type series, in row order.
+
+    Args:
+        rows: Rows or Readings with device_id, reading_type, value and timestamp
+
+    Returns:
+        list[dict]: Series with `t` (epoch seconds) and `v` arrays
+    """
+    return group_series(
+        (row.device_id, row.reading_type, as_utc(row.timestamp).timestamp(), row.value)
+        for row in rows
+    )
+
+
+def encode_arrow(series: list[dict]) -> bytes:
+    """Encode series as an Arrow IPC stream of one long table."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail=f"{ARROW_STREAM} is not available on this server",
+        )
+
+    lengths = [len(entry["t"]) for entry in series]
+    reading_types = sorted({entry["reading_type"] for entry in series})
+    table = pa.table({
+        "device_id": np.repeat(
+            np.array([entry["device_id"] for entry in series], dtype=np.int32), lengths
+        ),
+        "reading_type": pa.DictionaryArray.from_arrays(
+            np.repeat(
+                np.array([reading_types.index(entry["reading_type"]) for entry in series], dtype=np.int32),
+                lengths,
+            ),
+            pa.array(reading_types, type=pa.string()),
+        ),
+        "t": pa.array([t for entry in series for t in entry["t"]], type=pa.float64()),
+        "v": pa.array([v for entry in series for v in entry["v"]], type=pa.float64()),
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def series_response(series: list[dict], media_type: str) -> Response:
+    """Encode grouped series in `media_type`; plain JSON uses the columnar layout."""
+    if media_type == ARROW_STREAM:
+        content = encode_arrow(series)
+    elif media_type == MSGPACK:
+        content = msgpack.packb({"series": series})
+    else:
+        content = json.dumps({"series": series}, separators=(",", ":"))
+    return Response(content=content, media_type=media_type, headers={"Vary": "Accept"})
+
+
+def columnar_response(rows: Iterable, media_type: str) -> Response:
+    """Render reading rows in a columnar media type chosen by `negotiate`."""
+    return series_response(to_series(rows), media_type)
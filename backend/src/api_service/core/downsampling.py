@@ -0,0 +1,112 @@
+"""
+Shape-preserving downsampling of time series.
+
+Averaging flattens spikes, which are often what users are looking for. These
+algorithms select actual points from the series instead:
+
+- LTTB (Largest-Triangle-Three-Buckets) picks, per bucket, the point forming the
+  largest triangle with its neighbours, preserving the visual shape of the series.
+- The min/max envelope keeps the lowest and highest point of every time bucket,
+  so no extreme is ever lost.
+
+Both operate on columnar NumPy arrays of x (epoch seconds, ascending) and y, and
+return the indices of at most `n_out` selected points in ascending order.
+
+Long series are pre-reduced in SQL to the min/max envelope of
+`n_out * PRESELECT_RATIO / 2` time buckets before either algorithm runs (the
+MinMaxLTTB preselection), so only that many candidates leave the database.
+"""
+
+import enum
+
+import numpy as np
+
+
+# Candidate points fetched per output point for long series
+PRESELECT_RATIO = 4
+
+
+class DownsamplingAlgorithm(str, enum.Enum):
+    AVERAGE = "average"
+    LTTB = "lttb"
+    MINMAX = "minmax"
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Select `n_out` points with Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; the points in between are split
+    into `n_out - 2` equal-count buckets. Bucket means are computed in one
+    vectorized pass and each bucket's triangle areas as one array operation, so
+    the only Python loop is over the output points.
+
+    Args:
+        x (np.ndarray): Ascending x values
+        y (np.ndarray): y values
+        n_out (int): Number of points to select
+
+    Returns:
+        np.ndarray: Indices of the selected points
+    """
+    n = len(x)
+    if n_out >= n or n <= 2:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])[:max(n_out, 0)]
+
+    # starts[i] is the first index of bucket i; the final bucket is the last point
+    starts = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(np.append(starts, n))
+    mean_x = np.add.reduceat(x, starts) / counts
+    mean_y = np.add.reduceat(y, starts) / counts
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = starts[i], starts[i + 1]
+        ax, ay = x[a], y[a]
+        areas = np.abs((ax - mean_x[i + 1]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (mean_y[i + 1] - ay))
+        a = lo + int(areas.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def minmax(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Select the minimum and maximum point of each of `n_out // 2` time buckets.
+
+    Buckets have equal width in x. With fewer than two points allowed, the first
+    `n_out` points are returned, as `lttb` does.
+
+    Args:
+        x (np.ndarray): Ascending x values
+        y (np.ndarray): y values
+        n_out (int): Maximum number of points to select
+
+    Returns:
+        np.ndarray: Indices of the selected points
+    """
+    n = len(x)
+    if n <= n_out:
+        return np.arange(n)
+    n_buckets = n_out // 2
+    if n_buckets < 1:
+        return np.arange(n)[:max(n_out, 0)]
+
+    span = x[-1] - x[0]
+    if span > 0:
+        bucket = np.minimum(((x - x[0]) * (n_buckets / span)).astype(np.int64), n_buckets - 1)
+    else:
+        bucket = np.zeros(n, dtype=np.int64)
+
+    # x is sorted, so each bucket is a contiguous run
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    segment = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, n)))
+
+    selected = []
+    for extreme in (np.minimum.reduceat(y, starts), np.maximum.reduceat(y, starts)):
+        hits = np.flatnonzero(y == extreme[segment])
+        # First hit per segment
+        _, first = np.unique(segment[hits], return_index=True)
+        selected.append(hits[first])
+    return np.unique(np.concatenate(selected))
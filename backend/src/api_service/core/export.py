@@ -0,0 +1,64 @@
+"""
+Incremental encoding of reading exports.
+
+Readings arrive as batches of rows from a server-side cursor and are encoded one
+batch at a time, so an export of any size is held in memory one batch at a time.
+"""
+
+import csv
+import enum
+import io
+import json
+from typing import AsyncIterator, Sequence
+
+CSV_COLUMNS = ("timestamp", "reading_type", "value")
+
+
+class ExportFormat(str, enum.Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+
+def _fields(row) -> tuple[str, str, float]:
+    return row.timestamp.isoformat(), row.reading_type.value, row.value
+
+
+def encode_ndjson(rows: Sequence) -> str:
+    """Encode rows as JSON objects, one per line."""
+    return "".join(
+        json.dumps(dict(zip(CSV_COLUMNS, _fields(row)))) + "\n" for row in rows
+    )
+
+
+def encode_csv(rows: Sequence) -> str:
+    """Encode rows as CSV lines, without a header."""
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(_fields(row) for row in rows)
+    return buffer.getvalue()
+
+
+async def encode_export(
+    batches: AsyncIterator[Sequence], export_format: ExportFormat
+) -> AsyncIterator[str]:
+    """Encode batches of reading rows into chunks of the export format.
+
+    Args:
+        batches: Batches of rows with timestamp, reading_type and value attributes
+        export_format (ExportFormat): Output format; CSV starts with a header line
+
+    Yields:
+        str: One encoded chunk per batch
+    """
+    if export_format == ExportFormat.CSV:
+        yield ",".join(CSV_COLUMNS) + "\n"
+        encode = encode_csv
+    else:
+        encode = encode_ndjson
+    async for rows in batches:
+        yield encode(rows)
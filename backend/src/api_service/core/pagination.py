@@ -0,0 +1,31 @@
+"""
+Opaque cursors for keyset pagination.
+
+A cursor records the sort key, `(timestamp, id)`, of the last row of a page. The
+next page starts strictly after it, which an index on the sort key answers at
+constant cost however deep the page is, unlike OFFSET.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(timestamp: datetime, id: int) -> str:
+    """Encode the sort key of the last row of a page as a URL-safe token."""
+    payload = json.dumps([timestamp.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> tuple[datetime, int]:
+    """Decode a token made by `encode_cursor`.
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        timestamp, id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(timestamp), int(id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {token}") from e
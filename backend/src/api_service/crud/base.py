@@ -51,20 +51,28 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db: AsyncSession,
         *,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        after_id: Optional[Any] = None
     ) -> List[ModelType]:
         """
         Get multiple records.
 
+        With `after_id`, records are returned in ID order starting after that ID
+        (keyset pagination), which stays fast however deep the page is.
+
         Args:
             db: Database session
             skip: Number of records to skip
             limit: Maximum number of records to return
+            after_id: Only return records with a greater ID
 
         Returns:
             List[ModelType]: List of records
         """
-        query = select(self.model).offset(skip).limit(limit)
+        query = select(self.model)
+        if after_id is not None:
+            query = query.where(self.model.id > after_id).order_by(self.model.id)
+        query = query.offset(skip).limit(limit)
         result = await db.execute(query)
         return list(result.scalars().all())
 
@@ -7,15 +7,18 @@ the repository pattern.
 
 from typing import Optional, List
 from datetime import datetime, timedelta
-from sqlalchemy import select, func, and_
+from sqlalchemy import case, select, func, and_, or_
 from models.reading import ReadingType
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, selectinload
 
+from db.functions import not_nan
 from models.device import Device
+from models.device_latest import DeviceLatest
 from models.reading import Reading
 from schemas.device import DeviceCreate, DeviceUpdate
 from api_service.crud.base import CRUDBase
+from api_service.crud.crud_reading import calibration_offset
 
 
 class CRUDDevice(CRUDBase[Device, DeviceCreate, DeviceUpdate]):
@@ -109,20 +112,40 @@ class CRUDDevice(CRUDBase[Device, DeviceCreate, DeviceUpdate]):
         return list(result.scalars().all())
 
     async def get_with_latest_reading(
-        self, db: AsyncSession, *, id: int
+        self, db: AsyncSession, *, id: int, per_type: int = 1
     ) -> Optional[Device]:
         """
-        Get a device with its readings preloaded.
+        Get a device with its latest readings preloaded.
+
+        Only the newest `per_type` readings of each reading type are loaded into
+        `readings`, each type with an `ORDER BY timestamp DESC LIMIT n` probe of the
+        (device_id, reading_type, timestamp) index, so the rows fetched do not grow
+        with the device's history.
 
         Args:
             db: Database session
             id: Device ID
+            per_type: Number of readings to load per reading type
 
         Returns:
-            Optional[Device]: Device with readings or None
+            Optional[Device]: Device with its latest readings or None
         """
+        latest = or_(
+            *(
+                Reading.id.in_(
+                    select(Reading.id)
+                    .where(Reading.device_id == id, Reading.reading_type == reading_type)
+                    .order_by(Reading.timestamp.desc())
+                    .limit(per_type)
+                )
+                for reading_type in ReadingType
+            )
+        )
         query = (
-            select(Device).options(selectinload(Device.readings)).where(Device.id == id)
+            select(Device)
+            .options(selectinload(Device.readings.and_(latest)))
+            .where(Device.id == id)
+            .execution_options(populate_existing=True)
         )
         result = await db.execute(query)
         return result.scalar_one_or_none()
@@ -144,6 +167,130 @@ class CRUDDevice(CRUDBase[Device, DeviceCreate, DeviceUpdate]):
             return False
         return device.owner_id == user_id
 
+    async def get_owned_ids(
+        self, db: AsyncSession, *, device_ids: List[int], user_id: int
+    ) -> set[int]:
+        """
+        Return which of the given devices a user owns, in one query.
+
+        Args:
+            db: Database session
+            device_ids: Device IDs to check
+            user_id: User ID
+
+        Returns:
+            set[int]: IDs of the devices owned by the user
+        """
+        query = select(Device.id).where(Device.id.in_(device_ids), Device.owner_id == user_id)
+        result = await db.execute(query)
+        return set(result.scalars().all())
+
+    async def get_summaries(
+        self,
+        db: AsyncSession,
+        *,
+        owner_id: int,
+        since: Optional[datetime] = None,
+        use_latest_table: bool = False,
+    ) -> List[dict]:
+        """
+        Get the dashboard summary of every device of an owner with one query.
+
+        For each reading type, the latest reading is read with a correlated
+        `ORDER BY timestamp DESC LIMIT 1` probe of the (device_id, reading_type,
+        timestamp) index, the equivalent of a LATERAL join, and min/max/avg/count
+        since `since` come from one conditional aggregation over the owner's
+        readings in that window. Offsets are applied in SQL. With use_latest_table
+        the latest readings are primary key reads of device_latest instead.
+
+        Args:
+            db: Database session
+            owner_id: ID of the owner
+            since: Start of the statistics window (default: 24 hours ago)
+            use_latest_table: Read latest readings from device_latest
+
+        Returns:
+            List[dict]: One summary per device, ordered by ID, with a nested dict
+                per reading type
+        """
+        if since is None:
+            since = datetime.utcnow() - timedelta(hours=24)
+
+        valid = not_nan(Reading.value)
+        owned_device = aliased(Device)
+        owned = select(owned_device.id).where(owned_device.owner_id == owner_id)
+
+        stats_columns = []
+        for reading_type in ReadingType:
+            value = case((Reading.reading_type == reading_type, Reading.value))
+            stats_columns += [
+                func.min(value).label(f"{reading_type.value}_min"),
+                func.max(value).label(f"{reading_type.value}_max"),
+                func.avg(value).label(f"{reading_type.value}_avg"),
+                func.count(value).label(f"{reading_type.value}_count"),
+            ]
+        stats = (
+            select(Reading.device_id, *stats_columns)
+            .where(Reading.device_id.in_(owned), Reading.timestamp >= since, valid)
+            .group_by(Reading.device_id)
+            .subquery()
+        )
+
+        columns = []
+        for reading_type in ReadingType:
+            if use_latest_table:
+                latest_value = select(DeviceLatest.value).where(
+                    DeviceLatest.device_id == Device.id, DeviceLatest.reading_type == reading_type
+                )
+                latest_timestamp = latest_value.with_only_columns(DeviceLatest.timestamp)
+            else:
+                latest_value = (
+                    select(Reading.value)
+                    .where(
+                        Reading.device_id == Device.id,
+                        Reading.reading_type == reading_type,
+                        valid,
+                    )
+                    .order_by(Reading.timestamp.desc())
+                    .limit(1)
+                )
+                latest_timestamp = latest_value.with_only_columns(Reading.timestamp)
+            offset = calibration_offset(reading_type)
+            prefix = reading_type.value
+            columns += [
+                (latest_value.scalar_subquery() + offset).label(f"{prefix}_latest_value"),
+                latest_timestamp.scalar_subquery().label(f"{prefix}_latest_timestamp"),
+                (stats.c[f"{prefix}_min"] + offset).label(f"{prefix}_min"),
+                (stats.c[f"{prefix}_max"] + offset).label(f"{prefix}_max"),
+                (stats.c[f"{prefix}_avg"] + offset).label(f"{prefix}_avg"),
+                func.coalesce(stats.c[f"{prefix}_count"], 0).label(f"{prefix}_count"),
+            ]
+
+        query = (
+            select(Device.id, Device.device_id, Device.name, Device.is_active, *columns)
+            .outerjoin(stats, stats.c.device_id == Device.id)
+            .where(Device.owner_id == owner_id)
+            .order_by(Device.id)
+        )
+        result = await db.execute(query)
+
+        fields = ("latest_value", "latest_timestamp", "min", "max", "avg", "count")
+        return [
+            {
+                "id": row.id,
+                "device_id": row.device_id,
+                "name": row.name,
+                "is_active": row.is_active,
+                **{
+                    reading_type.value: {
+                        field: row._mapping[f"{reading_type.value}_{field}"] for field in fields
+                    }
+                    for reading_type in ReadingType
+                },
+            }
+            for row in result.all()
+        ]
+
     async def get_active_devices(
         self, db: AsyncSession, *, skip: int = 0, limit: int = 100
     ) -> List[Device]:
@@ -210,7 +357,7 @@ class CRUDDevice(CRUDBase[Device, DeviceCreate, DeviceUpdate]):
         return devices
 
     async def get_inactive_devices(
-        self, db: AsyncSession, *, min_inactive_days: int = 30
+        self, db: AsyncSession, *, min_inactive_days: int = 30, use_latest_table: bool = False
     ) -> List[Device]:
         """
         Get devices that haven't sent readings for a specified period.
@@ -218,18 +365,27 @@ class CRUDDevice(CRUDBase[Device, DeviceCreate, DeviceUpdate]):
         Args:
             db: Database session
             min_inactive_days: Minimum days of inactivity
+            use_latest_table: Check `last_seen` in device_latest instead of
+                scanning recent readings
 
         Returns:
             List[Device]: List of inactive devices
         """
         cutoff_date = datetime.utcnow() - timedelta(days=min_inactive_days)
 
-        subquery = (
-            select(Reading.device_id)
-            .where(Reading.timestamp >= cutoff_date)
-            .group_by(Reading.device_id)
-            .scalar_subquery()
-        )
+        if use_latest_table:
+            subquery = (
+                select(DeviceLatest.device_id)
+                .where(DeviceLatest.last_seen >= cutoff_date)
+                .scalar_subquery()
+            )
+        else:
+            # A plain range predicate (no GROUP BY) lets the timestamp index drive the scan
+            subquery = (
+                select(Reading.device_id)
+                .where(Reading.timestamp >= cutoff_date)
+                .scalar_subquery()
+            )
 
         query = select(Device).where(
             and_(Device.is_active == True, Device.id.notin_(subquery))  # noqa: E712
@@ -6,42 +6,75 @@ the repository pattern.
 """
 
 import logging
-from typing import Optional, List, Any
-from datetime import datetime, timedelta
-from sqlalchemy import select, func, and_
+from itertools import chain
+from typing import AsyncIterator, Optional, List, Any, Sequence, Union
+from datetime import UTC, datetime, timedelta
+from sqlalchemy import Row, case, select, func, and_, or_, tuple_, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import HTTPException
 
+import numpy as np
+
+from api_service.core.downsampling import PRESELECT_RATIO, DownsamplingAlgorithm, lttb, minmax
+from db.functions import epoch, floor
+from db.latest import apply_latest
+from db.rollups import apply_rollups, as_utc, floor_bucket, rollup_segments
+from models.device_latest import DeviceLatest
 from models.reading import Reading, ReadingType
+from models.rollup import ROLLUP_RESOLUTIONS, ReadingRollup
 from schemas.reading import ReadingCreate, ReadingUpdate
 from api_service.crud.base import CRUDBase
-from api_service.crud.crud_device import device as crud_device
 from models.device import Device
 
 
+def calibration_offset(reading_type) -> Any:
+    """SQL expression for the calibration offset of the joined `devices` row.
+
+    Readings without a device (outer join) or offset are not adjusted.
+
+    Args:
+        reading_type: A ReadingType, or a column holding the reading type
+
+    Returns:
+        The offset expression
+    """
+    if isinstance(reading_type, ReadingType):
+        offset = (
+            Device.temperature_offset
+            if reading_type == ReadingType.TEMPERATURE
+            else Device.humidity_offset
+        )
+    else:
+        offset = case(
+            (reading_type == ReadingType.TEMPERATURE, Device.temperature_offset),
+            (reading_type == ReadingType.HUMIDITY, Device.humidity_offset),
+        )
+    return func.coalesce(offset, 0.0)
+
+
+# Reading value with the device's calibration offset applied
+calibrated_value = Reading.value + calibration_offset(Reading.reading_type)
+
+
+def calibrated_readings():
+    """Select reading columns with the calibrated value as `value`.
+
+    Rows have the attributes of a Reading, so they serialize as ReadingOut.
+    """
+    return select(
+        Reading.id,
+        Reading.device_id,
+        Reading.reading_type,
+        calibrated_value.label("value"),
+        Reading.timestamp,
+    ).outerjoin(Device, Device.id == Reading.device_id)
+
+
 class CRUDReading(CRUDBase[Reading, ReadingCreate, ReadingUpdate]):
     """
     CRUD operations for Reading model.
     Inherits basic CRUD operations from CRUDBase.
     """
 
-    async def _apply_device_offset(
-        self, db: AsyncSession, reading: Reading, device: Optional[Device] = None
-    ) -> Reading:
-        """Apply device offset to a reading."""
-        if device is None:
-            device = await crud_device.get(db, id=reading.device_id)
-
-        if device:
-            if reading.reading_type == ReadingType.TEMPERATURE:
-                offset = device.temperature_offset or 0.0  # Convert None to 0.0
-                reading.value += offset
-            elif reading.reading_type == ReadingType.HUMIDITY:
-                offset = device.humidity_offset or 0.0  # Convert None to 0.0
-                reading.value += offset
-
-        return reading
-
     def _valid_value_filters(self):
         """Return SQLAlchemy filters for valid numeric values."""
         return and_(
@@ -52,8 +85,93 @@ class CRUDReading(CRUDBase[Reading, ReadingCreate, ReadingUpdate]):
             # NaN is the only value where x != x
         )
 
+    def _rollup_aggregates(
+        self,
+        *,
+        reading_type: ReadingType,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        device_id: Optional[int] = None,
+        owner_id: Optional[int] = None,
+    ):
+        """Build a per-device min/max/avg/count query served from the rollups.
+
+        The range is covered by the coarsest rollup buckets that fit, with raw
+        readings only for the unaligned edges, so the result equals aggregating
+        the raw readings over [start_date, end_date]. Rollups hold raw values; the
+        calibration offset is added to the aggregates. With `owner_id` every
+        segment only reads the owner's devices.
+        """
+        # Segments are half-open; readings exactly at end_date are included
+        end_exclusive = end_date + timedelta(microseconds=1) if end_date else None
+        owned = select(Device.id).where(Device.owner_id == owner_id)
+
+        parts = []
+        for resolution, lo, hi in rollup_segments(start_date, end_exclusive):
+            if resolution is None:
+                conditions = [Reading.reading_type == reading_type, self._valid_value_filters()]
+                if device_id is not None:
+                    conditions.append(Reading.device_id == device_id)
+                if owner_id is not None:
+                    conditions.append(Reading.device_id.in_(owned))
+                if lo is not None:
+                    conditions.append(Reading.timestamp >= lo)
+                if hi is not None:
+                    conditions.append(Reading.timestamp < hi)
+                parts.append(
+                    select(
+                        Reading.device_id.label("device_id"),
+                        func.min(Reading.value).label("min"),
+                        func.max(Reading.value).label("max"),
+                        func.sum(Reading.value).label("sum"),
+                        func.count(Reading.value).label("count"),
+                    ).where(*conditions).group_by(Reading.device_id)
+                )
+            else:
+                conditions = [
+                    ReadingRollup.resolution == resolution,
+                    ReadingRollup.reading_type == reading_type,
+                ]
+                if device_id is not None:
+                    conditions.append(ReadingRollup.device_id == device_id)
+                if owner_id is not None:
+                    conditions.append(ReadingRollup.device_id.in_(owned))
+                if lo is not None:
+                    conditions.append(ReadingRollup.bucket >= lo)
+                if hi is not None:
+                    conditions.append(ReadingRollup.bucket < hi)
+                parts.append(
+                    select(
+                        ReadingRollup.device_id.label("device_id"),
+                        func.min(ReadingRollup.min_value).label("min"),
+                        func.max(ReadingRollup.max_value).label("max"),
+                        func.sum(ReadingRollup.sum_value).label("sum"),
+                        func.sum(ReadingRollup.count).label("count"),
+                    ).where(*conditions).group_by(ReadingRollup.device_id)
+                )
+
+        segments = union_all(*parts).subquery()
+        offset = calibration_offset(reading_type)
+        return (
+            select(
+                segments.c.device_id,
+                (func.min(segments.c.min) + offset).label("min"),
+                (func.max(segments.c.max) + offset).label("max"),
+                (func.sum(segments.c.sum) / func.sum(segments.c.count) + offset).label("avg"),
+                func.sum(segments.c.count).label("count"),
+            )
+            .outerjoin(Device, Device.id == segments.c.device_id)
+            .group_by(segments.c.device_id, Device.temperature_offset, Device.humidity_offset)
+        )
+
     async def create_with_device(
-        self, db: AsyncSession, *, obj_in: ReadingCreate, device_id: int
+        self,
+        db: AsyncSession,
+        *,
+        obj_in: ReadingCreate,
+        device_id: int,
+        maintain_rollups: bool = False,
+        maintain_latest: bool = False,
     ) -> Reading:
         """
         Create a new reading for a device.
@@ -62,6 +180,10 @@ class CRUDReading(CRUDBase[Reading, ReadingCreate, ReadingUpdate]):
             db: Database session
             obj_in: Reading creation data
             device_id: ID of the device
+            maintain_rollups: Fold the reading into reading_rollups in the same
+                transaction, as the ingestion writer does with READINGS_MAINTAIN_ROLLUPS
+            maintain_latest: Upsert device_latest in the same transaction, as the
+                ingestion writer does with READINGS_MAINTAIN_LATEST
 
         Returns:
             Reading: Created reading
@@ -73,10 +195,99 @@ class CRUDReading(CRUDBase[Reading, ReadingCreate, ReadingUpdate]):
             timestamp=obj_in.timestamp or datetime.utcnow(),
         )
         db.add(db_obj)
+        row = (device_id, db_obj.reading_type, db_obj.value, db_obj.timestamp)
+        if maintain_rollups:
+            await apply_rollups(db, [row])
+        if maintain_latest:
+            await apply_latest(db, [row])
         await db.commit()
         await db.refresh(db_obj)
         return db_obj
 
+    def _select_resolution(self, span: timedelta, threshold: int) -> Optional[int]:
+        """Pick the rollup tier to average a time span into `threshold` points from.
+
+        Returns the coarsest resolution with at least `threshold` buckets in the
+        span, so every point averages whole buckets and reads at most one tier
+        step's worth of them. Returns None when even the finest tier has fewer
+        buckets, i.e. the span is under `threshold` minutes: raw readings are read.
+        """
+        seconds = span.total_seconds()
+        fitting = [r for r in sorted(ROLLUP_RESOLUTIONS) if seconds / r >= threshold]
+        return fitting[-1] if fitting else None
+
+    async def _get_rollup_series(
+        self,
+        db: AsyncSession,
+        *,
+        device_id: int,
+        resolution: int,
+        reading_type: Optional[ReadingType],
+        start_date: datetime,
+        end_date: datetime,
+        buckets: int,
+    ) -> List[Reading]:
+        """Average rollup buckets into `buckets` equal time windows per reading type.
+
+        The same windowing as `_bucket_averages`, in SQL, over rollup buckets
+        instead of raw readings: each window's value is the count-weighted mean of
+        its buckets, timestamped at the mean start of those buckets.
+        """
+        start_epoch = floor_bucket(start_date, resolution).timestamp()
+        # Every bucket starting at or before end_date falls inside the last window
+        end_epoch = floor_bucket(end_date, resolution).timestamp() + resolution
+        width = (end_epoch - start_epoch) / buckets
+
+        bucket_epoch = epoch(ReadingRollup.bucket)
+        conditions = [
+            ReadingRollup.device_id == device_id,
+            ReadingRollup.resolution == resolution,
+            ReadingRollup.bucket >= floor_bucket(start_date, resolution),
+            ReadingRollup.bucket <= end_date,
+        ]
+        if reading_type is not None:
+            conditions.append(ReadingRollup.reading_type == reading_type)
+        windowed = (
+            select(
+                ReadingRollup.device_id.label("device_id"),
+                ReadingRollup.reading_type.label("reading_type"),
+                ReadingRollup.sum_value.label("sum"),
+                ReadingRollup.count.label("count"),
+                bucket_epoch.label("epoch"),
+                floor((bucket_epoch - start_epoch) / width).label("window"),
+            )
+            .where(*conditions)
+            .subquery()
+        )
+        query = (
+            select(
+                windowed.c.reading_type,
+                (
+                    func.sum(windowed.c.sum) / func.sum(windowed.c.count)
+                    + calibration_offset(windowed.c.reading_type)
+                ).label("value"),
+                func.avg(windowed.c.epoch).label("epoch"),
+            )
+            .outerjoin(Device, Device.id == windowed.c.device_id)
+            .group_by(
+                windowed.c.reading_type,
+                windowed.c.window,
+                Device.temperature_offset,
+                Device.humidity_offset,
+            )
+            .order_by(windowed.c.reading_type, windowed.c.window)
+        )
+        result = await db.execute(query)
+        return [
+            Reading(
+                device_id=device_id,
+                reading_type=row.reading_type,
+                value=float(row.value),
+                timestamp=datetime.fromtimestamp(float(row.epoch), UTC),
+            )
+            for row in result.all()
+        ]
+
     async def get_by_device(
         self,
         db: AsyncSession,
@@ -86,9 +297,19 @@ class CRUDReading(CRUDBase[Reading, ReadingCreate, ReadingUpdate]):
         end_date: Optional[datetime] = None,
         reading_type: Optional[ReadingType] = None,
         threshold: int = 500,  # Maximum number of readings before averaging
-    ) -> List[Reading]:
+        use_rollups: bool = False,
+        algorithm: DownsamplingAlgorithm = DownsamplingAlgorithm.AVERAGE,
+    ) -> List[Union[Row, Reading]]:
         """
-        Get readings for a specific device with filters.
+        Get calibrated readings for a specific device with filters.
+
+        With use_rollups, ranges of at least `threshold` minutes are averaged into
+        `threshold` windows per reading type from the coarsest rollup tier with at
+        least that many buckets, so cost stays bounded regardless of the range. Otherwise, if more than
+        `threshold` raw readings match, they are averaged into `threshold` equal time
+        windows per reading type by a single grouped query, or reduced to at most
+        `threshold` actual readings per type with the selected shape-preserving
+        algorithm (LTTB or min/max envelope), which never use the rollups.
 
         Args:
             db: Database session
@@ -97,13 +318,39 @@ class CRUDReading(CRUDBase[Reading, ReadingCreate, ReadingUpdate]):
             end_date: Filter readings before this date
             reading_type: Optional reading type filter
             threshold: Maximum number of readings before averaging
+            use_rollups: Serve long ranges from the rollup tables
+            algorithm: How to reduce series longer than `threshold`
 
         Returns:
-            List[Reading]: List of readings
+            List[Union[Row, Reading]]: Raw readings as rows, or transient Readings
+                for reduced series; values include the device's calibration offset
         """
-        max_time_window = timedelta(days=30)
-        if start_date and end_date and (end_date - start_date > max_time_window):
-            raise HTTPException(status_code=400, detail="Time window too large")
+        logger = logging.getLogger(__name__)
+
+        if use_rollups and algorithm == DownsamplingAlgorithm.AVERAGE:
+            series_end = end_date or datetime.now(UTC)
+            series_start = start_date
+            if series_start is None:
+                # Open-ended: start at the device's first daily bucket
+                result = await db.execute(
+                    select(func.min(ReadingRollup.bucket)).where(
+                        ReadingRollup.device_id == device_id,
+                        ReadingRollup.resolution == max(ROLLUP_RESOLUTIONS),
+                    )
+                )
+                series_start = result.scalar_one_or_none() or series_end
+            resolution = self._select_resolution(as_utc(series_end) - as_utc(series_start), threshold)
+            if resolution is not None:
+                logger.info(f"Serving device_id={device_id} from {resolution}s rollups")
+                return await self._get_rollup_series(
+                    db,
+                    device_id=device_id,
+                    resolution=resolution,
+                    reading_type=reading_type,
+                    start_date=series_start,
+                    end_date=series_end,
+                    buckets=threshold,
+                )
 
         # Build base query with required filters
         conditions = [Reading.device_id == device_id, self._valid_value_filters()]
@@ -111,93 +358,286 @@ class CRUDReading(CRUDBase[Reading, ReadingCreate, ReadingUpdate]):
         # Add reading_type filter if provided
         if reading_type is not None:
             conditions.append(Reading.reading_type == reading_type.value)
+        if start_date:
+            conditions.append(Reading.timestamp >= start_date)
+        if end_date:
+            conditions.append(Reading.timestamp <= end_date)
+
+        result = await db.execute(
+            select(
+                func.count(Reading.id), func.min(Reading.timestamp), func.max(Reading.timestamp)
+            ).where(*conditions)
+        )
+        count, first_timestamp, last_timestamp = result.one()
+
+        logger.info(
+            f"Query executed for device_id={device_id}, reading_type={reading_type}"
+        )
+        logger.info(f"Time range: {start_date} to {end_date}")
+        logger.info(f"Found {count} readings")
+
+        if count <= threshold:
+            query = calibrated_readings().where(*conditions).order_by(Reading.timestamp.asc())
+            result = await db.execute(query)
+            readings = list(result.all())
+        elif algorithm != DownsamplingAlgorithm.AVERAGE:
+            readings = await self._get_downsampled(
+                db,
+                device_id=device_id,
+                conditions=conditions,
+                reading_types=[reading_type] if reading_type is not None else list(ReadingType),
+                algorithm=algorithm,
+                max_points=threshold,
+                count=count,
+                start_date=start_date or first_timestamp,
+                end_date=end_date or last_timestamp,
+            )
+            logger.info(f"Downsampled to {len(readings)} readings with {algorithm.value}")
+        else:
+            # Open-ended ranges are bucketed over the span of the matching readings
+            readings = await self._get_bucketed(
+                db,
+                device_id=device_id,
+                conditions=conditions,
+                start_date=start_date or first_timestamp,
+                end_date=end_date or last_timestamp + timedelta(microseconds=1),
+                buckets=threshold,
+            )
+            logger.info(f"Averaged into {len(readings)} readings")
 
-        query = select(Reading).where(and_(*conditions))
+        return readings
+
+    async def stream_by_device(
+        self,
+        db: AsyncSession,
+        *,
+        device_id: int,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        reading_type: Optional[ReadingType] = None,
+        batch_size: int = 5000,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Stream all calibrated readings of a device in time order, in batches.
 
+        Rows are fetched through a server-side cursor `batch_size` at a time, so
+        memory use does not depend on the size of the range.
+
+        Args:
+            db: Database session; kept busy until the iterator is exhausted
+            device_id: Device ID
+            start_date: Filter readings after this date
+            end_date: Filter readings before this date
+            reading_type: Optional reading type filter
+            batch_size: Rows per batch
+
+        Yields:
+            Sequence[Row]: Up to `batch_size` readings
+        """
+        query = calibrated_readings().where(
+            Reading.device_id == device_id, self._valid_value_filters()
+        )
+        if reading_type is not None:
+            query = query.where(Reading.reading_type == reading_type)
         if start_date:
             query = query.where(Reading.timestamp >= start_date)
         if end_date:
             query = query.where(Reading.timestamp <= end_date)
 
-        query = query.order_by(Reading.timestamp.asc())
+        query = query.order_by(Reading.timestamp.asc(), Reading.id.asc()).execution_options(
+            yield_per=batch_size
+        )
+        result = await db.stream(query)
+        async for partition in result.partitions():
+            yield partition
 
-        result = await db.execute(query)
-        readings = list(result.scalars().all())
+    async def _get_downsampled(
+        self,
+        db: AsyncSession,
+        *,
+        device_id: int,
+        conditions: list,
+        reading_types: List[ReadingType],
+        algorithm: DownsamplingAlgorithm,
+        max_points: int,
+        count: int,
+        start_date: datetime,
+        end_date: datetime,
+    ) -> List[Reading]:
+        """Select at most `max_points` readings per type with a shape-preserving algorithm.
 
-        # Apply offsets to all readings
-        if readings:
-            device = await crud_device.get(db, id=device_id)
-            for reading in readings:
-                await self._apply_device_offset(db, reading, device)
+        Each reading type is fetched by its own query straight into NumPy arrays.
+        Series of more than `max_points * PRESELECT_RATIO` readings are first
+        reduced in SQL to the min/max envelope of equal time buckets over
+        [start_date, end_date], so the rows leaving the database stay bounded
+        however long the range. ORM objects are only built for the selected points.
+        """
+        candidates = max(max_points, 1) * PRESELECT_RATIO
+        start_epoch = as_utc(start_date).timestamp()
+        width = max(as_utc(end_date).timestamp() - start_epoch, 1.0) / (candidates // 2)
+        reading_epoch = epoch(Reading.timestamp)
+
+        readings = []
+        for reading_type in reading_types:
+            type_conditions = [*conditions, Reading.reading_type == reading_type]
+            if count > candidates:
+                bucket = floor((reading_epoch - start_epoch) / width)
+                ranked = (
+                    select(
+                        reading_epoch.label("epoch"),
+                        calibrated_value.label("value"),
+                        func.row_number()
+                        .over(partition_by=bucket, order_by=(Reading.value, Reading.timestamp))
+                        .label("lowest"),
+                        func.row_number()
+                        .over(partition_by=bucket, order_by=(Reading.value.desc(), Reading.timestamp))
+                        .label("highest"),
+                    )
+                    .outerjoin(Device, Device.id == Reading.device_id)
+                    .where(*type_conditions)
+                    .subquery()
+                )
+                query = (
+                    select(ranked.c.epoch, ranked.c.value)
+                    .where(or_(ranked.c.lowest == 1, ranked.c.highest == 1))
+                    .order_by(ranked.c.epoch)
+                )
+            else:
+                query = (
+                    select(reading_epoch, calibrated_value)
+                    .outerjoin(Device, Device.id == Reading.device_id)
+                    .where(*type_conditions)
+                    .order_by(Reading.timestamp)
+                )
+            result = await db.execute(query)
+            columns = np.fromiter(chain.from_iterable(result), dtype=np.float64).reshape(-1, 2)
+            if not len(columns):
+                continue
+
+            x, y = columns[:, 0], columns[:, 1]
+            if algorithm == DownsamplingAlgorithm.LTTB:
+                indices = lttb(x, y, max_points)
+            else:
+                indices = minmax(x, y, max_points)
+            readings.extend(
+                Reading(
+                    device_id=device_id,
+                    reading_type=reading_type,
+                    value=float(y[i]),
+                    timestamp=datetime.fromtimestamp(float(x[i]), UTC),
+                )
+                for i in indices
+            )
+        return readings
 
-        logger = logging.getLogger(__name__)
-        logger.info(
-            f"Query executed for device_id={device_id}, reading_type={reading_type}"
+    def _bucket_averages(
+        self,
+        *,
+        conditions: list,
+        start_date: datetime,
+        end_date: datetime,
+        buckets: int,
+    ):
+        """Build a query averaging readings into `buckets` equal time windows in SQL.
+
+        Windows are half-open, [start + i * width, start + (i + 1) * width), per
+        device and reading type. Each point is timestamped at the mean epoch of the
+        readings it averages.
+        """
+        start_epoch = as_utc(start_date).timestamp()
+        width = (as_utc(end_date).timestamp() - start_epoch) / buckets
+
+        reading_epoch = epoch(Reading.timestamp)
+        windowed = (
+            select(
+                Reading.device_id.label("device_id"),
+                Reading.reading_type.label("reading_type"),
+                calibrated_value.label("value"),
+                reading_epoch.label("epoch"),
+                floor((reading_epoch - start_epoch) / width).label("bucket"),
+            )
+            .outerjoin(Device, Device.id == Reading.device_id)
+            .where(*conditions, Reading.timestamp < end_date)
+            .subquery()
+        )
+        return (
+            select(
+                windowed.c.device_id,
+                windowed.c.reading_type,
+                func.avg(windowed.c.value).label("value"),
+                func.avg(windowed.c.epoch).label("epoch"),
+            )
+            .group_by(windowed.c.device_id, windowed.c.reading_type, windowed.c.bucket)
+            .order_by(windowed.c.device_id, windowed.c.reading_type, windowed.c.bucket)
         )
-        logger.info(f"Time range: {start_date} to {end_date}")
-        logger.info(f"Found {len(readings)} readings")
-
-        if not readings:
-            logger.info("No readings found, returning empty list")
-            return []
-
-        # If under threshold, return all readings
-        if len(readings) <= threshold:
-            logger.info(f"Under threshold ({threshold}), returning all readings")
-            return readings
-
-        # Group readings by type for averaging
-        readings_by_type = {}
-        for reading in readings:
-            if reading.reading_type not in readings_by_type:
-                readings_by_type[reading.reading_type] = []
-            readings_by_type[reading.reading_type].append(reading)
-
-        averaged_readings = []
-        time_window = (end_date - start_date).total_seconds()
-        sampling_window_size = time_window / threshold
-
-        # Average each reading type separately
-        for type_readings in readings_by_type.values():
-            current_window_start = start_date
-            while current_window_start < end_date:
-                current_window_end = min(
-                    current_window_start + timedelta(seconds=sampling_window_size),
-                    end_date,
-                )
 
-                window_readings = [
-                    r
-                    for r in type_readings
-                    if current_window_start <= r.timestamp < current_window_end
-                ]
+    async def _get_bucketed(
+        self,
+        db: AsyncSession,
+        *,
+        device_id: int,
+        conditions: list,
+        start_date: datetime,
+        end_date: datetime,
+        buckets: int,
+    ) -> List[Reading]:
+        """Average a device's readings into `buckets` equal time windows per reading type."""
+        query = self._bucket_averages(
+            conditions=conditions, start_date=start_date, end_date=end_date, buckets=buckets
+        )
+        result = await db.execute(query)
+        return [
+            Reading(
+                device_id=device_id,
+                reading_type=row.reading_type,
+                value=float(row.value),
+                timestamp=datetime.fromtimestamp(float(row.epoch), UTC),
+            )
+            for row in result.all()
+        ]
 
-                if window_readings:
-                    avg_value = sum(r.value for r in window_readings) / len(
-                        window_readings
-                    )
-                    mid_timestamp = window_readings[len(window_readings) // 2].timestamp
+    async def get_series(
+        self,
+        db: AsyncSession,
+        *,
+        device_ids: List[int],
+        start_date: datetime,
+        end_date: datetime,
+        reading_types: Optional[List[ReadingType]] = None,
+        max_points: int = 500,
+    ) -> List[Row]:
+        """
+        Get downsampled series for several devices with one grouped query.
 
-                    logger.info(
-                        f"Window {current_window_start} to {current_window_end}: "
-                        f"{len(window_readings)} readings, avg={avg_value}"
-                    )
+        Every (device, reading type) series is averaged into at most `max_points`
+        equal time windows over [start_date, end_date); windows holding a single
+        reading return it unchanged.
 
-                    averaged_readings.append(
-                        Reading(
-                            device_id=device_id,
-                            timestamp=mid_timestamp,
-                            value=avg_value,
-                            reading_type=window_readings[
-                                0
-                            ].reading_type,  # Use the reading type from the group
-                        )
-                    )
+        Args:
+            db: Database session
+            device_ids: Device IDs
+            start_date: Start of the range
+            end_date: End of the range (exclusive)
+            reading_types: Reading types to include (default: all)
+            max_points: Maximum points per series
 
-                current_window_start = current_window_end
+        Returns:
+            List[Row]: (device_id, reading_type, value, epoch) rows with calibrated
+                values, ordered by device, reading type and time
+        """
+        conditions = [
+            Reading.device_id.in_(device_ids),
+            self._valid_value_filters(),
+            Reading.timestamp >= start_date,
+        ]
+        if reading_types:
+            conditions.append(Reading.reading_type.in_(reading_types))
 
-        logger.info(f"Created {len(averaged_readings)} averaged readings")
-        return averaged_readings
+        query = self._bucket_averages(
+            conditions=conditions, start_date=start_date, end_date=end_date, buckets=max_points
+        )
+        result = await db.execute(query)
+        return list(result.all())
 
     async def get_latest_by_device(
         self,
@@ -205,7 +645,8 @@ class CRUDReading(CRUDBase[Reading, ReadingCreate, ReadingUpdate]):
         *,
         device_id: int,
         reading_type: Optional[ReadingType] = None,
-    ) -> Optional[Reading]:
+        use_latest_table: bool = False,
+    ) -> Optional[Row]:
         """
         Get the latest reading for a device with offset applied.
 
@@ -213,11 +654,32 @@ class CRUDReading(CRUDBase[Reading, ReadingCreate, ReadingUpdate]):
             db: Database session
             device_id: Device ID
             reading_type: Optional reading type filter
+            use_latest_table: Read the device_latest table (a primary key lookup)
+                instead of searching readings
 
         Returns:
-            Optional[Reading]: Latest reading or None
+            Optional[Row]: Latest calibrated reading or None
         """
-        query = select(Reading).where(
+        if use_latest_table:
+            query = (
+                select(
+                    DeviceLatest.device_id,
+                    DeviceLatest.reading_type,
+                    (
+                        DeviceLatest.value + calibration_offset(DeviceLatest.reading_type)
+                    ).label("value"),
+                    DeviceLatest.timestamp,
+                )
+                .outerjoin(Device, Device.id == DeviceLatest.device_id)
+                .where(DeviceLatest.device_id == device_id)
+            )
+            if reading_type:
+                query = query.where(DeviceLatest.reading_type == reading_type)
+            query = query.order_by(DeviceLatest.timestamp.desc()).limit(1)
+            result = await db.execute(query)
+            return result.one_or_none()
+
+        query = calibrated_readings().where(
             and_(Reading.device_id == device_id, self._valid_value_filters())
         )
 
@@ -226,12 +688,7 @@ class CRUDReading(CRUDBase[Reading, ReadingCreate, ReadingUpdate]):
 
         query = query.order_by(Reading.timestamp.desc()).limit(1)
         result = await db.execute(query)
-        reading = result.scalar_one_or_none()
-
-        if reading:
-            reading = await self._apply_device_offset(db, reading)
-
-        return reading
+        return result.one_or_none()
 
     async def get_statistics(
         self,
@@ -241,27 +698,39 @@ class CRUDReading(CRUDBase[Reading, ReadingCreate, ReadingUpdate]):
         reading_type: ReadingType,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
+        use_rollups: bool = False,
     ) -> dict[str, float]:
         """
-        Get statistics for readings of a device.
+        Get statistics for readings of a device, with its calibration offset applied.
+
+        With use_rollups the aggregates are read from the rollup tables instead of
+        scanning raw readings.
         """
-        # Get device first to determine offset
-        device = await crud_device.get(db, id=device_id)
-        offset = 0.0
-        if device:
-            offset = (
-                device.temperature_offset
-                if reading_type == ReadingType.TEMPERATURE
-                else device.humidity_offset
-            ) or 0.0
-
-        # Build query for statistics
+        if use_rollups:
+            query = self._rollup_aggregates(
+                reading_type=reading_type,
+                start_date=start_date,
+                end_date=end_date,
+                device_id=device_id,
+            )
+            stats = (await db.execute(query)).one_or_none()
+            if stats is None:
+                return {"min": 0.0, "max": 0.0, "avg": 0.0, "count": 0}
+            return {
+                "min": float(stats.min),
+                "max": float(stats.max),
+                "avg": float(stats.avg),
+                "count": int(stats.count),
+            }
+
+        # Build query for statistics; the offset is constant for the device and type
+        value = Reading.value + calibration_offset(reading_type)
         query = select(
-            func.min(Reading.value).label("min"),
-            func.max(Reading.value).label("max"),
-            func.avg(Reading.value).label("avg"),
+            func.min(value).label("min"),
+            func.max(value).label("max"),
+            func.avg(value).label("avg"),
             func.count(Reading.id).label("count"),
-        ).where(
+        ).outerjoin(Device, Device.id == Reading.device_id).where(
             and_(
                 Reading.device_id == device_id,
                 Reading.reading_type == reading_type,
@@ -277,25 +746,64 @@ class CRUDReading(CRUDBase[Reading, ReadingCreate, ReadingUpdate]):
         result = await db.execute(query)
         stats = result.one()
 
-        # Convert values, applying offset to non-null values
-        def safe_float_with_offset(value: Any) -> float:
+        # Convert values; no readings yields NULL aggregates
+        def safe_float(value: Any) -> float:
             if value is None:
                 return 0.0
             try:
                 float_val = float(value)
                 if float_val != float_val:  # NaN check
                     return 0.0
-                return float_val + offset
+                return float_val
             except (ValueError, TypeError):
                 return 0.0
 
         return {
-            "min": safe_float_with_offset(stats.min),
-            "max": safe_float_with_offset(stats.max),
-            "avg": safe_float_with_offset(stats.avg),
+            "min": safe_float(stats.min),
+            "max": safe_float(stats.max),
+            "avg": safe_float(stats.avg),
             "count": int(stats.count),
         }
 
+    async def get_rollups(
+        self,
+        db: AsyncSession,
+        *,
+        device_id: int,
+        resolution: int,
+        reading_type: Optional[ReadingType] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> List[ReadingRollup]:
+        """
+        Get rollup buckets for a device, e.g. for charts.
+
+        Args:
+            db: Database session
+            device_id: Device ID
+            resolution: Bucket width in seconds (one of ROLLUP_RESOLUTIONS)
+            reading_type: Optional reading type filter
+            start_date: Only buckets starting at or after this date
+            end_date: Only buckets starting at or before this date
+
+        Returns:
+            List[ReadingRollup]: Buckets ordered by time
+        """
+        query = select(ReadingRollup).where(
+            ReadingRollup.device_id == device_id,
+            ReadingRollup.resolution == resolution,
+        )
+        if reading_type is not None:
+            query = query.where(ReadingRollup.reading_type == reading_type)
+        if start_date:
+            query = query.where(ReadingRollup.bucket >= start_date)
+        if end_date:
+            query = query.where(ReadingRollup.bucket <= end_date)
+
+        query = query.order_by(ReadingRollup.bucket.asc())
+        result = await db.execute(query)
+        return list(result.scalars().all())
+
     async def get_readings_by_type(
         self,
         db: AsyncSession,
@@ -305,9 +813,14 @@ class CRUDReading(CRUDBase[Reading, ReadingCreate, ReadingUpdate]):
         limit: int = 100,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
-    ) -> List[Reading]:
+        after: Optional[tuple[datetime, int]] = None,
+    ) -> List[Row]:
         """
-        Get readings by type across all devices.
+        Get calibrated readings by type across all devices, newest first.
+
+        Pages can be fetched by offset (`skip`) or, at constant cost however deep,
+        by keyset: pass the `(timestamp, id)` of the last row of the previous page
+        as `after`.
 
         Args:
             db: Database session
@@ -316,11 +829,12 @@ class CRUDReading(CRUDBase[Reading, ReadingCreate, ReadingUpdate]):
             limit: Maximum number of records to return
             start_date: Filter readings after this date
             end_date: Filter readings before this date
+            after: Only return readings ordered after this (timestamp, id)
 
         Returns:
-            List[Reading]: List of readings
+            List[Row]: List of readings with the calibrated value
         """
-        query = select(Reading).where(
+        query = calibrated_readings().where(
             and_(Reading.reading_type == reading_type, self._valid_value_filters())
         )
 
@@ -329,9 +843,16 @@ class CRUDReading(CRUDBase[Reading, ReadingCreate, ReadingUpdate]):
         if end_date:
             query = query.where(Reading.timestamp <= end_date)
 
-        query = query.order_by(Reading.timestamp.desc()).offset(skip).limit(limit)
+        if after is not None:
+            query = query.where(tuple_(Reading.timestamp, Reading.id) < tuple_(*after))
+
+        query = (
+            query.order_by(Reading.timestamp.desc(), Reading.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
         result = await db.execute(query)
-        return list(result.scalars().all())
+        return list(result.all())
 
     async def get_device_averages(
         self,
@@ -340,45 +861,79 @@ class CRUDReading(CRUDBase[Reading, ReadingCreate, ReadingUpdate]):
         reading_type: ReadingType,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
-    ) -> List[tuple[int, float]]:
+        owner_id: Optional[int] = None,
+        use_rollups: bool = False,
+    ) -> List[Row]:
         """
-        Get average readings by device.
+        Get calibrated average readings by device, with the device identifiers.
+
+        With `owner_id` only that owner's devices are aggregated, so the cost
+        scales with the owner's devices rather than the whole fleet.
 
         Args:
             db: Database session
             reading_type: Type of reading
             start_date: Start date for average
             end_date: End date for average
+            owner_id: Only average the devices of this owner
+            use_rollups: Read the aggregates from the rollup tables
 
         Returns:
-            List[tuple]: List of (device_id, average) tuples
+            List[Row]: Rows of (internal_id, device_id, name, average), ordered by
+                internal ID
         """
+        if use_rollups:
+            aggregates = self._rollup_aggregates(
+                reading_type=reading_type,
+                start_date=start_date,
+                end_date=end_date,
+                owner_id=owner_id,
+            ).subquery()
+            query = (
+                select(
+                    aggregates.c.device_id.label("internal_id"),
+                    Device.device_id,
+                    Device.name,
+                    aggregates.c.avg.label("average"),
+                )
+                .join(Device, Device.id == aggregates.c.device_id)
+                .order_by(aggregates.c.device_id)
+            )
+            result = await db.execute(query)
+            return list(result.all())
+
+        offset = calibration_offset(reading_type)
         query = (
             select(
-                Reading.device_id,
-                func.avg(Reading.value).label("average"),
-                func.count(Reading.value).label("count"),
+                Reading.device_id.label("internal_id"),
+                Device.device_id,
+                Device.name,
+                (func.avg(Reading.value) + offset).label("average"),
             )
+            .join(Device, Device.id == Reading.device_id)
             .where(
                 and_(Reading.reading_type == reading_type, self._valid_value_filters())
             )
-            .group_by(Reading.device_id)
+            .group_by(
+                Reading.device_id,
+                Device.device_id,
+                Device.name,
+                Device.temperature_offset,
+                Device.humidity_offset,
+            )
             .having(func.count(Reading.value) > 0)  # Only include devices with readings
+            .order_by(Reading.device_id)
         )
 
+        if owner_id is not None:
+            query = query.where(Device.owner_id == owner_id)
         if start_date:
             query = query.where(Reading.timestamp >= start_date)
         if end_date:
             query = query.where(Reading.timestamp <= end_date)
 
         result = await db.execute(query)
-        rows = result.all()
-
-        # Convert to list of tuples, handling NULL averages
-        return [
-            (r.device_id, float(r.average) if r.average is not None else 0.0)
-            for r in rows
-        ]
+        return list(result.all())
 
 
 # Create singleton instance for use across the application
@@ -82,6 +82,9 @@ def create_application() -> FastAPI:
             allow_credentials=True,
             allow_methods=["*"],
             allow_headers=["*"],
+            # Browsers hide non-safelisted response headers from cross-origin
+            # scripts unless they are exposed; the readings endpoint pages with it.
+            expose_headers=["X-Next-Cursor"],
         )
 
     # Include API router
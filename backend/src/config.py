@@ -6,7 +6,7 @@ This module defines the Config class, which loads configuration from environment
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
-from typing import Optional
+from typing import Literal, Optional
 import os
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -40,11 +40,137 @@ class Settings(BaseSettings):
     MQTT_USERNAME: Optional[str] = Field(default=None)
     MQTT_PASSWORD: Optional[str] = Field(default=None)
     MQTT_TOPIC: str = Field(default="harvco/+/sensor/+/state")
+    MQTT_SHARED_GROUP: Optional[str] = Field(
+        default=None,
+        description="Shared subscription group; replicas in the same group split the message load",
+    )
+    MQTT_CLIENT_ID: Optional[str] = Field(
+        default=None,
+        description="MQTT client identifier; defaults to a per-replica hostname/pid id",
+    )
 
     RECONNECT_INTERVAL: int = Field(
         default=5,
         description="Interval in seconds before reconnecting after a connection loss",
     )
 
+    # Ingestion batching
+    INGEST_BATCH_SIZE: int = Field(
+        default=500,
+        description="Number of buffered readings that triggers a bulk insert",
+    )
+    INGEST_FLUSH_INTERVAL: float = Field(
+        default=1.0,
+        description="Maximum seconds a buffered reading waits before being flushed",
+    )
+    INGEST_QUEUE_SIZE: int = Field(
+        default=10000,
+        description="Total capacity of the partition queues between the MQTT receive loop and the workers",
+    )
+    INGEST_WORKERS: int = Field(
+        default=2,
+        description="Number of device-hash partitions, each with its own worker",
+    )
+    INGEST_WORKER_BATCH_SIZE: int = Field(
+        default=100,
+        description="Maximum queued messages a worker drains and processes together",
+    )
+    INGEST_SHUTDOWN_TIMEOUT: float = Field(
+        default=30.0,
+        description="Seconds to wait on shutdown for the workers to process readings still queued",
+    )
+    INGEST_STATS_INTERVAL: float = Field(
+        default=60.0,
+        description="Seconds between ingestion statistics log lines",
+    )
+
+    # Local spool for readings the database could not accept
+    SPOOL_DIR: Optional[str] = Field(
+        default=None,
+        description="Directory for the on-disk spool; spooling is disabled when unset",
+    )
+    SPOOL_SEGMENT_BYTES: int = Field(
+        default=16 * 1024 * 1024,
+        description="Size in bytes after which a spool segment is rotated",
+    )
+    SPOOL_FSYNC: Literal["always", "rotate", "never"] = Field(
+        default="always",
+        description="When spool writes are fsynced: every append, on segment rotation, or never",
+    )
+    SPOOL_MAX_PENDING: Optional[int] = Field(
+        default=None,
+        description="Buffered readings above which a lagging writer spills to the spool (default 10x INGEST_BATCH_SIZE)",
+    )
+    SPOOL_REPLAY_BATCH_SIZE: int = Field(
+        default=5000,
+        description="Rows per INSERT when replaying the spool",
+    )
+    SPOOL_REPLAY_INTERVAL: float = Field(
+        default=10.0,
+        description="Seconds between spool replay attempts",
+    )
+
+    INGEST_SKIP_RETAINED: bool = Field(
+        default=True,
+        description="Ignore retained MQTT messages, which replay already-ingested values on reconnect",
+    )
+
+    DEADBAND_THRESHOLDS: dict[str, float] = Field(
+        default={},
+        description='Deadband per reading type as JSON, e.g. {"temperature": 0.1, "humidity": 0.5}; empty disables the filter',
+    )
+    DEADBAND_DEVICE_THRESHOLDS: dict[str, dict[str, float]] = Field(
+        default={},
+        description='Per device overrides of DEADBAND_THRESHOLDS as JSON, e.g. {"62ba71": {"temperature": 0.05}}',
+    )
+    DEADBAND_HEARTBEAT: float = Field(
+        default=300.0,
+        description="Seconds after which a reading is stored even if it is within the deadband",
+    )
+
+    READINGS_PARTITION_INTERVAL: Literal["day", "week", "month"] = Field(
+        default="month",
+        description="Period covered by each readings partition (PostgreSQL only)",
+    )
+    READINGS_PARTITIONS_AHEAD: int = Field(
+        default=3,
+        description="Number of future readings partitions kept pre-created",
+    )
+    READINGS_RETENTION_PERIODS: Optional[int] = Field(
+        default=None,
+        description="Full partition periods of readings to keep before the current one; older partitions are dropped (None keeps everything)",
+    )
+    PARTITION_MAINTENANCE_INTERVAL: float = Field(
+        default=6 * 3600.0,
+        description="Seconds between partition maintenance runs",
+    )
+
+    READINGS_MAINTAIN_ROLLUPS: bool = Field(
+        default=True,
+        description="Maintain the reading_rollups tables as readings are ingested",
+    )
+    READINGS_USE_ROLLUPS: bool = Field(
+        default=False,
+        description="Serve statistics and averages from reading_rollups; enable once rollups are backfilled (scripts/rebuild_rollups.py)",
+    )
+    READINGS_MAINTAIN_LATEST: bool = Field(
+        default=True,
+        description="Upsert the device_latest table as readings are ingested",
+    )
+    READINGS_USE_LATEST: bool = Field(
+        default=False,
+        description="Serve latest-reading lookups from device_latest; enable once every writer maintains it",
+    )
+
+    READINGS_EXPORT_BATCH_SIZE: int = Field(
+        default=5000,
+        description="Rows fetched from the server-side cursor and emitted per chunk by GET /readings/export",
+    )
+
+    DEVICE_CACHE_SIZE: int = Field(
+        default=10000,
+        description="Maximum number of device ids kept in the ingestion device cache",
+    )
+
 
 settings = Settings()
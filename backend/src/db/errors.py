@@ -0,0 +1,17 @@
+"""
+Classification of database errors.
+
+Connection-level failures (the database is down, restarting or unreachable) are
+transient: the same statement succeeds once the database is back, so the ingestion
+path spools and retries it. Any other error, such as a constraint violation, bad
+data or a row outside every partition, fails again however often it is retried.
+"""
+
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+
+
+def is_transient(error: BaseException) -> bool:
+    """Return whether `error` is a connection-level failure worth retrying."""
+    if isinstance(error, (OperationalError, InterfaceError, OSError)):
+        return True
+    return isinstance(error, DBAPIError) and error.connection_invalidated
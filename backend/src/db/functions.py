@@ -0,0 +1,78 @@
+"""
+Portable SQL functions for time bucketing and value checks.
+
+PostgreSQL and SQLite (used in tests) spell epoch extraction, flooring and NaN
+checks differently; these constructs compile to the right form for each dialect.
+"""
+
+from sqlalchemy import Boolean, Float, Integer
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class epoch(FunctionElement):
+    """Seconds since the Unix epoch of a timestamp, as a float."""
+
+    type = Float()
+    name = "epoch"
+    inherit_cache = True
+
+
+@compiles(epoch)
+def _compile_epoch(element, compiler, **kw):
+    return f"EXTRACT(EPOCH FROM {compiler.process(element.clauses, **kw)})"
+
+
+@compiles(epoch, "sqlite")
+def _compile_epoch_sqlite(element, compiler, **kw):
+    # julianday() loses sub-millisecond precision at current dates; build the value
+    # from whole seconds plus the fractional part of the seconds field instead
+    value = compiler.process(element.clauses, **kw)
+    return (
+        f"(CAST(strftime('%s', {value}) AS REAL)"
+        f" + CAST(strftime('%f', {value}) AS REAL)"
+        f" - CAST(strftime('%S', {value}) AS INTEGER))"
+    )
+
+
+class floor(FunctionElement):
+    """Largest integer not greater than the argument."""
+
+    type = Integer()
+    name = "floor"
+    inherit_cache = True
+
+
+@compiles(floor)
+def _compile_floor(element, compiler, **kw):
+    return f"FLOOR({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(floor, "sqlite")
+def _compile_floor_sqlite(element, compiler, **kw):
+    # FLOOR() is only available when SQLite is built with math functions
+    value = compiler.process(element.clauses, **kw)
+    return f"(CAST({value} AS INTEGER) - ({value} < CAST({value} AS INTEGER)))"
+
+
+class not_nan(FunctionElement):
+    """True unless the float argument is NaN."""
+
+    type = Boolean()
+    name = "not_nan"
+    inherit_cache = True
+
+
+@compiles(not_nan)
+def _compile_not_nan(element, compiler, **kw):
+    # IEEE comparison: NaN is the only value not equal to itself (SQLite stores
+    # NaN as NULL, which this excludes as well)
+    value = compiler.process(element.clauses, **kw)
+    return f"({value} = {value})"
+
+
+@compiles(not_nan, "postgresql")
+def _compile_not_nan_postgresql(element, compiler, **kw):
+    # PostgreSQL treats NaN as equal to itself (and greater than every other
+    # value), so `x = x` holds for NaN; compare against it explicitly
+    return f"({compiler.process(element.clauses, **kw)} <> 'NaN'::float8)"
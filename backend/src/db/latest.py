@@ -0,0 +1,91 @@
+"""
+Maintenance of the `device_latest` table.
+
+Every write of readings upserts one row per (device, reading type) in the same
+transaction. The value and timestamp only move forward in time, so late or
+replayed readings never replace a newer one, while `last_seen` records every
+delivery. Latest-value lookups then become primary key reads.
+"""
+
+import math
+from datetime import UTC, datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.rollups import as_utc
+from db.upsert import dialect_insert
+from models.device_latest import DeviceLatest
+
+
+def latest_rows(rows: Iterable[tuple], seen_at: datetime) -> list[dict]:
+    """Reduce reading rows to the newest reading per device and reading type.
+
+    Of several readings with the same timestamp, the first is kept, matching the
+    ON CONFLICT DO NOTHING insert of the readings themselves.
+
+    Args:
+        rows: `(device_id, reading_type, value, timestamp)` tuples
+        seen_at (datetime): Delivery time recorded as `last_seen`
+
+    Returns:
+        list[dict]: `device_latest` column values, sorted by primary key so
+            concurrent writers lock rows in the same order
+    """
+    latest: dict[tuple, tuple] = {}
+    for device_id, reading_type, value, timestamp in rows:
+        if value is None or not math.isfinite(value):
+            continue
+        timestamp = as_utc(timestamp)
+        current = latest.get((device_id, reading_type))
+        if current is None or timestamp > current[1]:
+            latest[(device_id, reading_type)] = (value, timestamp)
+
+    return [
+        {
+            "device_id": device_id,
+            "reading_type": reading_type,
+            "value": value,
+            "timestamp": timestamp,
+            "last_seen": seen_at,
+        }
+        for (device_id, reading_type), (value, timestamp) in sorted(
+            latest.items(), key=lambda item: (item[0][0], str(item[0][1]))
+        )
+    ]
+
+
+async def apply_latest(
+    session: AsyncSession, rows: Iterable[tuple], *, seen_at: Optional[datetime] = None
+) -> int:
+    """Upsert the newest of `rows` into `device_latest`. Does not commit.
+
+    Args:
+        session (AsyncSession): Session of the transaction writing the readings
+        rows: `(device_id, reading_type, value, timestamp)` tuples
+        seen_at (Optional[datetime]): Delivery time (default: now)
+
+    Returns:
+        int: Number of `device_latest` rows upserted
+    """
+    params = latest_rows(rows, seen_at or datetime.now(UTC))
+    if not params:
+        return 0
+
+    stmt = dialect_insert(session, DeviceLatest)
+    new = stmt.excluded
+    newer = new.timestamp > DeviceLatest.timestamp
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DeviceLatest.device_id, DeviceLatest.reading_type],
+        set_={
+            "value": case((newer, new.value), else_=DeviceLatest.value),
+            "timestamp": case((newer, new.timestamp), else_=DeviceLatest.timestamp),
+            "last_seen": case(
+                (new.last_seen > DeviceLatest.last_seen, new.last_seen),
+                else_=DeviceLatest.last_seen,
+            ),
+        },
+    )
+    await session.execute(stmt, params)
+    return len(params)
@@ -0,0 +1,269 @@
+"""
+Range partition management for the readings table.
+
+On PostgreSQL `readings` is range partitioned on `timestamp`, one partition per
+period (a month by default). Partitions are named after the first day they cover,
+e.g. `readings_p20240101`. The maintenance task pre-creates partitions ahead of time
+and, if a retention period is configured, drops whole partitions that have aged out.
+
+Rows outside every range partition (a historical timestamp, a spool replay after a
+retention drop, or a stalled maintenance task) land in the DEFAULT partition
+`readings_default` instead of failing the insert. When a range partition is created
+for a period that already has rows in the default partition, those rows are moved
+into it. Retention never drops the default partition.
+
+Expired partitions are detached before they are dropped, each step in its own short
+transaction, so the lock on `readings` is held only for the catalog update rather
+than for the whole drop. `DETACH PARTITION ... CONCURRENTLY` would avoid even that,
+but PostgreSQL does not allow it while a default partition exists.
+
+Other databases (SQLite in tests) use an unpartitioned table; every function here is
+a no-op for them.
+"""
+
+import asyncio
+import logging
+import re
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "readings"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+INTERVALS = ("day", "week", "month")
+
+# How long a detach waits for the lock on `readings` before giving up until the next
+# run, so it never queues ingestion behind a long-running query
+DETACH_LOCK_TIMEOUT = "5s"
+
+_BOUND_PATTERN = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+@dataclass(frozen=True)
+class Partition:
+    """A range partition of `readings` covering [start, end)."""
+
+    name: str
+    start: datetime
+    end: datetime
+
+
+def period_start(moment: datetime, interval: str) -> datetime:
+    """Return the start (UTC midnight) of the period containing `moment`.
+
+    Weeks start on Monday.
+    """
+    if interval not in INTERVALS:
+        raise ValueError(f"Invalid partition interval: {interval}")
+    moment = moment.astimezone(UTC) if moment.tzinfo else moment.replace(tzinfo=UTC)
+    start = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "week":
+        start -= timedelta(days=start.weekday())
+    elif interval == "month":
+        start = start.replace(day=1)
+    return start
+
+
+def next_period(start: datetime, interval: str) -> datetime:
+    """Return the start of the period following the one starting at `start`."""
+    if interval == "day":
+        return start + timedelta(days=1)
+    if interval == "week":
+        return start + timedelta(weeks=1)
+    if interval == "month":
+        if start.month == 12:
+            return start.replace(year=start.year + 1, month=1)
+        return start.replace(month=start.month + 1)
+    raise ValueError(f"Invalid partition interval: {interval}")
+
+
+def partition_name(start: datetime) -> str:
+    """Return the partition table name for a period starting at `start`."""
+    return f"{PARENT_TABLE}_p{start:%Y%m%d}"
+
+
+def parse_bounds(expression: str) -> Optional[tuple[datetime, datetime]]:
+    """Parse a `pg_get_expr(relpartbound)` expression into (start, end).
+
+    Returns None for the DEFAULT partition.
+    """
+    match = _BOUND_PATTERN.search(expression)
+    if match is None:
+        return None
+    return tuple(datetime.fromisoformat(bound).astimezone(UTC) for bound in match.groups())
+
+
+def create_partition_statements(
+    name: str, start: datetime, end: datetime, *, move_from_default: bool
+) -> list[str]:
+    """Return the statements creating the partition `name` for [start, end).
+
+    PostgreSQL refuses to create a partition while the default partition holds rows
+    in its range, so with `move_from_default` the default partition is detached,
+    its rows in the range are moved into the new partition, and it is reattached.
+    """
+    create = (
+        f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF {PARENT_TABLE} '
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+    if not move_from_default:
+        return [create]
+
+    in_range = f""""timestamp" >= '{start.isoformat()}' AND "timestamp" < '{end.isoformat()}'"""
+    columns = 'id, device_id, reading_type, value, "timestamp"'
+    return [
+        f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{DEFAULT_PARTITION}"',
+        create,
+        f'INSERT INTO {PARENT_TABLE} ({columns}) '
+        f'SELECT {columns} FROM "{DEFAULT_PARTITION}" WHERE {in_range}',
+        f'DELETE FROM "{DEFAULT_PARTITION}" WHERE {in_range}',
+        f'ALTER TABLE {PARENT_TABLE} ATTACH PARTITION "{DEFAULT_PARTITION}" DEFAULT',
+    ]
+
+
+def _is_postgres(session: AsyncSession) -> bool:
+    return session.get_bind().dialect.name == "postgresql"
+
+
+async def list_partitions(session: AsyncSession) -> list[Partition]:
+    """Return the range partitions of `readings`, ordered by start."""
+    if not _is_postgres(session):
+        return []
+    result = await session.execute(
+        text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :parent"
+        ),
+        {"parent": PARENT_TABLE},
+    )
+    partitions = []
+    for name, expression in result.all():
+        bounds = parse_bounds(expression)
+        if bounds is not None:
+            partitions.append(Partition(name, *bounds))
+    return sorted(partitions, key=lambda partition: partition.start)
+
+
+async def ensure_partitions(
+    session: AsyncSession,
+    *,
+    interval: str,
+    periods_ahead: int,
+    now: Optional[datetime] = None,
+) -> list[str]:
+    """Create partitions from the current period up to `periods_ahead` periods ahead.
+
+    Periods overlapping an existing partition are skipped, so changing the interval
+    only affects partitions created after the last existing one. The default
+    partition is created if missing, and rows it holds for a new period are moved
+    into that period's partition.
+
+    Returns:
+        list[str]: Names of the partitions created
+    """
+    if not _is_postgres(session):
+        return []
+
+    await session.execute(text(
+        f'CREATE TABLE IF NOT EXISTS "{DEFAULT_PARTITION}" PARTITION OF {PARENT_TABLE} DEFAULT'
+    ))
+    existing = await list_partitions(session)
+    start = period_start(now or datetime.now(UTC), interval)
+    created = []
+    for _ in range(periods_ahead + 1):
+        end = next_period(start, interval)
+        if not any(p.start < end and start < p.end for p in existing):
+            name = partition_name(start)
+            stranded = await session.scalar(
+                text(
+                    f'SELECT EXISTS (SELECT 1 FROM "{DEFAULT_PARTITION}" '
+                    'WHERE "timestamp" >= :start AND "timestamp" < :end)'
+                ),
+                {"start": start, "end": end},
+            )
+            for statement in create_partition_statements(
+                name, start, end, move_from_default=stranded
+            ):
+                await session.execute(text(statement))
+            if stranded:
+                logger.warning(f"Moved readings from {DEFAULT_PARTITION} into new partition {name}")
+            created.append(name)
+        start = end
+    await session.commit()
+
+    for name in created:
+        logger.info(f"Created partition {name}")
+    return created
+
+
+async def drop_expired_partitions(
+    session: AsyncSession,
+    *,
+    interval: str,
+    retention_periods: int,
+    now: Optional[datetime] = None,
+) -> list[str]:
+    """Drop partitions that end before the retention window.
+
+    The retention window is the current period plus `retention_periods` full
+    periods before it. Each partition is detached in one transaction and dropped in
+    the next; a partition that cannot be locked within `DETACH_LOCK_TIMEOUT` is left
+    for the next run.
+
+    Returns:
+        list[str]: Names of the partitions dropped
+    """
+    if not _is_postgres(session):
+        return []
+
+    cutoff = period_start(now or datetime.now(UTC), interval)
+    for _ in range(retention_periods):
+        cutoff = period_start(cutoff - timedelta(days=1), interval)
+
+    dropped = []
+    for partition in await list_partitions(session):
+        if partition.end <= cutoff:
+            await session.execute(text(f"SET LOCAL lock_timeout = '{DETACH_LOCK_TIMEOUT}'"))
+            await session.execute(text(
+                f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{partition.name}"'
+            ))
+            await session.commit()
+            # Detached, the table is no longer part of readings: dropping it only
+            # locks the table itself
+            await session.execute(text(f'DROP TABLE IF EXISTS "{partition.name}"'))
+            await session.commit()
+            dropped.append(partition.name)
+
+    for name in dropped:
+        logger.info(f"Dropped expired partition {name}")
+    return dropped
+
+
+async def maintain_partitions(
+    session_factory,
+    *,
+    interval: str,
+    periods_ahead: int,
+    retention_periods: Optional[int],
+    check_interval: float,
+) -> None:
+    """Periodically create upcoming partitions and drop expired ones until cancelled."""
+    while True:
+        try:
+            async with session_factory() as session:
+                await ensure_partitions(session, interval=interval, periods_ahead=periods_ahead)
+                if retention_periods is not None:
+                    await drop_expired_partitions(
+                        session, interval=interval, retention_periods=retention_periods
+                    )
+        except Exception as e:
+            logger.error(f"Partition maintenance failed: {e}")
+        await asyncio.sleep(check_interval)
@@ -0,0 +1,235 @@
+"""
+Incremental maintenance of the reading rollup tables.
+
+Every inserted reading is folded into one bucket per resolution in
+`reading_rollups` (min, max, sum, count, first and last value), in the same
+transaction as the insert. Late-arriving readings update only the buckets they fall
+into. `rebuild_rollups` recomputes a time range from raw readings, for backfilling
+existing data or repairing rows written outside the ingestion path.
+"""
+
+import logging
+import math
+from datetime import UTC, datetime, timedelta
+from typing import Iterable, Optional, Union
+
+from sqlalchemy import case, delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.functions import not_nan
+from db.upsert import dialect_insert
+from models.reading import Reading
+from models.rollup import ROLLUP_RESOLUTIONS, ReadingRollup
+
+logger = logging.getLogger(__name__)
+
+RollupSegment = tuple[Optional[int], Optional[datetime], Optional[datetime]]
+
+
+def as_utc(moment: datetime) -> datetime:
+    """Return `moment` as an aware UTC datetime; naive datetimes are taken as UTC."""
+    return moment.astimezone(UTC) if moment.tzinfo else moment.replace(tzinfo=UTC)
+
+
+def floor_bucket(moment: datetime, resolution: int) -> datetime:
+    """Return the start of the `resolution`-second bucket containing `moment`."""
+    epoch = as_utc(moment).timestamp()
+    return datetime.fromtimestamp(epoch // resolution * resolution, UTC)
+
+
+def ceil_bucket(moment: datetime, resolution: int) -> datetime:
+    """Return the first bucket boundary at or after `moment`."""
+    start = floor_bucket(moment, resolution)
+    return start if start == as_utc(moment) else start + timedelta(seconds=resolution)
+
+
+def aggregate_rows(rows: Iterable[tuple]) -> list[dict]:
+    """Aggregate reading rows into rollup rows for every resolution.
+
+    Args:
+        rows: `(device_id, reading_type, value, timestamp)` tuples
+
+    Returns:
+        list[dict]: Rollup column values, sorted by primary key so concurrent
+            writers lock rollup rows in the same order
+    """
+    buckets: dict[tuple, list] = {}
+    for device_id, reading_type, value, timestamp in rows:
+        if value is None or not math.isfinite(value):
+            continue
+        timestamp = as_utc(timestamp)
+        epoch = timestamp.timestamp()
+        for resolution in ROLLUP_RESOLUTIONS:
+            bucket = datetime.fromtimestamp(epoch // resolution * resolution, UTC)
+            key = (resolution, device_id, reading_type, bucket)
+            agg = buckets.get(key)
+            if agg is None:
+                buckets[key] = [value, value, value, 1, timestamp, value, timestamp, value]
+                continue
+            agg[0] = min(agg[0], value)
+            agg[1] = max(agg[1], value)
+            agg[2] += value
+            agg[3] += 1
+            if timestamp < agg[4]:
+                agg[4], agg[5] = timestamp, value
+            if timestamp >= agg[6]:
+                agg[6], agg[7] = timestamp, value
+
+    return [
+        {
+            "resolution": resolution,
+            "device_id": device_id,
+            "reading_type": reading_type,
+            "bucket": bucket,
+            "min_value": agg[0],
+            "max_value": agg[1],
+            "sum_value": agg[2],
+            "count": agg[3],
+            "first_timestamp": agg[4],
+            "first_value": agg[5],
+            "last_timestamp": agg[6],
+            "last_value": agg[7],
+        }
+        for (resolution, device_id, reading_type, bucket), agg in sorted(
+            buckets.items(), key=lambda item: (item[0][0], item[0][1], str(item[0][2]), item[0][3])
+        )
+    ]
+
+
+async def apply_rollups(session: AsyncSession, rows: Iterable[tuple]) -> int:
+    """Fold newly inserted readings into the rollup buckets. Does not commit.
+
+    Args:
+        session (AsyncSession): Session of the transaction that inserted the readings
+        rows: `(device_id, reading_type, value, timestamp)` tuples of inserted readings
+
+    Returns:
+        int: Number of rollup rows upserted
+    """
+    params = aggregate_rows(rows)
+    if not params:
+        return 0
+
+    stmt = dialect_insert(session, ReadingRollup)
+    new = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            ReadingRollup.resolution,
+            ReadingRollup.device_id,
+            ReadingRollup.reading_type,
+            ReadingRollup.bucket,
+        ],
+        set_={
+            "min_value": case(
+                (new.min_value < ReadingRollup.min_value, new.min_value),
+                else_=ReadingRollup.min_value,
+            ),
+            "max_value": case(
+                (new.max_value > ReadingRollup.max_value, new.max_value),
+                else_=ReadingRollup.max_value,
+            ),
+            "sum_value": ReadingRollup.sum_value + new.sum_value,
+            "count": ReadingRollup.count + new.count,
+            "first_timestamp": case(
+                (new.first_timestamp < ReadingRollup.first_timestamp, new.first_timestamp),
+                else_=ReadingRollup.first_timestamp,
+            ),
+            "first_value": case(
+                (new.first_timestamp < ReadingRollup.first_timestamp, new.first_value),
+                else_=ReadingRollup.first_value,
+            ),
+            "last_timestamp": case(
+                (new.last_timestamp >= ReadingRollup.last_timestamp, new.last_timestamp),
+                else_=ReadingRollup.last_timestamp,
+            ),
+            "last_value": case(
+                (new.last_timestamp >= ReadingRollup.last_timestamp, new.last_value),
+                else_=ReadingRollup.last_value,
+            ),
+        },
+    )
+    await session.execute(stmt, params)
+    return len(params)
+
+
+def rollup_segments(
+    start: Optional[datetime], end: Optional[datetime]
+) -> list[RollupSegment]:
+    """Split the half-open range [start, end) into rollup-aligned segments.
+
+    The interior is covered by the coarsest buckets that fit, with progressively
+    finer buckets towards the edges and raw readings for the unaligned remainder.
+    A None bound is open-ended.
+
+    Returns:
+        list[RollupSegment]: `(resolution, lo, hi)` in time order; a resolution of
+            None means the segment must be read from raw readings
+    """
+
+    def cover(lo, hi, resolutions) -> list[RollupSegment]:
+        if lo is not None and hi is not None and lo >= hi:
+            return []
+        if not resolutions:
+            return [(None, lo, hi)]
+        resolution, finer = resolutions[0], resolutions[1:]
+        aligned_lo = None if lo is None else ceil_bucket(lo, resolution)
+        aligned_hi = None if hi is None else floor_bucket(hi, resolution)
+        if aligned_lo is not None and aligned_hi is not None and aligned_lo >= aligned_hi:
+            return cover(lo, hi, finer)
+        head = [] if lo is None else cover(lo, aligned_lo, finer)
+        tail = [] if hi is None else cover(aligned_hi, hi, finer)
+        return head + [(resolution, aligned_lo, aligned_hi)] + tail
+
+    return cover(
+        None if start is None else as_utc(start),
+        None if end is None else as_utc(end),
+        sorted(ROLLUP_RESOLUTIONS, reverse=True),
+    )
+
+
+async def rebuild_rollups(
+    session: AsyncSession,
+    *,
+    start: Union[datetime, None] = None,
+    end: Union[datetime, None] = None,
+    batch_size: int = 10000,
+) -> int:
+    """Recompute rollups from raw readings for whole UTC days covering [start, end).
+
+    Args:
+        session (AsyncSession): Database session; committed on success
+        start (Optional[datetime]): Start of the range (default: all history)
+        end (Optional[datetime]): End of the range (default: no upper bound)
+        batch_size (int): Readings aggregated per upsert
+
+    Returns:
+        int: Number of readings folded into the rollups
+    """
+    day = max(ROLLUP_RESOLUTIONS)
+    lo = None if start is None else floor_bucket(start, day)
+    hi = None if end is None else ceil_bucket(end, day)
+
+    rollup_filters, reading_filters = [], [not_nan(Reading.value)]
+    if lo is not None:
+        rollup_filters.append(ReadingRollup.bucket >= lo)
+        reading_filters.append(Reading.timestamp >= lo)
+    if hi is not None:
+        rollup_filters.append(ReadingRollup.bucket < hi)
+        reading_filters.append(Reading.timestamp < hi)
+    await session.execute(delete(ReadingRollup).where(*rollup_filters))
+
+    query = (
+        select(Reading.device_id, Reading.reading_type, Reading.value, Reading.timestamp)
+        .where(*reading_filters)
+        .order_by(Reading.timestamp)
+        .execution_options(yield_per=batch_size)
+    )
+    total = 0
+    result = await session.stream(query)
+    async for partition in result.partitions():
+        await apply_rollups(session, partition)
+        total += len(partition)
+    await session.commit()
+
+    logger.info(f"Rebuilt rollups from {total} readings between {lo} and {hi}")
+    return total
@@ -14,14 +14,18 @@ from sqlalchemy.ext.asyncio import (
 
 from config import settings
 
-# Create async engine
+# Create async engine (SQLite, used for local testing, does not take pool sizing options)
+pool_options = (
+    {}
+    if settings.DATABASE_URL.startswith("sqlite")
+    else {"pool_size": 20, "max_overflow": 10}
+)
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.SQLALCHEMY_ECHO,
     pool_pre_ping=True,
-    pool_size=20,
-    max_overflow=10,
     pool_recycle=3600,
+    **pool_options,
 )
 
 # Create async session factory
@@ -0,0 +1,28 @@
+"""
+Dialect-aware INSERT helpers.
+
+PostgreSQL and SQLite both support `INSERT ... ON CONFLICT`, but SQLAlchemy exposes
+it through dialect-specific `insert()` constructs. These helpers pick the right one
+for the connection in use.
+"""
+
+from typing import Union
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+
+def dialect_insert(bind: Union[AsyncSession, AsyncConnection], table):
+    """Return an `insert()` for `table` that supports `on_conflict_*` on this dialect.
+
+    Args:
+        bind: Session or connection the statement will be executed on
+        table: Model class or Table to insert into
+
+    Returns:
+        Insert: A PostgreSQL or SQLite dialect insert construct
+    """
+    engine = bind.get_bind() if isinstance(bind, AsyncSession) else bind.sync_engine
+    if engine.dialect.name == "sqlite":
+        return sqlite.insert(table)
+    return postgresql.insert(table)
@@ -0,0 +1,248 @@
+"""
+Buffered bulk writer for sensor readings.
+
+Rows are plain tuples in `READING_COLUMNS` order, which keeps the per-message hot
+path free of dict, Pydantic and ORM object construction.
+
+Readings produced by all message workers are accumulated in memory and written to
+the database as a single multi-row INSERT when either the configured batch size or
+the flush interval is reached, so ingestion pays one commit per batch instead of one
+per MQTT message.
+
+Rows are inserted with ON CONFLICT DO NOTHING on the (device, reading type,
+timestamp) natural key, so retries and spool replays are idempotent. The same
+transaction can fold the rows into `reading_rollups` and `device_latest`.
+
+If a spool is configured, batches that fail to insert because the database is
+unreachable, and rows that pile up beyond `max_pending` while a slow flush is in
+progress, are written to the local spool instead of being dropped or held in memory.
+A batch the database rejects for any other reason is bisected to find the offending
+rows; the rest are written and the rejected rows are dead-lettered.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from db.errors import is_transient
+from db.latest import apply_latest
+from db.rollups import apply_rollups
+from db.upsert import dialect_insert
+from ingestion_service.spool import Spool
+from models.reading import Reading, ReadingType
+
+logger = logging.getLogger(__name__)
+
+# Column order of the reading rows accepted by BatchWriter
+READING_COLUMNS = ("device_id", "reading_type", "value", "timestamp")
+ReadingRow = tuple[int, ReadingType, float, datetime]
+
+
+class BatchWriter:
+    """Accumulates reading rows and flushes them to the database in bulk."""
+
+    def __init__(
+        self,
+        session_factory,
+        *,
+        batch_size: int,
+        flush_interval: float,
+        spool: Optional[Spool] = None,
+        max_pending: Optional[int] = None,
+        maintain_rollups: bool = False,
+        maintain_latest: bool = False,
+    ) -> None:
+        """Initialize the BatchWriter.
+
+        Args:
+            session_factory: AsyncSession factory function
+            batch_size (int): Number of buffered rows that triggers a flush
+            flush_interval (float): Maximum seconds a row may wait before being flushed
+            spool (Optional[Spool]): Local spool for rows that cannot be written
+            max_pending (Optional[int]): Buffered rows above which, while a flush is
+                in progress, the buffer is diverted to the spool (default 10x batch_size)
+            maintain_rollups (bool): Fold inserted rows into `reading_rollups` in the
+                same transaction
+            maintain_latest (bool): Upsert `device_latest` in the same transaction
+        """
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spool = spool
+        self.max_pending = max_pending or batch_size * 10
+        self.maintain_rollups = maintain_rollups
+        self.maintain_latest = maintain_latest
+        self._buffer: list[ReadingRow] = []
+        self._lock = asyncio.Lock()
+        self._last_flush = time.monotonic()
+        self.flush_latency = 0.0  # Exponential moving average of flush duration in seconds
+
+    @property
+    def pending(self) -> int:
+        """Number of rows waiting to be flushed."""
+        return len(self._buffer)
+
+    async def add(self, row: ReadingRow) -> None:
+        """Buffer a reading row, flushing if the batch size has been reached.
+
+        Args:
+            row (ReadingRow): Column values for a `readings` row
+        """
+        await self.add_many([row])
+
+    async def add_many(self, rows: list[ReadingRow]) -> None:
+        """Buffer several reading rows at once, preserving their order.
+
+        Args:
+            rows (list[ReadingRow]): Column values for `readings` rows
+        """
+        self._buffer.extend(rows)
+        await self._after_add()
+
+    async def _after_add(self) -> None:
+        """Flush a full buffer, or divert it to the spool if the database is lagging."""
+        if len(self._buffer) < self.batch_size:
+            return
+        if not self._lock.locked():
+            await self.flush()
+        elif self.spool is not None and len(self._buffer) >= self.max_pending:
+            # A flush is still in progress and rows keep piling up: spill to disk
+            rows, self._buffer = self._buffer, []
+            await self.spool.append(rows)
+        # Otherwise keep buffering; the next flush picks the rows up
+
+    async def write_rows(self, rows: list[ReadingRow]) -> None:
+        """Insert rows with one INSERT statement and one commit.
+
+        Rows whose natural key already exists are skipped, and only the rows that
+        were actually inserted are added to the rollups. All rows count as a
+        delivery for `device_latest`.
+
+        Args:
+            rows (list[ReadingRow]): Column values for `readings` rows
+        """
+        # executemany needs named parameters; build them once per batch, not per message
+        params = [dict(zip(READING_COLUMNS, row)) for row in rows]
+        started = time.monotonic()
+        async with self.session_factory() as session:
+            try:
+                stmt = dialect_insert(session, Reading).on_conflict_do_nothing(
+                    index_elements=[Reading.device_id, Reading.reading_type, Reading.timestamp]
+                )
+                if self.maintain_rollups:
+                    result = await session.execute(
+                        stmt.returning(
+                            Reading.device_id, Reading.reading_type, Reading.value, Reading.timestamp
+                        ),
+                        params,
+                    )
+                    await apply_rollups(session, result.all())
+                else:
+                    await session.execute(stmt, params)
+                if self.maintain_latest:
+                    await apply_latest(session, rows)
+                await session.commit()
+            except SQLAlchemyError:
+                await session.rollback()
+                raise
+            finally:
+                elapsed = time.monotonic() - started
+                self.flush_latency = 0.8 * self.flush_latency + 0.2 * elapsed
+
+    async def _write_isolating(self, rows: list[ReadingRow]) -> list[ReadingRow]:
+        """Write rows, bisecting batches the database rejects; return the rejected rows.
+
+        Transient errors are raised; rows already committed by then are skipped by
+        ON CONFLICT DO NOTHING when the batch is retried.
+        """
+        try:
+            await self.write_rows(rows)
+            return []
+        except SQLAlchemyError as e:
+            if is_transient(e):
+                raise
+            if len(rows) == 1:
+                logger.warning(f"Database rejected reading {rows[0]}: {e}")
+                return rows
+        middle = len(rows) // 2
+        return await self._write_isolating(rows[:middle]) + await self._write_isolating(rows[middle:])
+
+    async def write_valid_rows(self, rows: list[ReadingRow]) -> int:
+        """Write rows, setting aside any the database rejects.
+
+        Rejected rows are appended to the spool's dead-letter file, or logged and
+        dropped without a spool. Connection-level errors are raised so the caller
+        can spool or retry the batch.
+
+        Args:
+            rows (list[ReadingRow]): Column values for `readings` rows
+
+        Returns:
+            int: Number of rows rejected
+        """
+        rejected = await self._write_isolating(rows)
+        if rejected:
+            logger.error(f"Database rejected {len(rejected)} of {len(rows)} readings")
+            if self.spool is not None:
+                await self.spool.dead_letter(rejected)
+        return len(rejected)
+
+    async def flush(self) -> int:
+        """Write all buffered rows with one INSERT statement and one commit.
+
+        Returns:
+            int: Number of rows written
+        """
+        async with self._lock:
+            if not self._buffer:
+                self._last_flush = time.monotonic()
+                return 0
+
+            # Swap the buffer out so workers can keep adding while we write
+            rows, self._buffer = self._buffer, []
+            self._last_flush = time.monotonic()
+
+            try:
+                rejected = await self.write_valid_rows(rows)
+            except asyncio.CancelledError:
+                # Put the rows back for close(); rows already committed are skipped
+                # by ON CONFLICT DO NOTHING when they are written again
+                self._buffer[:0] = rows
+                raise
+            except (SQLAlchemyError, OSError) as e:
+                if self.spool is None:
+                    logger.error(f"Failed to flush {len(rows)} readings: {e}")
+                    raise
+                logger.error(f"Failed to flush {len(rows)} readings, spooling to disk: {e}")
+                await self.spool.append(rows)
+                return 0
+
+            logger.debug(f"Flushed {len(rows) - rejected} readings")
+            return len(rows) - rejected
+
+    async def run(self) -> None:
+        """Periodically flush buffered rows until cancelled."""
+        while True:
+            elapsed = time.monotonic() - self._last_flush
+            await asyncio.sleep(max(self.flush_interval - elapsed, 0.0))
+            if time.monotonic() - self._last_flush < self.flush_interval:
+                continue
+            try:
+                await self.flush()
+            except (SQLAlchemyError, OSError):
+                # Already logged in flush(); keep the timer running
+                pass
+
+    async def close(self) -> None:
+        """Flush any remaining rows and close the spool. Call on shutdown."""
+        if self._buffer:
+            logger.info(f"Flushing {len(self._buffer)} buffered readings on shutdown")
+        try:
+            await self.flush()
+        finally:
+            if self.spool is not None:
+                self.spool.close()
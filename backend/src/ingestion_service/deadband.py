@@ -0,0 +1,81 @@
+"""
+Deadband filter for sensor readings.
+
+Sensors publish at a fixed rate whether or not the measured value has changed. The
+filter persists a reading only if it differs from the last persisted value of the
+same device and reading type by more than a threshold, or if the heartbeat interval
+has elapsed since that value was persisted, so flat periods still leave a trace.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from ingestion_service.message_processor import ParsedReading
+
+
+class DeadbandFilter:
+    """Suppresses readings that are within a threshold of the last persisted value.
+
+    State is kept per (device, reading type). Each device is owned by one ingestion
+    worker, so the filter sees the readings of a device in arrival order.
+    """
+
+    def __init__(
+        self,
+        *,
+        thresholds: dict[str, float],
+        device_thresholds: Optional[dict[str, dict[str, float]]] = None,
+        heartbeat: float,
+    ) -> None:
+        """Initialize the DeadbandFilter.
+
+        Args:
+            thresholds (dict[str, float]): Threshold per reading type; reading types
+                without a threshold are never suppressed
+            device_thresholds (Optional[dict[str, dict[str, float]]]): Per device id
+                overrides of `thresholds`
+            heartbeat (float): Seconds after which a reading is persisted regardless
+                of its value
+        """
+        self.thresholds = thresholds
+        self.device_thresholds = device_thresholds or {}
+        self.heartbeat = timedelta(seconds=heartbeat)
+        self._last: dict[tuple[str, str], tuple[float, datetime]] = {}
+        self.passed = 0
+        self.suppressed: dict[str, int] = {}
+
+    def threshold_for(self, device_id: str, reading_type: str) -> Optional[float]:
+        """Return the threshold for a device and reading type, or None if unfiltered."""
+        overrides = self.device_thresholds.get(device_id)
+        if overrides is not None and reading_type in overrides:
+            return overrides[reading_type]
+        return self.thresholds.get(reading_type)
+
+    def allow(self, reading: ParsedReading) -> bool:
+        """Return True if the reading should be persisted, recording it if so."""
+        device_id, reading_type, value, timestamp = reading
+        reading_type = reading_type.value
+        threshold = self.threshold_for(device_id, reading_type)
+        if threshold is None:
+            self.passed += 1
+            return True
+
+        key = (device_id, reading_type)
+        last = self._last.get(key)
+        if last is not None:
+            last_value, last_timestamp = last
+            if abs(value - last_value) <= threshold and timestamp - last_timestamp < self.heartbeat:
+                self.suppressed[reading_type] = self.suppressed.get(reading_type, 0) + 1
+                return False
+
+        self._last[key] = (value, timestamp)
+        self.passed += 1
+        return True
+
+    def filter(self, readings: list[ParsedReading]) -> list[ParsedReading]:
+        """Return the readings that should be persisted, in their original order."""
+        return [reading for reading in readings if self.allow(reading)]
+
+    def stats(self) -> dict:
+        """Return filter counters for monitoring."""
+        return {"passed": self.passed, "suppressed": dict(self.suppressed)}
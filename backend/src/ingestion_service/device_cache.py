@@ -0,0 +1,129 @@
+"""
+In-memory device registry cache for the ingestion service.
+
+Translates the MQTT device identifier (e.g. "62ba71") into the `devices.id` primary
+key. The cache is bounded with LRU eviction, pre-warmed from the `devices` table at
+startup and populated on first sight, so the steady-state hot path issues no lookup
+queries.
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.upsert import dialect_insert
+from models import Device
+
+logger = logging.getLogger(__name__)
+
+
+class DeviceCache:
+    """Bounded LRU mapping of MQTT device ids to device primary keys."""
+
+    def __init__(self, *, max_size: int) -> None:
+        """Initialize the DeviceCache.
+
+        Args:
+            max_size (int): Maximum number of device ids to keep in memory
+        """
+        self.max_size = max_size
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, device_id: str) -> Optional[int]:
+        """Return the cached primary key for a device id, or None if not cached."""
+        pk = self._entries.get(device_id)
+        if pk is not None:
+            self._entries.move_to_end(device_id)
+        return pk
+
+    def put(self, device_id: str, pk: int) -> None:
+        """Cache a device id, evicting the least recently used entry if full."""
+        self._entries[device_id] = pk
+        self._entries.move_to_end(device_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def warm(self, session: AsyncSession) -> int:
+        """Pre-load device ids from the `devices` table.
+
+        Args:
+            session (AsyncSession): Database session
+
+        Returns:
+            int: Number of devices loaded
+        """
+        result = await session.execute(
+            select(Device.device_id, Device.id).order_by(Device.id.desc()).limit(self.max_size)
+        )
+        # Load oldest first so the most recently created devices end up most recently used
+        rows = list(result.all())
+        for device_id, pk in reversed(rows):
+            self.put(device_id, pk)
+        logger.info(f"Device cache warmed with {len(rows)} devices")
+        return len(rows)
+
+    async def resolve(self, session: AsyncSession, device_id: str) -> int:
+        """Return the primary key for a device id, creating the device if needed.
+
+        Args:
+            session (AsyncSession): Database session used on a cache miss
+            device_id (str): Device identifier from the MQTT topic
+
+        Returns:
+            int: The device's primary key
+        """
+        pk = self.get(device_id)
+        if pk is not None:
+            self.hits += 1
+            return pk
+
+        self.misses += 1
+        pk = await self._upsert(session, device_id)
+        self.put(device_id, pk)
+        return pk
+
+    async def _upsert(self, session: AsyncSession, device_id: str) -> int:
+        """Insert the device if it does not exist and return its primary key.
+
+        Uses INSERT ... ON CONFLICT (device_id) DO NOTHING RETURNING id so that
+        concurrent workers cannot race on the unique index.
+        """
+        stmt = (
+            dialect_insert(session, Device)
+            .values(device_id=device_id, is_active=True)
+            .on_conflict_do_nothing(index_elements=[Device.device_id])
+            .returning(Device.id)
+        )
+        result = await session.execute(stmt)
+        pk = result.scalar_one_or_none()
+
+        if pk is None:
+            # Another worker or process created it first
+            result = await session.execute(
+                select(Device.id).where(Device.device_id == device_id)
+            )
+            pk = result.scalar_one()
+        else:
+            logger.info(f"Created new device with ID: {device_id}")
+
+        await session.commit()
+        return pk
+
+    def stats(self) -> dict[str, int]:
+        """Return cache counters for monitoring."""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
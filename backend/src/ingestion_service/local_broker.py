@@ -0,0 +1,118 @@
+"""
+In-process MQTT broker stand-in for tests and benchmarks.
+
+Implements just enough of the broker behaviour the ingestion service relies on:
+wildcard subscriptions, retained flags and shared subscriptions
+(`$share/<group>/<filter>`), where each message is delivered to exactly one member
+of the group in round-robin order. `LocalBroker.client` can be passed to
+`MQTTClientService` as its `client_factory`.
+"""
+
+import asyncio
+import itertools
+from dataclasses import dataclass, field
+from typing import Optional
+
+from aiomqtt import Topic
+
+
+@dataclass
+class LocalMessage:
+    """Message delivered by the local broker, shaped like `aiomqtt.Message`."""
+
+    topic: Topic
+    payload: bytes
+    retain: bool = False
+    published_at: float = 0.0
+
+
+@dataclass
+class _SharedGroup:
+    members: list["LocalClient"] = field(default_factory=list)
+    cycle: Optional[itertools.cycle] = None
+
+    def next_member(self) -> "LocalClient":
+        if self.cycle is None:
+            self.cycle = itertools.cycle(list(self.members))
+        return next(self.cycle)
+
+
+class LocalClient:
+    """Client connected to a `LocalBroker`, mimicking the `aiomqtt.Client` API."""
+
+    def __init__(self, broker: "LocalBroker", identifier: Optional[str] = None) -> None:
+        self.broker = broker
+        self.identifier = identifier
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self.delivered = 0
+
+    async def __aenter__(self) -> "LocalClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.broker.disconnect(self)
+
+    async def subscribe(self, topic: str) -> None:
+        self.broker.subscribe(self, topic)
+
+    def deliver(self, message: LocalMessage) -> None:
+        self.delivered += 1
+        self._queue.put_nowait(message)
+
+    @property
+    async def messages(self):
+        while True:
+            message = await self._queue.get()
+            if message is None:
+                return
+            yield message
+
+    def close(self) -> None:
+        """End the message stream, as if the broker had closed the connection."""
+        self._queue.put_nowait(None)
+
+
+class LocalBroker:
+    """Minimal in-memory publish/subscribe broker."""
+
+    def __init__(self) -> None:
+        self._subscriptions: list[tuple[str, LocalClient]] = []
+        self._groups: dict[tuple[str, str], _SharedGroup] = {}
+        self.clients: list[LocalClient] = []
+
+    def client(self, hostname: str = "localhost", port: int = 1883, **kwargs) -> LocalClient:
+        """Create a client; accepts (and ignores) the `aiomqtt.Client` connection kwargs."""
+        client = LocalClient(self, identifier=kwargs.get("identifier"))
+        self.clients.append(client)
+        return client
+
+    def subscribe(self, client: LocalClient, topic: str) -> None:
+        if topic.startswith("$share/"):
+            _, group, topic_filter = topic.split("/", 2)
+            shared = self._groups.setdefault((group, topic_filter), _SharedGroup())
+            shared.members.append(client)
+            shared.cycle = None
+        else:
+            self._subscriptions.append((topic, client))
+
+    def disconnect(self, client: LocalClient) -> None:
+        self._subscriptions = [(t, c) for t, c in self._subscriptions if c is not client]
+        for shared in self._groups.values():
+            if client in shared.members:
+                shared.members.remove(client)
+                shared.cycle = None
+
+    def publish(self, topic: str, payload: bytes, *, retain: bool = False, published_at: float = 0.0) -> None:
+        """Deliver a message to every matching subscriber and one member per shared group."""
+        message = LocalMessage(Topic(topic), payload, retain, published_at)
+        for topic_filter, client in self._subscriptions:
+            if message.topic.matches(topic_filter):
+                client.deliver(message)
+        for (_, topic_filter), shared in self._groups.items():
+            if shared.members and message.topic.matches(topic_filter):
+                shared.next_member().deliver(message)
+
+    def close(self) -> None:
+        """Close every client's message stream."""
+        for client in self.clients:
+            client.close()
@@ -2,8 +2,13 @@ import asyncio
 import logging
 import sys
 from config import settings
+from db.partitions import maintain_partitions
 from db.session import AsyncSessionFactory, cleanup_database
-from mqtt_client import MQTTClientService
+from ingestion_service.mqtt_client import MQTTClientService
+from ingestion_service.batch_writer import BatchWriter
+from ingestion_service.deadband import DeadbandFilter
+from ingestion_service.device_cache import DeviceCache
+from ingestion_service.spool import Spool, SpoolReplayer
 
 def setup_logging():
     """Configure logging with proper formatting and level from settings."""
@@ -35,18 +40,78 @@ def setup_logging():
 async def main():
     logger = setup_logging()
 
+    spool = None
+    if settings.SPOOL_DIR:
+        spool = Spool(
+            settings.SPOOL_DIR,
+            segment_bytes=settings.SPOOL_SEGMENT_BYTES,
+            fsync=settings.SPOOL_FSYNC,
+        )
+        logger.info(f"Spooling failed writes to {settings.SPOOL_DIR}")
+
+    writer = BatchWriter(
+        session_factory=AsyncSessionFactory,
+        batch_size=settings.INGEST_BATCH_SIZE,
+        flush_interval=settings.INGEST_FLUSH_INTERVAL,
+        spool=spool,
+        max_pending=settings.SPOOL_MAX_PENDING,
+        maintain_rollups=settings.READINGS_MAINTAIN_ROLLUPS,
+        maintain_latest=settings.READINGS_MAINTAIN_LATEST,
+    )
+
+    device_cache = DeviceCache(max_size=settings.DEVICE_CACHE_SIZE)
+
     try:
         logger.info("Starting MQTT ingestion service")
+        async with AsyncSessionFactory() as session:
+            await device_cache.warm(session)
+
+        deadband = None
+        if settings.DEADBAND_THRESHOLDS or settings.DEADBAND_DEVICE_THRESHOLDS:
+            deadband = DeadbandFilter(
+                thresholds=settings.DEADBAND_THRESHOLDS,
+                device_thresholds=settings.DEADBAND_DEVICE_THRESHOLDS,
+                heartbeat=settings.DEADBAND_HEARTBEAT,
+            )
+            logger.info(f"Deadband filter enabled: {settings.DEADBAND_THRESHOLDS}")
+
         mqtt_service = MQTTClientService(
             settings=settings,
-            session_factory=AsyncSessionFactory
+            session_factory=AsyncSessionFactory,
+            writer=writer,
+            device_cache=device_cache,
+            deadband=deadband,
         )
         logger.info("MQTT service initialized, starting subscription")
-        await mqtt_service.subscribe()
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(writer.run())
+            tg.create_task(maintain_partitions(
+                AsyncSessionFactory,
+                interval=settings.READINGS_PARTITION_INTERVAL,
+                periods_ahead=settings.READINGS_PARTITIONS_AHEAD,
+                retention_periods=settings.READINGS_RETENTION_PERIODS,
+                check_interval=settings.PARTITION_MAINTENANCE_INTERVAL,
+            ))
+            if spool is not None:
+                replayer = SpoolReplayer(
+                    spool,
+                    writer,
+                    batch_size=settings.SPOOL_REPLAY_BATCH_SIZE,
+                    interval=settings.SPOOL_REPLAY_INTERVAL,
+                )
+                tg.create_task(replayer.run())
+            tg.create_task(mqtt_service.subscribe())
     except Exception as e:
         logger.error(f"Fatal error in main loop: {str(e)}", exc_info=True)
         raise
     finally:
+        # subscribe() has drained the partition queues into the writer by now
+        logger.info("Flushing buffered readings")
+        try:
+            await writer.close()
+        except Exception as e:
+            logger.error(f"Failed to flush buffered readings on shutdown: {str(e)}")
+        logger.info(f"Device cache stats: {device_cache.stats()}")
         logger.info("Cleaning up database connections")
         await cleanup_database()
         logger.info("Shutdown complete")
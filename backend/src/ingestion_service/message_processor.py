@@ -1,45 +1,45 @@
-from schemas import ReadingCreate
 import logging
 from sqlalchemy.exc import SQLAlchemyError
 
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from models import Device, Reading
-from sqlalchemy.future import select
-from datetime import UTC, datetime
+from datetime import datetime
+from ingestion_service.batch_writer import BatchWriter
+from ingestion_service.device_cache import DeviceCache
+from models.reading import ReadingType
+
+# Reading as parsed from MQTT: (device_id, reading_type, value, timestamp)
+ParsedReading = tuple[str, ReadingType, float, datetime]
 
 class MessageProcessor:
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(self, session: AsyncSession, writer: BatchWriter, device_cache: DeviceCache) -> None:
         self.session: AsyncSession = session
+        self.writer: BatchWriter = writer
+        self.device_cache: DeviceCache = device_cache
+
+    async def process_batch(self, readings: list[ParsedReading]) -> None:
+        """Resolve devices and buffer a batch of parsed readings, preserving their order.
+
+        Each distinct device in the batch is resolved once, so consecutive readings
+        of the same device cost a single cache lookup and end up in the same INSERT.
 
-    async def process_message(self, reading_data: ReadingCreate) -> None:
+        Args:
+            readings (list[ParsedReading]): `(device_id, reading_type, value, timestamp)`
+                tuples, where device_id is the MQTT device identifier
+        """
         try:
-            logging.info(f"Processing message for device ID: {reading_data.device_id}")
-            # Check if device exists
-            result = await self.session.execute(select(Device).filter_by(device_id=reading_data.device_id))
-            device = result.scalars().first()
-
-            if not device:
-                logging.info(f"Creating new device with ID: {reading_data.device_id}")
-                device = Device(device_id=reading_data.device_id)
-                self.session.add(device)
-                await self.session.commit()
-
-            if reading_data.value is not None:
-                if reading_data.timestamp is None:
-                    reading_data.timestamp = datetime.now(UTC)
-
-                logging.info(f"Recording new {reading_data.reading_type} reading for device ID: {device.id}")
-                reading = Reading(
-                    device_id=device.id,
-                    reading_type=reading_data.reading_type,
-                    value=reading_data.value,
-                    timestamp=reading_data.timestamp
-                )
-                self.session.add(reading)
-                await self.session.commit()
-            else:
-                logging.warning(f"Skipping reading creation - no valid {reading_data.reading_type} data")
+            device_pks: dict[str, int] = {}
+            rows = []
+            for device_id, reading_type, value, timestamp in readings:
+                device_pk = device_pks.get(device_id)
+                if device_pk is None:
+                    # Resolve (and if necessary create) the device without a lookup query on cache hits
+                    device_pk = await self.device_cache.resolve(self.session, device_id)
+                    device_pks[device_id] = device_pk
+                rows.append((device_pk, reading_type, value, timestamp))
+
+            logging.debug("Buffering %d readings for %d devices", len(rows), len(device_pks))
+            await self.writer.add_many(rows)
 
         except SQLAlchemyError as e:
             await self.session.rollback()
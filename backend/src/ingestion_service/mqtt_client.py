@@ -1,109 +1,155 @@
 from aiomqtt import Client as MQTTClient
 from config import Settings
-from ingestion_service.message_processor import MessageProcessor
+from ingestion_service.batch_writer import BatchWriter
+from ingestion_service.deadband import DeadbandFilter
+from ingestion_service.device_cache import DeviceCache
+from ingestion_service.message_processor import MessageProcessor, ParsedReading
 import logging
 import asyncio
+import math
+import os
 import re
-from schemas import ReadingCreate
+import socket
+import time
+import zlib
+from typing import Optional
+from models.reading import ReadingType
 from datetime import UTC, datetime
 
 logger = logging.getLogger(__name__)
 
+# Matches sensor state topics and captures device id and reading type in one pass
+TOPIC_PATTERN = re.compile(r"harvco/harvco-temp-sensor-([^/]+)/sensor/(temperature|humidity)/state")
+READING_TYPES = {reading_type.value: reading_type for reading_type in ReadingType}
+
 
 class MQTTClientService:
-    """Service for managing MQTT connections and processing messages."""
+    """Service for managing MQTT connections and processing messages.
+
+    Messages are received by a single receive loop and routed onto one of several
+    bounded queues by a hash of the device id, with exactly one worker per queue.
+    Readings of a device are therefore always processed in arrival order, and slow
+    database writes never stall reading from the broker.
+    """
 
-    def __init__(self, settings: Settings, session_factory) -> None:
+    def __init__(
+        self,
+        settings: Settings,
+        session_factory,
+        writer: BatchWriter,
+        device_cache: DeviceCache,
+        client_factory=MQTTClient,
+        deadband: Optional[DeadbandFilter] = None,
+    ) -> None:
         """Initialize the MQTTClientService.
 
         Args:
             settings (Settings): Configuration settings.
             session_factory: AsyncSession factory function
+            writer (BatchWriter): Shared buffered writer for readings
+            device_cache (DeviceCache): Shared device id to primary key cache
+            client_factory: Callable returning an `aiomqtt.Client`-compatible client
+            deadband (Optional[DeadbandFilter]): Filter suppressing unchanged readings
         """
         self.settings = settings
         self.session_factory = session_factory
+        self.writer = writer
+        self.device_cache = device_cache
+        self.client_factory = client_factory
+        self.deadband = deadband
+
+        num_partitions = max(settings.INGEST_WORKERS, 1)
+        partition_size = max(settings.INGEST_QUEUE_SIZE // num_partitions, 1)
+        self.queues: list[asyncio.Queue] = [
+            asyncio.Queue(maxsize=partition_size) for _ in range(num_partitions)
+        ]
+        self.received = 0
+        self.dropped = 0
+        self.ignored = 0
+        self.retained_skipped = 0
+        self.processed = 0
+        self.busy_seconds = 0.0
+
+    @property
+    def subscription_topic(self) -> str:
+        """Topic filter to subscribe to.
+
+        When `MQTT_SHARED_GROUP` is set, the filter is wrapped in a shared
+        subscription (`$share/<group>/<MQTT_TOPIC>`) so the broker load-balances
+        messages across all ingestion replicas in the group.
+        """
+        if self.settings.MQTT_SHARED_GROUP:
+            return f"$share/{self.settings.MQTT_SHARED_GROUP}/{self.settings.MQTT_TOPIC}"
+        return self.settings.MQTT_TOPIC
+
+    @property
+    def client_id(self) -> str:
+        """MQTT client identifier, unique per replica unless configured explicitly."""
+        return self.settings.MQTT_CLIENT_ID or f"harvco-ingest-{socket.gethostname()}-{os.getpid()}"
+
+    def parse_message(self, message) -> Optional[ParsedReading]:
+        """Parse an MQTT message into a reading tuple, or None if it should be skipped.
 
-    def parse_device_id(self, topic: str) -> str:
-        """Extract device ID from MQTT topic.
+        This is the per-message hot path: the topic is matched once by the
+        precompiled `TOPIC_PATTERN`, the payload is converted straight from bytes,
+        and the result is a plain tuple. Pydantic validation is reserved for the API.
+        """
+        match = TOPIC_PATTERN.match(message.topic.value)
+        if match is None:
+            # Non-reading topics such as _devicename
+            logger.debug("Skipping non-reading topic: %s", message.topic.value)
+            return None
+
+        try:
+            value = float(message.payload)
+        except ValueError:
+            logger.debug("Non-numeric payload received on %s: %r", message.topic.value, message.payload)
+            return None
+        if not math.isfinite(value):
+            logger.debug("Skipping non-finite value %r from %s", value, message.topic.value)
+            return None
+
+        return match.group(1), READING_TYPES[match.group(2)], value, datetime.now(UTC)
+
+    async def handle_messages(
+        self, message_processor: MessageProcessor, readings: list[ParsedReading], worker_id: int
+    ) -> None:
+        """Process a run of parsed readings from one partition as a batch."""
+        if self.deadband is not None:
+            readings = self.deadband.filter(readings)
+        if not readings:
+            return
 
-        Example: "harvco/harvco-temp-sensor-62ba71/sensor/temperature/state" -> "62ba71"
+        try:
+            await message_processor.process_batch(readings)
+            logger.debug("Worker %d: Buffered %d readings", worker_id, len(readings))
+        except Exception as e:
+            logger.error(f"Worker {worker_id}: Failed to process {len(readings)} readings: {str(e)}")
+
+    async def message_worker(self, worker_id: int) -> None:
+        """Worker task that processes the readings of one partition in order.
+
+        Consecutive queued readings are drained together (up to
+        `INGEST_WORKER_BATCH_SIZE`) so each device is resolved once per run.
         """
-        pattern = r"harvco/harvco-temp-sensor-([^/]+)/sensor/(?:temperature|humidity)/state"
-        match = re.match(pattern, topic)
-        if not match:
-            raise ValueError(f"Invalid topic format: {topic}")
-        return match.group(1)
-
-    def parse_reading_type(self, topic: str) -> str:
-        """Extract reading type (temperature or humidity) from topic."""
-        if "temperature" in topic:
-            return "temperature"
-        elif "humidity" in topic:
-            return "humidity"
-        else:
-            # Skip other topics like _devicename
-            raise ValueError(f"Invalid topic format: {topic}")
-
-    async def message_worker(self, client, worker_id: int) -> None:
-        """Worker task to process messages concurrently."""
+        queue = self.queues[worker_id]
         async with self.session_factory() as session:
-            message_processor = MessageProcessor(session=session)
+            message_processor = MessageProcessor(
+                session=session, writer=self.writer, device_cache=self.device_cache
+            )
             try:
-                async for message in client.messages:
-                    topic = message.topic.value
-                    payload = message.payload.decode()
-                    logger.debug(f"Worker {worker_id}: Received message on topic {topic}: {payload}")
-
+                while True:
+                    readings = [await queue.get()]
+                    while len(readings) < self.settings.INGEST_WORKER_BATCH_SIZE and not queue.empty():
+                        readings.append(queue.get_nowait())
                     try:
-                        # Extract device ID and reading type from topic
-                        device_id = self.parse_device_id(topic)
-                        try:
-                            reading_type = self.parse_reading_type(topic)
-                        except ValueError:
-                            # Skip non-reading topics (like _devicename) - log as debug since this is expected
-                            logger.debug(f"Worker {worker_id}: Skipping non-reading topic: {topic}")
-                            continue
-
-                        # Parse payload as float, set to None if invalid or NaN
-                        try:
-                            if payload.lower() == 'nan':
-                                logger.debug(f"Worker {worker_id}: Skipping NaN value from {topic}")
-                                value = None
-                            else:
-                                value = float(payload)
-                                if value != value:  # Additional NaN check for float values
-                                    logger.debug(f"Worker {worker_id}: Skipping NaN value from {topic}")
-                                    value = None
-                        except ValueError:
-                            logger.debug(f"Worker {worker_id}: Non-numeric payload received: {payload}")
-                            value = None
-
-                        reading_data = {
-                            "device_id": device_id,
-                            "reading_type": reading_type,
-                            "value": value,
-                            "timestamp": datetime.now(UTC)
-                        }
-
-                        try:
-                            reading = ReadingCreate(**reading_data)
-                            if value is not None:  # Only process if we got a valid numeric reading
-                                logger.info(f"Worker {worker_id}: Processing {reading_type} reading for device {device_id}")
-                                await message_processor.process_message(reading)
-                                logger.info(f"Worker {worker_id}: Successfully processed {reading_type} reading for device {device_id}")
-                            else:
-                                logger.debug(f"Worker {worker_id}: Skipping invalid {reading_type} reading for device {device_id}")
-                        except ValueError as e:
-                            logger.debug(f"Worker {worker_id}: Skipping invalid reading data: {str(e)}")
-
-                    except ValueError as e:
-                        # Only log as error if it's an unexpected topic format
-                        if "_devicename" in topic:
-                            logger.debug(f"Worker {worker_id}: Skipping devicename topic: {topic}")
-                        else:
-                            logger.error(f"Worker {worker_id}: Topic parsing error: {str(e)}")
-                    except Exception as e:
-                        logger.error(f"Worker {worker_id}: Failed to process message from topic {topic}: {str(e)}")
+                        started = time.monotonic()
+                        await self.handle_messages(message_processor, readings, worker_id)
+                        self.busy_seconds += time.monotonic() - started
+                        self.processed += len(readings)
+                    finally:
+                        for _ in readings:
+                            queue.task_done()
 
             except asyncio.CancelledError:
                 logger.info(f"Worker {worker_id}: Shutting down")
@@ -112,12 +158,67 @@ class MQTTClientService:
                 logger.error(f"Worker {worker_id}: Unexpected error: {str(e)}")
                 raise
 
-    async def subscribe(self, num_workers: int = 2) -> None:
-        """Subscribe to MQTT topics and process incoming messages using multiple workers.
+    def partition_for(self, device_id: str) -> int:
+        """Return the partition (and worker) index that owns a device."""
+        return zlib.crc32(device_id.encode()) % len(self.queues)
 
-        Args:
-            num_workers (int): Number of concurrent message processing workers
+    async def receive_loop(self, client) -> None:
+        """Parse messages from the MQTT client and route them onto the partition queues.
+
+        Messages are parsed (and timestamped) on receipt, so workers only see reading
+        tuples. Non-reading topics and invalid payloads are ignored; readings that
+        arrive while their partition is full are dropped and counted. Retained messages are skipped when
+        `INGEST_SKIP_RETAINED` is set: they are the broker replaying each topic's last
+        value on (re)subscribe, which was already ingested when it was first published.
         """
+        async for message in client.messages:
+            self.received += 1
+            if message.retain and self.settings.INGEST_SKIP_RETAINED:
+                self.retained_skipped += 1
+                continue
+            reading = self.parse_message(message)
+            if reading is None:
+                self.ignored += 1
+                continue
+
+            try:
+                self.queues[self.partition_for(reading[0])].put_nowait(reading)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                if self.dropped % 1000 == 1:
+                    logger.warning(f"Receive queue full, dropped {self.dropped} messages so far")
+
+    def stats(self) -> dict:
+        """Return ingestion pipeline counters for monitoring."""
+        return {
+            "queue_depth": sum(queue.qsize() for queue in self.queues),
+            "max_partition_depth": max(queue.qsize() for queue in self.queues),
+            "queue_capacity": sum(queue.maxsize for queue in self.queues),
+            "received": self.received,
+            "dropped": self.dropped,
+            "ignored": self.ignored,
+            "retained_skipped": self.retained_skipped,
+            "processed": self.processed,
+            "workers": len(self.queues),
+            "writer_pending": self.writer.pending,
+            "commit_latency": round(self.writer.flush_latency, 4),
+            "device_cache": self.device_cache.stats(),
+            "spool": self.writer.spool.stats() if self.writer.spool else None,
+            "deadband": self.deadband.stats() if self.deadband else None,
+        }
+
+    async def report_stats(self) -> None:
+        """Periodically log pipeline statistics, including worker utilisation."""
+        last_busy = self.busy_seconds
+        while True:
+            await asyncio.sleep(self.settings.INGEST_STATS_INTERVAL)
+            window = self.settings.INGEST_STATS_INTERVAL * len(self.queues)
+            utilisation = (self.busy_seconds - last_busy) / window
+            last_busy = self.busy_seconds
+            logger.info(f"Ingestion stats: {self.stats()}, utilisation={utilisation:.0%}")
+
+    async def consume(self) -> None:
+        """Connect to the broker and feed the receive queue, reconnecting on failure."""
         while True:
             try:
                 logger.info(
@@ -126,20 +227,17 @@ class MQTTClientService:
                     self.settings.MQTT_BROKER_PORT,
                 )
 
-                async with MQTTClient(
+                async with self.client_factory(
                     hostname=self.settings.MQTT_BROKER_URL,
                     port=self.settings.MQTT_BROKER_PORT,
                     username=self.settings.MQTT_USERNAME,
                     password=self.settings.MQTT_PASSWORD,
+                    identifier=self.client_id,
                 ) as client:
-                    logger.info("Connected to MQTT broker")
-                    await client.subscribe(self.settings.MQTT_TOPIC)
-                    logger.info("Subscribed to topic %s", self.settings.MQTT_TOPIC)
-
-                    # Use TaskGroup to manage multiple worker tasks
-                    async with asyncio.TaskGroup() as tg:
-                        for i in range(num_workers):
-                            tg.create_task(self.message_worker(client, i))
+                    logger.info("Connected to MQTT broker as %s", self.client_id)
+                    await client.subscribe(self.subscription_topic)
+                    logger.info("Subscribed to topic %s", self.subscription_topic)
+                    await self.receive_loop(client)
 
             except ConnectionError as e:
                 logger.error("MQTT connection error: %s", str(e))
@@ -155,3 +253,36 @@ class MQTTClientService:
                 self.settings.RECONNECT_INTERVAL,
             )
             await asyncio.sleep(self.settings.RECONNECT_INTERVAL)
+
+    async def drain(self) -> None:
+        """Wait until the workers have processed every queued reading.
+
+        Gives up after `INGEST_SHUTDOWN_TIMEOUT` seconds, logging how many readings
+        were left in the queues.
+        """
+        queued = sum(queue.qsize() for queue in self.queues)
+        if queued:
+            logger.info(f"Draining {queued} queued readings")
+        try:
+            async with asyncio.timeout(self.settings.INGEST_SHUTDOWN_TIMEOUT):
+                await asyncio.gather(*(queue.join() for queue in self.queues))
+        except TimeoutError:
+            lost = sum(queue.qsize() for queue in self.queues)
+            logger.warning(f"Timed out draining the partition queues, {lost} readings lost")
+
+    async def subscribe(self) -> None:
+        """Subscribe to MQTT topics and process incoming messages.
+
+        Starts one worker per partition (`INGEST_WORKERS`) alongside the receive loop.
+        On shutdown the receive loop is stopped first and the workers finish the
+        readings already queued before they are cancelled, so the caller can then
+        flush the writer without losing messages taken from the broker.
+        """
+        async with asyncio.TaskGroup() as tg:
+            for worker_id in range(len(self.queues)):
+                tg.create_task(self.message_worker(worker_id))
+            tg.create_task(self.report_stats())
+            try:
+                await self.consume()
+            finally:
+                await self.drain()
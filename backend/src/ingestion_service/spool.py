@@ -0,0 +1,230 @@
+"""
+Durable local spool for readings that could not be written to the database.
+
+When a bulk insert fails, or the database is too slow to keep up, the batch writer
+appends the affected rows to an append-only spool made of segment files on local
+disk. A background replayer drains the spool in large batches once the database
+accepts writes again, so MQTT consumption never has to wait for the database.
+
+Only connection-level failures are spooled. Rows the database rejects outright are
+set aside in a dead-letter file next to the segments, which is never replayed.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from db.errors import is_transient
+from models.reading import ReadingType
+
+if TYPE_CHECKING:
+    from ingestion_service.batch_writer import BatchWriter, ReadingRow
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = ".spool"
+DEAD_LETTER_FILE = "dead-letter.jsonl"
+FSYNC_POLICIES = ("always", "rotate", "never")
+
+
+class Spool:
+    """Append-only, segmented on-disk queue of reading rows.
+
+    Rows are stored one JSON array per line. The active segment is rotated once it
+    exceeds `segment_bytes`; only closed segments are replayed.
+    """
+
+    def __init__(self, directory: str, *, segment_bytes: int, fsync: str = "always") -> None:
+        """Initialize the Spool.
+
+        Args:
+            directory (str): Directory holding the segment files (created if missing)
+            segment_bytes (int): Size after which the active segment is rotated
+            fsync (str): "always" to fsync every append, "rotate" to fsync when a
+                segment is closed, or "never" to leave flushing to the OS
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Invalid spool fsync policy: {fsync}")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.dead_letter_path = self.directory / DEAD_LETTER_FILE
+        self._file = None
+        self._lock = asyncio.Lock()
+        self.spooled = 0
+        self.replayed = 0
+        self.dead_lettered = 0
+
+        existing = self._segment_paths()
+        self._next_segment = int(existing[-1].stem) + 1 if existing else 0
+
+    def _segment_paths(self) -> list[Path]:
+        return sorted(self.directory.glob(f"*{SEGMENT_SUFFIX}"))
+
+    def _open_segment(self) -> None:
+        path = self.directory / f"{self._next_segment:012d}{SEGMENT_SUFFIX}"
+        self._next_segment += 1
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _close_segment(self) -> None:
+        if self._file is None:
+            return
+        self._file.flush()
+        if self.fsync != "never":
+            os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+
+    @staticmethod
+    def _encode(rows: list["ReadingRow"]) -> str:
+        return "".join(
+            json.dumps([device_id, reading_type.value, value, timestamp.isoformat()]) + "\n"
+            for device_id, reading_type, value, timestamp in rows
+        )
+
+    def _append(self, rows: list["ReadingRow"]) -> None:
+        if self._file is None:
+            self._open_segment()
+        self._file.write(self._encode(rows))
+        self._file.flush()
+        if self.fsync == "always":
+            os.fsync(self._file.fileno())
+        if self._file.tell() >= self.segment_bytes:
+            self._close_segment()
+
+    async def append(self, rows: list["ReadingRow"]) -> None:
+        """Durably append reading rows to the active segment.
+
+        Args:
+            rows (list[ReadingRow]): Column values for `readings` rows
+        """
+        if not rows:
+            return
+        async with self._lock:
+            await asyncio.to_thread(self._append, rows)
+            self.spooled += len(rows)
+        logger.warning(f"Spooled {len(rows)} readings to {self.directory}")
+
+    def _append_dead_letter(self, rows: list["ReadingRow"]) -> None:
+        with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+            f.write(self._encode(rows))
+            f.flush()
+            if self.fsync != "never":
+                os.fsync(f.fileno())
+
+    async def dead_letter(self, rows: list["ReadingRow"]) -> None:
+        """Append rows the database rejected to the dead-letter file.
+
+        The file uses the segment format, so it can be read with `read_segment`
+        once the rows have been inspected or fixed. It is never replayed.
+
+        Args:
+            rows (list[ReadingRow]): Column values of the rejected rows
+        """
+        if not rows:
+            return
+        async with self._lock:
+            await asyncio.to_thread(self._append_dead_letter, rows)
+            self.dead_lettered += len(rows)
+        logger.error(f"Dead-lettered {len(rows)} rejected readings to {self.dead_letter_path}")
+
+    async def seal(self) -> list[Path]:
+        """Close the active segment and return all segments ready for replay, oldest first."""
+        async with self._lock:
+            await asyncio.to_thread(self._close_segment)
+            return self._segment_paths()
+
+    @staticmethod
+    def read_segment(path: Path) -> list["ReadingRow"]:
+        """Read the rows stored in a segment, skipping a torn trailing line."""
+        rows = []
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                try:
+                    device_id, reading_type, value, timestamp = json.loads(line)
+                except (json.JSONDecodeError, ValueError):
+                    logger.warning(f"Skipping corrupt line {line_number} in spool segment {path.name}")
+                    continue
+                rows.append(
+                    (device_id, ReadingType(reading_type), value, datetime.fromisoformat(timestamp))
+                )
+        return rows
+
+    def close(self) -> None:
+        """Close the active segment. Call on shutdown."""
+        self._close_segment()
+
+    def stats(self) -> dict[str, int]:
+        """Return spool counters for monitoring."""
+        return {
+            "segments": len(self._segment_paths()),
+            "spooled": self.spooled,
+            "replayed": self.replayed,
+            "dead_lettered": self.dead_lettered,
+        }
+
+
+class SpoolReplayer:
+    """Background task that drains the spool into the database."""
+
+    def __init__(
+        self,
+        spool: Spool,
+        writer: "BatchWriter",
+        *,
+        batch_size: int,
+        interval: float,
+    ) -> None:
+        """Initialize the SpoolReplayer.
+
+        Args:
+            spool (Spool): Spool to drain
+            writer (BatchWriter): Writer used to insert replayed rows
+            batch_size (int): Rows per INSERT when replaying
+            interval (float): Seconds between replay attempts
+        """
+        self.spool = spool
+        self.writer = writer
+        self.batch_size = batch_size
+        self.interval = interval
+
+    async def replay_once(self) -> int:
+        """Replay every sealed segment, oldest first, stopping at the first outage.
+
+        A segment is deleted only after all of its rows have been committed or,
+        if the database rejects them, dead-lettered; a bad row therefore never
+        blocks the segments behind it.
+
+        Returns:
+            int: Number of rows replayed
+        """
+        replayed = 0
+        for path in await self.spool.seal():
+            rows = await asyncio.to_thread(Spool.read_segment, path)
+            rejected = 0
+            try:
+                for start in range(0, len(rows), self.batch_size):
+                    rejected += await self.writer.write_valid_rows(rows[start:start + self.batch_size])
+            except (SQLAlchemyError, OSError) as e:
+                if not is_transient(e):
+                    raise
+                logger.warning(f"Spool replay paused, database still unavailable: {e}")
+                break
+            path.unlink()
+            replayed += len(rows) - rejected
+            self.spool.replayed += len(rows) - rejected
+            logger.info(f"Replayed {len(rows) - rejected} spooled readings from {path.name}")
+        return replayed
+
+    async def run(self) -> None:
+        """Periodically replay the spool until cancelled."""
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.replay_once()
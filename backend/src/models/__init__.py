@@ -1,7 +1,9 @@
 from .user import User
 from .device import Device
 from .reading import Reading
+from .rollup import ReadingRollup
+from .device_latest import DeviceLatest
 from .token import RefreshToken
 
 # Make all models available at the package level
-__all__ = ["User", "Device", "Reading", "RefreshToken"]
+__all__ = ["User", "Device", "Reading", "ReadingRollup", "DeviceLatest", "RefreshToken"]
@@ -14,5 +14,7 @@ class Device(Base):
     humidity_offset = Column(Float, nullable=True, server_default='0.0')
 
     # Relationships
-    readings = relationship("Reading", back_populates="device")
+    # Readings grow without bound: never lazy load them, load a bounded subset
+    # explicitly (see CRUDDevice.get_with_latest_reading)
+    readings = relationship("Reading", back_populates="device", lazy="raise")
     owner = relationship("User", back_populates="devices")
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Enum
+from .base import Base
+from .reading import ReadingType
+
+
+class DeviceLatest(Base):
+    """Latest reading per device and reading type, upserted as readings are written.
+
+    `timestamp` and `value` are those of the newest reading; `last_seen` is when the
+    device last delivered a reading of this type, whatever its timestamp (see
+    `db.latest`).
+    """
+    __tablename__ = 'device_latest'
+
+    device_id = Column(Integer, ForeignKey('devices.id'), primary_key=True)
+    reading_type = Column(Enum(ReadingType), primary_key=True)
+    value = Column(Float, nullable=False)
+    timestamp = Column(DateTime(timezone=True), nullable=False)
+    last_seen = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Enum
+from .base import Base
+from .reading import ReadingType
+
+# Bucket widths in seconds: 1 minute, 15 minutes, 1 hour, 1 day
+ROLLUP_RESOLUTIONS = (60, 900, 3600, 86400)
+
+
+class ReadingRollup(Base):
+    """Pre-aggregated readings per device, reading type and time bucket.
+
+    Buckets start at UTC multiples of `resolution` seconds. Rows are maintained
+    incrementally as readings are inserted (see `db.rollups`).
+    """
+    __tablename__ = 'reading_rollups'
+
+    resolution = Column(Integer, primary_key=True)
+    device_id = Column(Integer, ForeignKey('devices.id'), primary_key=True)
+    reading_type = Column(Enum(ReadingType), primary_key=True)
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    min_value = Column(Float, nullable=False)
+    max_value = Column(Float, nullable=False)
+    sum_value = Column(Float, nullable=False)
+    count = Column(Integer, nullable=False)
+    first_timestamp = Column(DateTime(timezone=True), nullable=False)
+    first_value = Column(Float, nullable=False)
+    last_timestamp = Column(DateTime(timezone=True), nullable=False)
+    last_value = Column(Float, nullable=False)
+
+    @property
+    def avg_value(self) -> float:
+        return self.sum_value / self.count
@@ -13,4 +13,5 @@ class User(Base):
 
     # Relationships
     devices = relationship("Device", back_populates="owner")
-    refresh_tokens = relationship("RefreshToken", back_populates="user")
+    # Every login adds a token: query them through crud_refresh_token instead
+    refresh_tokens = relationship("RefreshToken", back_populates="user", lazy="raise")
@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Optional
 from pydantic import BaseModel, Field, validator
 
@@ -48,3 +49,21 @@ class DeviceOut(DeviceBase):
 
     class Config:
         from_attributes = True
+
+class ReadingSummary(BaseModel):
+    """Latest value and recent statistics of one reading type, with offsets applied."""
+    latest_value: Optional[float] = None
+    latest_timestamp: Optional[datetime] = None
+    min: Optional[float] = None
+    max: Optional[float] = None
+    avg: Optional[float] = None
+    count: int = 0
+
+class DeviceSummary(BaseModel):
+    """Dashboard summary of a device."""
+    id: int
+    device_id: str
+    name: Optional[str] = None
+    is_active: bool = True
+    temperature: ReadingSummary
+    humidity: ReadingSummary
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, model_validator, validator
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 import math
 from models.reading import ReadingType
 
@@ -38,3 +38,28 @@ class ReadingStatistics(BaseModel):
     max: float
     avg: float
     count: int
+
+class ReadingSeriesRequest(BaseModel):
+    """Schema for requesting downsampled series of several devices."""
+    device_ids: List[int] = Field(..., min_length=1, max_length=100)
+    reading_types: Optional[List[ReadingType]] = Field(None, description="Default: all types")
+    start_date: datetime
+    end_date: datetime
+    max_points: int = Field(500, ge=1, le=10000, description="Maximum points per series")
+
+    @model_validator(mode="after")
+    def validate_range(self):
+        if self.start_date >= self.end_date:
+            raise ValueError("start_date must be before end_date")
+        return self
+
+class ReadingSeries(BaseModel):
+    """Schema for one device and reading type series in columnar layout."""
+    device_id: int
+    reading_type: ReadingType
+    t: List[float] = Field(..., description="Epoch seconds")
+    v: List[float]
+
+class ReadingSeriesOut(BaseModel):
+    """Schema for a set of series."""
+    series: List[ReadingSeries]
@@ -0,0 +1,44 @@
+import pytest
+
+from src.api_service.main import create_application
+
+pytestmark = pytest.mark.asyncio
+
+
+async def get(app, path: str, origin: str) -> dict[bytes, bytes]:
+    """Send a GET straight through the ASGI app and return the response headers."""
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"testserver"), (b"origin", origin.encode())],
+        "client": ("127.0.0.1", 12345),
+        "server": ("testserver", 80),
+    }
+    await app(scope, receive, send)
+    start = next(message for message in messages if message["type"] == "http.response.start")
+    return dict(start["headers"])
+
+
+async def test_next_cursor_header_is_exposed_cross_origin():
+    app = create_application()
+    origin = "http://localhost:3000"
+
+    headers = await get(app, "/not-a-route", origin)
+
+    assert headers[b"access-control-allow-origin"] == origin.encode()
+    assert b"X-Next-Cursor" in headers[b"access-control-expose-headers"].split(b", ")
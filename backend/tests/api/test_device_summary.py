@@ -0,0 +1,84 @@
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api_service.api.api_v1.endpoints import devices as endpoints
+from src.api_service.crud.crud_device import device as crud_device
+from src.models.reading import Reading, ReadingType
+from src.schemas.device import DeviceCreate, DeviceSummary
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest_asyncio.fixture
+async def devices(db_session: AsyncSession, test_user):
+    now = datetime.utcnow()
+    sensor = await crud_device.create_with_owner(
+        db_session,
+        obj_in=DeviceCreate(device_id="summary", name="Summary", temperature_offset=1.0, humidity_offset=-5.0),
+        owner_id=test_user.id,
+    )
+    idle = await crud_device.create_with_owner(
+        db_session, obj_in=DeviceCreate(device_id="idle", name="Idle"), owner_id=test_user.id
+    )
+    other = await crud_device.create(db_session, obj_in=DeviceCreate(device_id="not-mine", name="Other"))
+
+    def reading(device, reading_type, value, age):
+        return Reading(device_id=device.id, reading_type=reading_type, value=value, timestamp=now - age)
+
+    db_session.add_all([
+        # Outside the 24h window
+        reading(sensor, ReadingType.TEMPERATURE, 100.0, timedelta(hours=30)),
+        reading(sensor, ReadingType.TEMPERATURE, 18.0, timedelta(hours=20)),
+        reading(sensor, ReadingType.TEMPERATURE, 22.0, timedelta(hours=10)),
+        reading(sensor, ReadingType.TEMPERATURE, 20.0, timedelta(minutes=5)),
+        reading(sensor, ReadingType.HUMIDITY, 55.0, timedelta(minutes=1)),
+        reading(idle, ReadingType.HUMIDITY, 40.0, timedelta(days=3)),
+        reading(other, ReadingType.TEMPERATURE, 30.0, timedelta(minutes=1)),
+    ])
+    await db_session.commit()
+    return sensor, idle, now
+
+
+class TestDeviceSummary:
+    async def test_summary(self, db_session, test_user, devices):
+        sensor, idle, now = devices
+
+        summaries = [
+            DeviceSummary.model_validate(summary)
+            for summary in await endpoints.read_device_summaries(db=db_session, current_user=test_user)
+        ]
+
+        assert [s.id for s in summaries] == [sensor.id, idle.id]
+        temperature = summaries[0].temperature
+        assert temperature.latest_value == 21.0
+        assert temperature.latest_timestamp.replace(tzinfo=None) == now - timedelta(minutes=5)
+        assert (temperature.min, temperature.max, temperature.avg, temperature.count) == (19.0, 23.0, 21.0, 3)
+        humidity = summaries[0].humidity
+        assert (humidity.latest_value, humidity.min, humidity.count) == (50.0, 50.0, 1)
+
+    async def test_device_without_recent_readings(self, db_session, test_user, devices):
+        _, idle, _ = devices
+
+        summaries = await crud_device.get_summaries(db_session, owner_id=test_user.id)
+
+        summary = next(s for s in summaries if s["id"] == idle.id)
+        assert summary["humidity"]["latest_value"] == 40.0
+        assert summary["humidity"]["count"] == 0 and summary["humidity"]["avg"] is None
+        assert summary["temperature"]["latest_value"] is None
+
+    async def test_single_query(self, db_session, test_engine, test_user, devices):
+        statements = []
+
+        def on_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(test_engine.sync_engine, "before_cursor_execute", on_execute)
+        try:
+            await crud_device.get_summaries(db_session, owner_id=test_user.id)
+        finally:
+            event.remove(test_engine.sync_engine, "before_cursor_execute", on_execute)
+
+        assert len(statements) == 1
@@ -0,0 +1,188 @@
+"""
+Calibration offsets through every reading endpoint.
+
+The endpoint functions are called directly with their dependencies resolved, and
+the results are validated against the response models as FastAPI would.
+"""
+
+import json
+import pytest
+import pytest_asyncio
+from datetime import UTC, datetime, timedelta
+from fastapi import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api_service.api.api_v1.endpoints import readings as endpoints
+from src.api_service.api.deps import DateRangeParams, PaginationParams
+from src.api_service.core.downsampling import DownsamplingAlgorithm
+from src.api_service.crud.crud_device import device as crud_device
+from src.api_service.crud.crud_reading import reading as crud_reading
+from src.models.reading import Reading, ReadingType
+from src.schemas.device import DeviceCreate
+from src.api_service.core.columnar import COLUMNAR_JSON
+from src.schemas.reading import ReadingOut, ReadingStatistics
+
+pytestmark = pytest.mark.asyncio
+
+START = datetime(2024, 3, 1)
+TEMPERATURES = [20.0, 22.0, 24.0]
+HUMIDITIES = [50.0, 60.0]
+
+
+@pytest_asyncio.fixture
+async def device(db_session: AsyncSession, test_user):
+    device = await crud_device.create_with_owner(
+        db_session,
+        obj_in=DeviceCreate(
+            device_id="calibrated", name="Calibrated", temperature_offset=1.5, humidity_offset=-2.0
+        ),
+        owner_id=test_user.id,
+    )
+    for i, value in enumerate(TEMPERATURES):
+        db_session.add(Reading(
+            device_id=device.id, reading_type=ReadingType.TEMPERATURE, value=value,
+            timestamp=START + timedelta(minutes=i),
+        ))
+    for i, value in enumerate(HUMIDITIES):
+        db_session.add(Reading(
+            device_id=device.id, reading_type=ReadingType.HUMIDITY, value=value,
+            timestamp=START + timedelta(minutes=i),
+        ))
+    await db_session.commit()
+    return device
+
+
+def date_range(start=START - timedelta(hours=1), end=START + timedelta(hours=1)) -> DateRangeParams:
+    return DateRangeParams(start_date=start, end_date=end)
+
+
+def read_defaults() -> dict:
+    return dict(
+        pagination=PaginationParams(skip=0, limit=100),
+        date_range=date_range(),
+        device_id=None,
+        reading_type=None,
+        max_points=500,
+        downsample=DownsamplingAlgorithm.AVERAGE,
+        cursor=None,
+        accept=None,
+    )
+
+
+async def read_readings(db, user, **params) -> list[ReadingOut]:
+    readings = await endpoints.read_readings(
+        response=Response(), db=db, current_user=user, **(read_defaults() | params)
+    )
+    return [ReadingOut.model_validate(reading) for reading in readings]
+
+
+class TestReadingEndpointOffsets:
+    async def test_device_readings(self, db_session, test_user, device):
+        readings = await read_readings(db_session, test_user, device_id=device.id)
+
+        assert sorted(r.value for r in readings if r.reading_type == ReadingType.TEMPERATURE) == [
+            21.5, 23.5, 25.5
+        ]
+        assert sorted(r.value for r in readings if r.reading_type == ReadingType.HUMIDITY) == [48.0, 58.0]
+
+    @pytest.mark.parametrize("downsample", list(DownsamplingAlgorithm))
+    async def test_reduced_device_readings(self, db_session, test_user, device, downsample):
+        readings = await read_readings(
+            db_session, test_user, device_id=device.id,
+            reading_type=ReadingType.TEMPERATURE, max_points=2, downsample=downsample,
+        )
+
+        values = [r.value for r in readings]
+        assert values and all(21.5 <= value <= 25.5 for value in values)
+        if downsample == DownsamplingAlgorithm.AVERAGE:
+            assert sum(values) / len(values) == pytest.approx(23.5, abs=1.0)
+
+    async def test_readings_by_type(self, db_session, test_user, device):
+        readings = await read_readings(db_session, test_user, reading_type=ReadingType.HUMIDITY)
+
+        assert sorted(r.value for r in readings) == [48.0, 58.0]
+
+    @pytest.mark.parametrize("use_rollups", [False, True])
+    async def test_statistics_offset_applied_once(
+        self, db_session, test_user, device, monkeypatch, use_rollups
+    ):
+        monkeypatch.setattr(endpoints.settings, "READINGS_USE_ROLLUPS", use_rollups)
+        if use_rollups:
+            from src.db.rollups import rebuild_rollups
+            await rebuild_rollups(db_session)
+
+        stats = await endpoints.get_reading_statistics(
+            db=db_session, current_user=test_user, date_range=date_range(),
+            device_id=device.id, reading_type=ReadingType.TEMPERATURE,
+        )
+
+        stats = ReadingStatistics.model_validate(stats)
+        assert (stats.min, stats.max, stats.avg, stats.count) == (21.5, 25.5, 23.5, 3)
+
+    async def test_latest_reading(self, db_session, test_user, device):
+        latest = await endpoints.get_latest_reading(
+            db=db_session, current_user=test_user, device_id=device.id, reading_type=ReadingType.HUMIDITY,
+        )
+
+        assert ReadingOut.model_validate(latest).value == 58.0
+
+    async def test_device_averages(self, db_session, test_user, device):
+        averages = await endpoints.get_device_averages(
+            db=db_session, current_user=test_user, date_range=date_range(),
+            reading_type=ReadingType.TEMPERATURE,
+        )
+
+        assert averages == [
+            {"device_id": "calibrated", "internal_id": device.id, "name": device.name, "average": 23.5}
+        ]
+
+    @pytest.mark.parametrize("use_rollups", [False, True])
+    async def test_device_averages_only_owned_devices(
+        self, db_session, test_user, device, monkeypatch, use_rollups
+    ):
+        other = await crud_device.create(
+            db_session, obj_in=DeviceCreate(device_id="unowned", name="Unowned")
+        )
+        db_session.add(Reading(
+            device_id=other.id, reading_type=ReadingType.TEMPERATURE, value=10.0, timestamp=START,
+        ))
+        await db_session.commit()
+        monkeypatch.setattr(endpoints.settings, "READINGS_USE_ROLLUPS", use_rollups)
+        if use_rollups:
+            from src.db.rollups import rebuild_rollups
+            await rebuild_rollups(db_session)
+
+        averages = await endpoints.get_device_averages(
+            db=db_session, current_user=test_user, date_range=date_range(),
+            reading_type=ReadingType.TEMPERATURE,
+        )
+        fleet = await crud_reading.get_device_averages(
+            db_session, reading_type=ReadingType.TEMPERATURE, use_rollups=use_rollups
+        )
+
+        assert [a["device_id"] for a in averages] == ["calibrated"]
+        assert averages[0]["average"] == pytest.approx(23.5)
+        assert [row.device_id for row in fleet] == ["calibrated", "unowned"]
+
+    async def test_stored_values_unchanged(self, db_session, test_user, device):
+        await read_readings(db_session, test_user, device_id=device.id)
+        await endpoints.get_latest_reading(
+            db=db_session, current_user=test_user, device_id=device.id, reading_type=None,
+        )
+        await db_session.commit()
+
+        stats = await crud_reading.get_statistics(
+            db_session, device_id=device.id, reading_type=ReadingType.TEMPERATURE
+        )
+        assert stats["avg"] == 23.5
+
+    async def test_columnar_response(self, db_session, test_user, device):
+        response = await endpoints.read_readings(
+            response=Response(), db=db_session, current_user=test_user,
+            **(read_defaults() | dict(device_id=device.id, accept=f"{COLUMNAR_JSON}, application/json;q=0.5")),
+        )
+
+        assert response.media_type == COLUMNAR_JSON
+        series = {s["reading_type"]: s for s in json.loads(response.body)["series"]}
+        assert series["temperature"]["v"] == [21.5, 23.5, 25.5]
+        assert series["humidity"]["t"] == [START.replace(tzinfo=UTC).timestamp() + 60 * i for i in range(2)]
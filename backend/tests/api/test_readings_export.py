@@ -0,0 +1,100 @@
+import csv
+import io
+import json
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api_service.api.api_v1.endpoints import readings as endpoints
+from src.api_service.api.deps import DateRangeParams
+from src.api_service.core.export import ExportFormat
+from src.api_service.crud.crud_device import device as crud_device
+from src.api_service.crud.crud_reading import reading as crud_reading
+from src.models.reading import Reading, ReadingType
+from src.schemas.device import DeviceCreate
+
+pytestmark = pytest.mark.asyncio
+
+START = datetime(2024, 5, 1)
+COUNT = 25
+
+
+@pytest_asyncio.fixture
+async def device(db_session: AsyncSession, test_user):
+    device = await crud_device.create_with_owner(
+        db_session,
+        obj_in=DeviceCreate(device_id="export", name="Export", temperature_offset=0.5),
+        owner_id=test_user.id,
+    )
+    db_session.add_all(
+        Reading(
+            device_id=device.id,
+            reading_type=ReadingType.TEMPERATURE if i % 5 else ReadingType.HUMIDITY,
+            value=float(i),
+            timestamp=START + timedelta(minutes=i),
+        )
+        for i in range(COUNT)
+    )
+    await db_session.commit()
+    return device
+
+
+async def export(db, session_factory, user, device_id, export_format, **params) -> list[str]:
+    response = await endpoints.export_readings(
+        db=db,
+        session_factory=session_factory,
+        current_user=user,
+        date_range=params.pop("date_range", DateRangeParams(start_date=None, end_date=None)),
+        device_id=device_id,
+        reading_type=params.pop("reading_type", None),
+        format=export_format,
+    )
+    return [chunk async for chunk in response.body_iterator]
+
+
+class TestReadingExport:
+    async def test_ndjson(self, db_session, session_factory, test_user, device):
+        chunks = await export(db_session, session_factory, test_user, device.id, ExportFormat.NDJSON)
+
+        rows = [json.loads(line) for line in "".join(chunks).splitlines()]
+        assert len(rows) == COUNT
+        assert [row["timestamp"] for row in rows] == sorted(row["timestamp"] for row in rows)
+        assert rows[0] == {
+            "timestamp": START.isoformat(), "reading_type": "humidity", "value": 0.0
+        }
+        assert rows[1]["value"] == 1.5  # Temperature offset applied
+
+    async def test_csv_with_filters(self, db_session, session_factory, test_user, device):
+        chunks = await export(
+            db_session, session_factory, test_user, device.id, ExportFormat.CSV,
+            reading_type=ReadingType.TEMPERATURE,
+            date_range=DateRangeParams(start_date=START, end_date=START + timedelta(minutes=9)),
+        )
+
+        rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+        assert [float(row["value"]) for row in rows] == [1.5, 2.5, 3.5, 4.5, 6.5, 7.5, 8.5, 9.5]
+        assert {row["reading_type"] for row in rows} == {"temperature"}
+
+    async def test_streams_in_batches(self, db_session, session_factory, test_user, device, monkeypatch):
+        monkeypatch.setattr(endpoints.settings, "READINGS_EXPORT_BATCH_SIZE", 10)
+
+        chunks = await export(db_session, session_factory, test_user, device.id, ExportFormat.NDJSON)
+
+        assert [chunk.count("\n") for chunk in chunks] == [10, 10, 5]
+
+    async def test_requires_ownership(self, db_session, session_factory, test_user):
+        other = await crud_device.create(db_session, obj_in=DeviceCreate(device_id="other", name="Other"))
+
+        with pytest.raises(HTTPException) as exc_info:
+            await export(db_session, session_factory, test_user, other.id, ExportFormat.CSV)
+        assert exc_info.value.status_code == 403
+
+    async def test_crud_batches_bounded(self, db_session, device):
+        batches = [
+            len(batch)
+            async for batch in crud_reading.stream_by_device(db_session, device_id=device.id, batch_size=7)
+        ]
+
+        assert batches == [7, 7, 7, 4]
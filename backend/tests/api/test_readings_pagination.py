@@ -0,0 +1,100 @@
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+from fastapi import HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api_service.api.api_v1.endpoints import readings as endpoints
+from src.api_service.api.deps import DateRangeParams, PaginationParams
+from src.api_service.core.downsampling import DownsamplingAlgorithm
+from src.api_service.crud.crud_device import device as crud_device
+from src.api_service.crud.crud_user import user as crud_user
+from src.models.reading import Reading, ReadingType
+from src.schemas.device import DeviceCreate
+
+pytestmark = pytest.mark.asyncio
+
+START = datetime(2024, 2, 1)
+
+
+@pytest_asyncio.fixture
+async def readings(db_session: AsyncSession):
+    devices = [
+        await crud_device.create(db_session, obj_in=DeviceCreate(device_id=f"page-{i}", name="Page"))
+        for i in range(3)
+    ]
+    # Several devices report at the same timestamps, so pages must break ties by id
+    db_session.add_all(
+        Reading(
+            device_id=device.id,
+            reading_type=ReadingType.TEMPERATURE,
+            value=float(i),
+            timestamp=START + timedelta(minutes=i),
+        )
+        for i in range(20)
+        for device in devices
+    )
+    await db_session.commit()
+    return devices
+
+
+async def page(db, user, limit, skip=0, cursor=None) -> tuple[list, Response]:
+    response = Response()
+    rows = await endpoints.read_readings(
+        response=response,
+        db=db,
+        current_user=user,
+        pagination=PaginationParams(skip=skip, limit=limit),
+        date_range=DateRangeParams(start_date=None, end_date=None),
+        device_id=None,
+        reading_type=ReadingType.TEMPERATURE,
+        max_points=500,
+        downsample=DownsamplingAlgorithm.AVERAGE,
+        cursor=cursor,
+        accept=None,
+    )
+    return rows, response
+
+
+class TestKeysetPagination:
+    async def test_cursor_pages_match_offset_pages(self, db_session, test_user, readings):
+        keyset, cursor = [], None
+        while True:
+            rows, response = await page(db_session, test_user, limit=7, cursor=cursor)
+            keyset.extend(rows)
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+
+        offset = []
+        for skip in range(0, 60, 7):
+            rows, _ = await page(db_session, test_user, limit=7, skip=skip)
+            offset.extend(rows)
+
+        assert len(keyset) == 60
+        assert [r.id for r in keyset] == [r.id for r in offset]
+        assert len({r.id for r in keyset}) == 60
+
+    async def test_last_partial_page_has_no_cursor(self, db_session, test_user, readings):
+        rows, response = await page(db_session, test_user, limit=100)
+
+        assert len(rows) == 60
+        assert "X-Next-Cursor" not in response.headers
+
+    async def test_invalid_cursor(self, db_session, test_user):
+        with pytest.raises(HTTPException) as exc_info:
+            await page(db_session, test_user, limit=10, cursor="not-a-cursor")
+        assert exc_info.value.status_code == 400
+
+    async def test_crud_base_keyset(self, db_session, test_user):
+        from src.schemas.user import UserCreate
+        for i in range(4):
+            await crud_user.create(
+                db_session, obj_in=UserCreate(email=f"page{i}@example.com", password="password123")
+            )
+
+        first = await crud_user.get_multi(db_session, limit=2, after_id=0)
+        second = await crud_user.get_multi(db_session, limit=2, after_id=first[-1].id)
+
+        ids = [u.id for u in first + second]
+        assert ids == sorted(ids) and len(set(ids)) == 4
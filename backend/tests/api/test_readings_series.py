@@ -0,0 +1,121 @@
+import pytest
+import pytest_asyncio
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api_service.api.api_v1.endpoints import readings as endpoints
+from src.api_service.crud.crud_device import device as crud_device
+from src.api_service.crud.crud_reading import reading as crud_reading
+from src.models.reading import Reading, ReadingType
+from src.schemas.device import DeviceCreate
+from src.schemas.reading import ReadingSeriesOut, ReadingSeriesRequest
+
+pytestmark = pytest.mark.asyncio
+
+START = datetime(2024, 6, 1)
+END = START + timedelta(hours=4)
+
+
+@pytest_asyncio.fixture
+async def devices(db_session: AsyncSession, test_user):
+    devices = []
+    for i in range(3):
+        device = await crud_device.create_with_owner(
+            db_session,
+            obj_in=DeviceCreate(device_id=f"series-{i}", name="Series", temperature_offset=float(i)),
+            owner_id=test_user.id,
+        )
+        db_session.add_all(
+            Reading(
+                device_id=device.id,
+                reading_type=reading_type,
+                value=20.0 + (minute % 13) + i,
+                timestamp=START + timedelta(minutes=minute),
+            )
+            for minute in range(240)
+            for reading_type in ReadingType
+        )
+        devices.append(device)
+    await db_session.commit()
+    return devices
+
+
+async def read_series(db, user, **params):
+    response = await endpoints.read_series(
+        series_in=ReadingSeriesRequest(**({"start_date": START, "end_date": END} | params)),
+        db=db,
+        current_user=user,
+        accept=None,
+    )
+    return response, ReadingSeriesOut.model_validate_json(response.body)
+
+
+class TestReadingSeries:
+    async def test_matches_per_device_series(self, db_session, test_user, devices):
+        _, out = await read_series(
+            db_session, test_user,
+            device_ids=[d.id for d in devices], reading_types=[ReadingType.TEMPERATURE], max_points=50,
+        )
+
+        assert [(s.device_id, s.reading_type) for s in out.series] == [
+            (d.id, ReadingType.TEMPERATURE) for d in devices
+        ]
+        for device, series in zip(devices, out.series):
+            expected = await crud_reading.get_by_device(
+                db_session, device_id=device.id, start_date=START, end_date=END,
+                reading_type=ReadingType.TEMPERATURE, threshold=50,
+            )
+            assert len(series.v) == len(expected) <= 50
+            assert series.v == pytest.approx([r.value for r in expected])
+            assert series.t == pytest.approx([r.timestamp.timestamp() for r in expected])
+
+    async def test_single_readings_query(self, db_session, test_engine, test_user, devices):
+        statements = []
+
+        def on_execute(conn, cursor, statement, *args):
+            if "FROM readings" in statement:
+                statements.append(statement)
+
+        event.listen(test_engine.sync_engine, "before_cursor_execute", on_execute)
+        try:
+            _, out = await read_series(db_session, test_user, device_ids=[d.id for d in devices])
+        finally:
+            event.remove(test_engine.sync_engine, "before_cursor_execute", on_execute)
+
+        assert len(out.series) == 6
+        assert len(statements) == 1
+
+    async def test_sparse_series_returns_readings(self, db_session, test_user, devices):
+        _, out = await read_series(
+            db_session, test_user, device_ids=[devices[1].id],
+            end_date=START + timedelta(minutes=5), max_points=500,
+        )
+
+        temperature = next(s for s in out.series if s.reading_type == ReadingType.TEMPERATURE)
+        assert temperature.v == [22.0, 23.0, 24.0, 25.0, 26.0]  # Offset 1.0 applied
+
+    async def test_msgpack(self, db_session, test_user, devices):
+        import msgpack
+
+        response = await endpoints.read_series(
+            series_in=ReadingSeriesRequest(device_ids=[devices[0].id], start_date=START, end_date=END),
+            db=db_session, current_user=test_user, accept="application/msgpack",
+        )
+
+        assert response.media_type == "application/msgpack"
+        assert len(msgpack.unpackb(response.body)["series"]) == 2
+
+    async def test_rejects_unowned_device(self, db_session, test_user, devices):
+        other = await crud_device.create(db_session, obj_in=DeviceCreate(device_id="not-mine", name="Other"))
+
+        with pytest.raises(HTTPException) as exc_info:
+            await read_series(db_session, test_user, device_ids=[devices[0].id, other.id])
+        assert exc_info.value.status_code == 403
+        assert str(other.id) in exc_info.value.detail
+
+    async def test_invalid_range(self):
+        with pytest.raises(ValidationError):
+            ReadingSeriesRequest(device_ids=[1], start_date=END, end_date=START)
@@ -77,6 +77,18 @@ async def db_session(test_engine) -> AsyncGenerator[AsyncSession, None]:
                 await session.execute(table.delete())
             await session.commit()
 
+@pytest_asyncio.fixture
+async def session_factory(test_engine, db_session):
+    """Session factory for services that open their own sessions.
+
+    Depends on db_session so tables are cleared after each test.
+    """
+    return sessionmaker(
+        test_engine,
+        class_=AsyncSession,
+        expire_on_commit=False
+    )
+
 # Test data fixtures
 @pytest.fixture
 def user_create_data():
@@ -0,0 +1,83 @@
+import json
+from datetime import UTC, datetime, timedelta
+
+import msgpack
+import pytest
+
+from src.api_service.core.columnar import (
+    ARROW_STREAM,
+    COLUMNAR_JSON,
+    MSGPACK,
+    columnar_response,
+    negotiate,
+    to_series,
+)
+from src.models.reading import Reading, ReadingType
+
+START = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+@pytest.fixture
+def rows():
+    return [
+        Reading(device_id=device_id, reading_type=reading_type, value=float(i), timestamp=START + timedelta(seconds=i))
+        for i, (device_id, reading_type) in enumerate([
+            (1, ReadingType.TEMPERATURE),
+            (1, ReadingType.HUMIDITY),
+            (1, ReadingType.TEMPERATURE),
+            (2, ReadingType.TEMPERATURE),
+        ])
+    ]
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, None),
+    ("application/json", None),
+    ("*/*", None),
+    (MSGPACK, MSGPACK),
+    ("application/x-msgpack", MSGPACK),
+    (f"application/json;q=0.5, {ARROW_STREAM}", ARROW_STREAM),
+    (f"{COLUMNAR_JSON}, application/json;q=0.9", COLUMNAR_JSON),
+    (f"application/json, {MSGPACK}", None),
+    (f"{MSGPACK};q=0, */*", None),
+    ("text/html", None),
+])
+def test_negotiate(accept, expected):
+    assert negotiate(accept) == expected
+
+
+def test_to_series_groups_in_row_order(rows):
+    series = to_series(rows)
+
+    assert [(s["device_id"], s["reading_type"]) for s in series] == [
+        (1, "temperature"), (1, "humidity"), (2, "temperature")
+    ]
+    assert series[0]["t"] == [START.timestamp(), START.timestamp() + 2]
+    assert series[0]["v"] == [0.0, 2.0]
+
+
+def test_naive_timestamps_are_utc():
+    reading = Reading(device_id=1, reading_type=ReadingType.HUMIDITY, value=1.0, timestamp=START.replace(tzinfo=None))
+    assert to_series([reading])[0]["t"] == [START.timestamp()]
+
+
+@pytest.mark.parametrize("media_type, decode", [
+    (COLUMNAR_JSON, json.loads),
+    (MSGPACK, msgpack.unpackb),
+])
+def test_json_and_msgpack_round_trip(rows, media_type, decode):
+    response = columnar_response(rows, media_type)
+
+    assert response.media_type == media_type
+    assert decode(response.body) == {"series": to_series(rows)}
+
+
+def test_arrow_round_trip(rows):
+    pa = pytest.importorskip("pyarrow")
+
+    response = columnar_response(rows, ARROW_STREAM)
+
+    table = pa.ipc.open_stream(response.body).read_all()
+    assert table.column("device_id").to_pylist() == [1, 1, 1, 2]
+    assert table.column("reading_type").to_pylist() == ["temperature", "temperature", "humidity", "temperature"]
+    assert table.column("v").to_pylist() == [0.0, 2.0, 1.0, 3.0]
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from src.api_service.core.downsampling import lttb, minmax
+
+
+def naive_lttb(x, y, n_out):
+    """Reference: straightforward per-point LTTB."""
+    n = len(x)
+    every = (n - 2) / (n_out - 2)
+    selected = [0]
+    a = 0
+    for i in range(n_out - 2):
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1
+        # The bucket after the last regular one is the final point
+        next_lo, next_hi = (hi, int((i + 2) * every) + 1) if i < n_out - 3 else (n - 1, n)
+        avg_x = sum(x[next_lo:next_hi]) / (next_hi - next_lo)
+        avg_y = sum(y[next_lo:next_hi]) / (next_hi - next_lo)
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return selected
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(7)
+    x = np.cumsum(rng.uniform(1, 60, 20_000))
+    y = 20 + np.sin(x / 3600) * 5 + rng.normal(0, 0.2, len(x))
+    y[12_345] = 80.0
+    y[4_321] = -40.0
+    return x, y
+
+
+class TestLttb:
+    def test_keeps_endpoints_and_spikes(self, series):
+        x, y = series
+        indices = lttb(x, y, 500)
+
+        assert len(indices) == 500
+        assert indices[0] == 0 and indices[-1] == len(x) - 1
+        assert np.all(np.diff(indices) > 0)
+        assert 12_345 in indices and 4_321 in indices
+
+    @pytest.mark.parametrize("n, n_out", [(1000, 50), (1003, 97), (10, 3)])
+    def test_matches_naive_reference(self, n, n_out):
+        rng = np.random.default_rng(n)
+        x = np.arange(n, dtype=np.float64)
+        y = rng.normal(0, 1, n)
+        assert list(lttb(x, y, n_out)) == naive_lttb(list(x), list(y), n_out)
+
+    def test_short_series_unchanged(self):
+        x = np.arange(5, dtype=np.float64)
+        assert list(lttb(x, x, 10)) == [0, 1, 2, 3, 4]
+
+
+class TestMinMax:
+    def test_keeps_global_extremes(self, series):
+        x, y = series
+        indices = minmax(x, y, 500)
+
+        assert len(indices) <= 500
+        assert np.all(np.diff(indices) > 0)
+        assert y[indices].max() == y.max()
+        assert y[indices].min() == y.min()
+
+    def test_every_bucket_extreme_selected(self):
+        x = np.arange(100, dtype=np.float64)
+        y = np.tile([1.0, 5.0, 3.0, 2.0], 25)
+        indices = minmax(x, y, 20)
+        buckets = (x[indices] // 10).astype(int)
+
+        for bucket in range(10):
+            values = y[indices][buckets == bucket]
+            assert values.min() == 1.0 and values.max() == 5.0
+
+    def test_constant_timestamps(self):
+        x = np.zeros(10)
+        y = np.arange(10, dtype=np.float64)
+        assert list(minmax(x, y, 4)) == [0, 9]
+
+    @pytest.mark.parametrize("n_out", [0, 1, 3])
+    def test_never_exceeds_n_out(self, series, n_out):
+        x, y = series
+        assert len(minmax(x, y, n_out)) <= n_out
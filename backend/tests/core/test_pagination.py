@@ -0,0 +1,22 @@
+from datetime import UTC, datetime
+
+import pytest
+
+from src.api_service.core.pagination import decode_cursor, encode_cursor
+
+
+@pytest.mark.parametrize("timestamp", [
+    datetime(2024, 1, 1, 12, 30, 5, 123456),
+    datetime(2024, 1, 1, 12, 30, 5, tzinfo=UTC),
+])
+def test_round_trip(timestamp):
+    token = encode_cursor(timestamp, 42)
+
+    assert "=" not in token
+    assert decode_cursor(token) == (timestamp, 42)
+
+
+@pytest.mark.parametrize("token", ["", "not-a-cursor", encode_cursor(datetime(2024, 1, 1), 1)[:-3]])
+def test_invalid(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
@@ -1,4 +1,5 @@
 import pytest
+from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 
@@ -153,6 +154,55 @@ class TestDeviceCRUD:
         latest_reading = max(device_with_reading.readings, key=lambda r: r.timestamp)
         assert latest_reading.value == 22.0
 
+    async def test_get_with_latest_reading_is_bounded(
+        self, db_session: AsyncSession, session_factory
+    ):
+        """Test that loading latest readings fetches the same rows however long the history."""
+        device = await crud_device.create(
+            db_session, obj_in=DeviceCreate(device_id="test-bounded", name="Bounded")
+        )
+        start = datetime.utcnow() - timedelta(days=1)
+
+        async def loaded_readings() -> list[Reading]:
+            async with session_factory() as session:
+                loaded = await crud_device.get_with_latest_reading(
+                    session, id=device.id, per_type=3
+                )
+                in_session = [
+                    o for o in session.identity_map.values()
+                    if o.__tablename__ == Reading.__tablename__
+                ]
+                assert len(in_session) == len(loaded.readings)
+                return loaded.readings
+
+        for batch in range(2):
+            db_session.add_all(
+                Reading(
+                    device_id=device.id,
+                    reading_type=reading_type,
+                    value=float(i),
+                    timestamp=start + timedelta(minutes=i),
+                )
+                for i in range(batch * 100, (batch + 1) * 100)
+                for reading_type in ReadingType
+            )
+            await db_session.commit()
+
+            readings = await loaded_readings()
+            assert len(readings) == 3 * len(ReadingType)
+            assert {r.value for r in readings} == {
+                float(i) for i in range((batch + 1) * 100 - 3, (batch + 1) * 100)
+            }
+
+    async def test_unbounded_relationships_do_not_lazy_load(self, db_session: AsyncSession):
+        """Test that the reading history is never loaded implicitly."""
+        device = await crud_device.create(
+            db_session, obj_in=DeviceCreate(device_id="test-no-lazy", name="No lazy")
+        )
+
+        with pytest.raises(InvalidRequestError):
+            device.readings
+
     async def test_bulk_update_status(self, db_session: AsyncSession):
         """Test bulk updating device status."""
         # Create multiple devices
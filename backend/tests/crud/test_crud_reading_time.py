@@ -6,7 +6,7 @@ from src.api_service.crud.crud_reading import reading as crud_reading
 from src.api_service.crud.crud_device import device as crud_device
 from src.schemas.reading import ReadingCreate
 from src.schemas.device import DeviceCreate
-from src.models.reading import ReadingType
+from src.models.reading import Reading, ReadingType
 
 pytestmark = pytest.mark.asyncio
 
@@ -145,22 +145,28 @@ class TestReadingTimeAndAveraging:
         assert len(temp_readings) == len(humid_readings)
 
     async def test_time_window_limits(self, db_session: AsyncSession):
-        """Test handling of time window limits."""
+        """Windows longer than 30 days are accepted and averaged in SQL."""
         device_in = DeviceCreate(device_id="test-window-limits", name="Test Device")
         device = await crud_device.create(db_session, obj_in=device_in)
 
-        # Try to query with a time window larger than 30 days
         start_date = datetime(2024, 1, 1)
         end_date = datetime(2024, 2, 1) + timedelta(days=1)  # 32 days
-
-        with pytest.raises(Exception) as exc_info:
-            await crud_reading.get_by_device(
-                db_session,
+        for i in range(32 * 24):
+            db_session.add(Reading(
                 device_id=device.id,
-                start_date=start_date,
-                end_date=end_date
-            )
-        assert "Time window too large" in str(exc_info.value)
+                reading_type=ReadingType.TEMPERATURE,
+                value=20.0,
+                timestamp=start_date + timedelta(hours=i),
+            ))
+        await db_session.commit()
+
+        readings = await crud_reading.get_by_device(
+            db_session,
+            device_id=device.id,
+            start_date=start_date,
+            end_date=end_date
+        )
+        assert 0 < len(readings) <= 500
 
     async def test_empty_time_periods(self, db_session: AsyncSession):
         """Test handling of time periods with no readings."""
@@ -217,3 +223,64 @@ class TestReadingTimeAndAveraging:
         )
 
         assert len(all_readings) == 10
+
+
+class TestRollupTierSelection:
+    async def create_hourly_year(self, db_session: AsyncSession, session_factory):
+        from src.ingestion_service.batch_writer import BatchWriter
+
+        device = await crud_device.create(
+            db_session, obj_in=DeviceCreate(device_id="test-tiers", name="Test Device")
+        )
+        writer = BatchWriter(session_factory, batch_size=10000, flush_interval=60.0, maintain_rollups=True)
+        base_time = datetime(2023, 1, 1)
+        await writer.write_rows([
+            (device.id, ReadingType.TEMPERATURE, 20.0 + (i % 24) * 0.5, base_time + timedelta(hours=i))
+            for i in range(365 * 24)
+        ])
+        return device, base_time
+
+    @pytest.mark.parametrize("span, points", [
+        (timedelta(days=365), 500),  # Hourly rollups averaged into 500 windows
+        (timedelta(days=10), 241),  # 15-minute rollups; one hourly reading per window
+        (timedelta(days=3), 73),  # One-minute rollups
+    ])
+    async def test_long_ranges_use_rollup_tiers(self, db_session: AsyncSession, session_factory, span, points):
+        """Long ranges yield up to `threshold` points, however coarse the tier."""
+        device, base_time = await self.create_hourly_year(db_session, session_factory)
+
+        readings = await crud_reading.get_by_device(
+            db_session,
+            device_id=device.id,
+            start_date=base_time,
+            end_date=base_time + span,
+            threshold=500,
+            use_rollups=True,
+        )
+
+        assert points - 1 <= len(readings) <= points
+        assert [r.timestamp for r in readings] == sorted(r.timestamp for r in readings)
+        if span == timedelta(days=365):
+            # Hourly values cycle through the day, averaging 25.75
+            assert sum(r.value for r in readings) / len(readings) == pytest.approx(25.75, abs=0.05)
+
+    async def test_short_ranges_read_raw_readings(self, db_session: AsyncSession, session_factory):
+        device, base_time = await self.create_hourly_year(db_session, session_factory)
+
+        readings = await crud_reading.get_by_device(
+            db_session,
+            device_id=device.id,
+            start_date=base_time,
+            end_date=base_time + timedelta(hours=5),
+            use_rollups=True,
+        )
+
+        assert [r.value for r in readings] == [20.0, 20.5, 21.0, 21.5, 22.0, 22.5]
+
+    async def test_open_ended_range_uses_rollups(self, db_session: AsyncSession, session_factory):
+        device, base_time = await self.create_hourly_year(db_session, session_factory)
+
+        readings = await crud_reading.get_by_device(
+            db_session, device_id=device.id, use_rollups=True,
+        )
+        assert 0 < len(readings) <= 500
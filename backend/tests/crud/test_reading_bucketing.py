@@ -0,0 +1,205 @@
+"""
+Equivalence tests for SQL-side time bucketing in get_by_device.
+
+`python_average` is the previous in-Python implementation, kept as the reference.
+The tests run on the SQLite test database and, when TEST_POSTGRES_URL points at a
+scratch PostgreSQL database, on PostgreSQL as well.
+"""
+
+import os
+import random
+import pytest
+import pytest_asyncio
+from datetime import UTC, datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.api_service.core.downsampling import DownsamplingAlgorithm
+from src.api_service.crud.crud_device import device as crud_device
+from src.api_service.crud.crud_reading import reading as crud_reading
+from src.models.base import Base
+from src.models.reading import Reading, ReadingType
+from src.schemas.device import DeviceCreate
+
+pytestmark = pytest.mark.asyncio
+
+START = datetime(2024, 1, 1, 12, 0)
+
+
+def python_average(readings: list[Reading], start_date, end_date, threshold: int) -> dict:
+    """Reference: average readings into `threshold` windows per type, as before."""
+    readings_by_type = {}
+    for reading in readings:
+        readings_by_type.setdefault(reading.reading_type, []).append(reading)
+
+    averaged = {}
+    sampling_window_size = (end_date - start_date).total_seconds() / threshold
+    for reading_type, type_readings in readings_by_type.items():
+        points = averaged.setdefault(reading_type, [])
+        current_window_start = start_date
+        while current_window_start < end_date:
+            current_window_end = min(
+                current_window_start + timedelta(seconds=sampling_window_size), end_date
+            )
+            window_readings = [
+                r for r in type_readings if current_window_start <= r.timestamp < current_window_end
+            ]
+            if window_readings:
+                points.append((
+                    current_window_start,
+                    current_window_end,
+                    sum(r.value for r in window_readings) / len(window_readings),
+                ))
+            current_window_start = current_window_end
+    return averaged
+
+
+@pytest_asyncio.fixture(params=["sqlite", "postgresql"])
+async def session(request, db_session: AsyncSession):
+    if request.param == "sqlite":
+        yield db_session
+        return
+
+    url = os.getenv("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL not set")
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as pg_session:
+        yield pg_session
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+async def seed(db: AsyncSession, count: int) -> tuple[int, list[Reading]]:
+    device = await crud_device.create(db, obj_in=DeviceCreate(device_id="bucketing", name="Bucketing"))
+    rng = random.Random(3)
+    readings = []
+    for i in range(count):
+        reading = Reading(
+            device_id=device.id,
+            reading_type=rng.choice([ReadingType.TEMPERATURE, ReadingType.HUMIDITY]),
+            value=round(rng.uniform(0, 100), 3),
+            # Irregular spacing, including readings exactly on window boundaries
+            timestamp=START + timedelta(seconds=37 * i + rng.choice([0, 0, 5, 11])),
+        )
+        readings.append(reading)
+        db.add(reading)
+    await db.commit()
+    return device.id, [
+        Reading(device_id=r.device_id, reading_type=r.reading_type, value=r.value, timestamp=r.timestamp)
+        for r in readings
+    ]
+
+
+def assert_equivalent(sql_points: list[Reading], reference: dict) -> None:
+    for reading_type, windows in reference.items():
+        points = [p for p in sql_points if p.reading_type == reading_type]
+        assert len(points) == len(windows)
+        for point, (window_start, window_end, value) in zip(points, windows):
+            assert point.value == pytest.approx(value)
+            timestamp = point.timestamp.astimezone(UTC).replace(tzinfo=None)
+            assert window_start <= timestamp < window_end + timedelta(microseconds=1)
+
+
+class TestSqlBucketing:
+    @pytest.mark.parametrize("threshold", [50, 200, 499])
+    async def test_matches_python_averaging(self, session: AsyncSession, threshold):
+        device_id, readings = await seed(session, 1200)
+        start, end = START - timedelta(minutes=3), START + timedelta(hours=11, minutes=7)
+
+        points = await crud_reading.get_by_device(
+            session, device_id=device_id, start_date=start, end_date=end, threshold=threshold
+        )
+
+        assert_equivalent(points, python_average(readings, start, end, threshold))
+        for reading_type in (ReadingType.TEMPERATURE, ReadingType.HUMIDITY):
+            assert len([p for p in points if p.reading_type == reading_type]) <= threshold
+
+    async def test_filtered_by_type(self, session: AsyncSession):
+        device_id, readings = await seed(session, 900)
+        start, end = START, START + timedelta(hours=10)
+
+        points = await crud_reading.get_by_device(
+            session, device_id=device_id, start_date=start, end_date=end,
+            reading_type=ReadingType.HUMIDITY, threshold=100,
+        )
+
+        humidity = [r for r in readings if r.reading_type == ReadingType.HUMIDITY and start <= r.timestamp <= end]
+        assert {p.reading_type for p in points} == {ReadingType.HUMIDITY}
+        assert_equivalent(points, python_average(humidity, start, end, 100))
+
+    async def test_under_threshold_returns_raw_readings(self, session: AsyncSession):
+        device_id, readings = await seed(session, 40)
+
+        points = await crud_reading.get_by_device(session, device_id=device_id, threshold=40)
+
+        assert [p.value for p in points] == [r.value for r in readings]
+
+
+class TestShapePreservingDownsampling:
+    @pytest.mark.parametrize("algorithm", [DownsamplingAlgorithm.LTTB, DownsamplingAlgorithm.MINMAX])
+    async def test_keeps_spike(self, session: AsyncSession, algorithm):
+        device_id, readings = await seed(session, 1200)
+        spike = Reading(
+            device_id=device_id,
+            reading_type=ReadingType.TEMPERATURE,
+            value=1000.0,
+            timestamp=START + timedelta(hours=5, seconds=1),
+        )
+        session.add(spike)
+        await session.commit()
+        readings.append(spike)
+
+        points = await crud_reading.get_by_device(
+            session, device_id=device_id, threshold=100, algorithm=algorithm
+        )
+
+        for reading_type in (ReadingType.TEMPERATURE, ReadingType.HUMIDITY):
+            assert len([p for p in points if p.reading_type == reading_type]) <= 100
+        assert max(p.value for p in points) == 1000.0
+        # Every point is an actual reading
+        actual = {(r.reading_type, r.timestamp.replace(tzinfo=None), r.value) for r in readings}
+        assert {
+            (p.reading_type, p.timestamp.astimezone(UTC).replace(tzinfo=None), p.value) for p in points
+        } <= actual
+
+    async def test_long_series_are_pre_reduced_in_sql(self, session: AsyncSession, monkeypatch):
+        """Only the min/max envelope of a long series is fetched, and it keeps the extremes."""
+        import numpy as np
+        from src.api_service.crud import crud_reading as crud_reading_module
+
+        device_id, readings = await seed(session, 1200)
+        fetched = []
+        fromiter = np.fromiter
+
+        def counting_fromiter(*args, **kwargs):
+            array = fromiter(*args, **kwargs)
+            fetched.append(len(array) // 2)
+            return array
+
+        monkeypatch.setattr(crud_reading_module.np, "fromiter", counting_fromiter)
+        points = await crud_reading.get_by_device(
+            session, device_id=device_id, threshold=10, algorithm=DownsamplingAlgorithm.MINMAX
+        )
+
+        # 10 points per type with a preselection ratio of 4: 20 buckets, 2 rows each
+        assert fetched and all(rows <= 2 * 21 for rows in fetched)
+        for reading_type in (ReadingType.TEMPERATURE, ReadingType.HUMIDITY):
+            values = [p.value for p in points if p.reading_type == reading_type]
+            expected = [r.value for r in readings if r.reading_type == reading_type]
+            assert len(values) <= 10
+            assert max(values) == max(expected) and min(values) == min(expected)
+
+    @pytest.mark.parametrize("algorithm", [DownsamplingAlgorithm.LTTB, DownsamplingAlgorithm.MINMAX])
+    async def test_threshold_of_one(self, session: AsyncSession, algorithm):
+        device_id, _ = await seed(session, 100)
+
+        points = await crud_reading.get_by_device(
+            session, device_id=device_id, threshold=1, algorithm=algorithm
+        )
+
+        assert len([p for p in points if p.reading_type == ReadingType.TEMPERATURE]) == 1
@@ -0,0 +1,112 @@
+"""
+Query plan tests for the readings indexes.
+
+The hot read queries are captured as issued by the CRUD layer and replayed with
+EXPLAIN QUERY PLAN. On SQLite the BRIN index on timestamp is a plain B-tree, but the
+index choice for each query is the same as on PostgreSQL.
+"""
+
+import pytest
+import pytest_asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api_service.crud.crud_device import device as crud_device
+from src.api_service.crud.crud_reading import reading as crud_reading
+from src.models.reading import ReadingType
+from src.schemas.device import DeviceCreate
+
+pytestmark = pytest.mark.asyncio
+
+DEVICE_INDEX = "ix_readings_device_type_timestamp"
+TIMESTAMP_INDEX = "ix_readings_timestamp_brin"
+KEYSET_INDEX = "ix_readings_type_timestamp_id"
+
+
+@asynccontextmanager
+async def captured_reading_queries(engine):
+    """Collect the SELECT statements against `readings` issued inside the block."""
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM readings" in statement:
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+
+
+async def query_plans(db: AsyncSession, statements) -> list[str]:
+    connection = await db.connection()
+    plans = []
+    for statement, parameters in statements:
+        result = await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        plans.append(" | ".join(row[-1] for row in result.all()))
+    return plans
+
+
+@pytest_asyncio.fixture
+async def device(db_session: AsyncSession):
+    return await crud_device.create(
+        db_session, obj_in=DeviceCreate(device_id="index-device", name="Index")
+    )
+
+
+class TestReadingIndexes:
+    async def test_get_by_device_uses_device_index(self, db_session, test_engine, device):
+        end = datetime(2024, 1, 2)
+        async with captured_reading_queries(test_engine) as statements:
+            await crud_reading.get_by_device(
+                db_session,
+                device_id=device.id,
+                reading_type=ReadingType.TEMPERATURE,
+                start_date=end - timedelta(days=1),
+                end_date=end,
+            )
+
+        plans = await query_plans(db_session, statements)
+        assert plans and all(DEVICE_INDEX in plan for plan in plans)
+
+    async def test_get_latest_by_device_uses_device_index(self, db_session, test_engine, device):
+        async with captured_reading_queries(test_engine) as statements:
+            await crud_reading.get_latest_by_device(
+                db_session, device_id=device.id, reading_type=ReadingType.HUMIDITY
+            )
+
+        plans = await query_plans(db_session, statements)
+        assert plans and all(DEVICE_INDEX in plan for plan in plans)
+
+    async def test_get_statistics_uses_device_index(self, db_session, test_engine, device):
+        async with captured_reading_queries(test_engine) as statements:
+            await crud_reading.get_statistics(
+                db_session,
+                device_id=device.id,
+                reading_type=ReadingType.TEMPERATURE,
+                start_date=datetime(2024, 1, 1),
+            )
+
+        plans = await query_plans(db_session, statements)
+        assert plans and all(DEVICE_INDEX in plan for plan in plans)
+
+    async def test_keyset_page_uses_keyset_index(self, db_session, test_engine, device):
+        async with captured_reading_queries(test_engine) as statements:
+            await crud_reading.get_readings_by_type(
+                db_session,
+                reading_type=ReadingType.TEMPERATURE,
+                after=(datetime(2024, 1, 1), 1000),
+            )
+
+        plans = await query_plans(db_session, statements)
+        assert plans and all(KEYSET_INDEX in plan and "TEMP B-TREE" not in plan for plan in plans)
+
+    async def test_get_inactive_devices_uses_timestamp_index(self, db_session, test_engine, device):
+        async with captured_reading_queries(test_engine) as statements:
+            await crud_device.get_inactive_devices(db_session, min_inactive_days=7)
+
+        plans = await query_plans(db_session, statements)
+        assert plans and all(TIMESTAMP_INDEX in plan for plan in plans)
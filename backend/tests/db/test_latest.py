@@ -0,0 +1,138 @@
+import pytest
+from datetime import UTC, datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api_service.crud.crud_device import device as crud_device
+from src.api_service.crud.crud_reading import reading as crud_reading
+from src.db.latest import apply_latest, latest_rows
+from src.ingestion_service.batch_writer import BatchWriter
+from src.models.device_latest import DeviceLatest
+from src.models.reading import ReadingType
+from src.schemas.device import DeviceCreate
+from src.schemas.reading import ReadingCreate
+
+START = datetime(2024, 1, 1, tzinfo=UTC)
+T, H = ReadingType.TEMPERATURE, ReadingType.HUMIDITY
+
+
+def test_latest_rows_keeps_newest_per_key():
+    seen_at = START + timedelta(days=1)
+    rows = [
+        (1, T, 20.0, START + timedelta(minutes=2)),
+        (1, T, 21.0, START + timedelta(minutes=5)),
+        (1, T, 99.0, START + timedelta(minutes=5)),  # Same timestamp: first one wins
+        (1, T, 19.0, START + timedelta(minutes=1)),
+        (1, H, 50.0, START),
+        (2, T, float("nan"), START),
+    ]
+
+    assert latest_rows(rows, seen_at) == [
+        {"device_id": 1, "reading_type": H, "value": 50.0, "timestamp": START, "last_seen": seen_at},
+        {"device_id": 1, "reading_type": T, "value": 21.0, "timestamp": START + timedelta(minutes=5), "last_seen": seen_at},
+    ]
+
+
+async def get_latest(db: AsyncSession, device_id: int, reading_type: ReadingType) -> DeviceLatest:
+    result = await db.execute(
+        select(DeviceLatest)
+        .where(DeviceLatest.device_id == device_id, DeviceLatest.reading_type == reading_type)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one()
+
+
+@pytest.mark.asyncio
+class TestDeviceLatest:
+    async def test_upsert_only_moves_forward(self, db_session: AsyncSession):
+        device = await crud_device.create(db_session, obj_in=DeviceCreate(device_id="latest", name="Latest"))
+
+        await apply_latest(db_session, [(device.id, T, 20.0, START + timedelta(hours=1))], seen_at=START)
+        await apply_latest(db_session, [(device.id, T, 25.0, START)], seen_at=START + timedelta(hours=2))
+        await db_session.commit()
+
+        latest = await get_latest(db_session, device.id, T)
+        assert latest.value == 20.0
+        assert latest.timestamp.replace(tzinfo=UTC) == START + timedelta(hours=1)
+        # A late reading still counts as a delivery
+        assert latest.last_seen.replace(tzinfo=UTC) == START + timedelta(hours=2)
+
+        await apply_latest(db_session, [(device.id, T, 22.0, START + timedelta(hours=3))], seen_at=START)
+        await db_session.commit()
+
+        latest = await get_latest(db_session, device.id, T)
+        assert latest.value == 22.0
+        assert latest.last_seen.replace(tzinfo=UTC) == START + timedelta(hours=2)
+
+    async def test_batch_writer_maintains_latest(self, db_session: AsyncSession, session_factory):
+        device = await crud_device.create(db_session, obj_in=DeviceCreate(device_id="writer", name="Writer"))
+        writer = BatchWriter(session_factory, batch_size=100, flush_interval=60.0, maintain_latest=True)
+
+        await writer.add_many([(device.id, T, float(i), START + timedelta(minutes=i)) for i in range(5)])
+        await writer.add_many([(device.id, H, 40.0, START)])
+        await writer.flush()
+
+        assert (await get_latest(db_session, device.id, T)).value == 4.0
+        assert (await get_latest(db_session, device.id, H)).value == 40.0
+
+    async def test_create_with_device_maintains_latest_on_request(self, db_session: AsyncSession):
+        device = await crud_device.create(db_session, obj_in=DeviceCreate(device_id="single", name="Single"))
+
+        async def create(value: float, **kwargs):
+            await crud_reading.create_with_device(
+                db_session,
+                obj_in=ReadingCreate(
+                    device_id=device.device_id, reading_type=T, value=value, timestamp=START + timedelta(minutes=value)
+                ),
+                device_id=device.id,
+                **kwargs,
+            )
+
+        await create(20.0)
+        assert (await db_session.execute(select(DeviceLatest))).first() is None
+
+        await create(21.0, maintain_latest=True)
+        assert (await get_latest(db_session, device.id, T)).value == 21.0
+
+    async def test_latest_lookups_match_readings(self, db_session: AsyncSession, session_factory, test_user):
+        device = await crud_device.create_with_owner(
+            db_session,
+            obj_in=DeviceCreate(device_id="lookup", name="Lookup", temperature_offset=0.5),
+            owner_id=test_user.id,
+        )
+        rows = [
+            (device.id, reading_type, float(i), datetime.utcnow() - timedelta(minutes=10 - i))
+            for i in range(10)
+            for reading_type in (T, H)
+        ]
+        writer = BatchWriter(session_factory, batch_size=100, flush_interval=60.0, maintain_latest=True)
+        await writer.add_many(rows)
+        await writer.flush()
+
+        for reading_type in (None, T, H):
+            scanned = await crud_reading.get_latest_by_device(
+                db_session, device_id=device.id, reading_type=reading_type
+            )
+            looked_up = await crud_reading.get_latest_by_device(
+                db_session, device_id=device.id, reading_type=reading_type, use_latest_table=True
+            )
+            assert (looked_up.value, looked_up.timestamp) == (scanned.value, scanned.timestamp)
+
+        scanned = await crud_device.get_summaries(db_session, owner_id=test_user.id)
+        looked_up = await crud_device.get_summaries(db_session, owner_id=test_user.id, use_latest_table=True)
+        assert looked_up == scanned
+
+    async def test_inactive_devices_from_last_seen(self, db_session: AsyncSession):
+        seen = await crud_device.create(db_session, obj_in=DeviceCreate(device_id="seen", name="Seen"))
+        silent = await crud_device.create(db_session, obj_in=DeviceCreate(device_id="silent", name="Silent"))
+        # An old reading delivered now: the device is alive even though its data is old
+        old = datetime.now(UTC) - timedelta(days=90)
+        await apply_latest(db_session, [(seen.id, T, 1.0, old)])
+        await apply_latest(db_session, [(silent.id, T, 1.0, old)], seen_at=old)
+        await db_session.commit()
+
+        inactive = await crud_device.get_inactive_devices(
+            db_session, min_inactive_days=7, use_latest_table=True
+        )
+
+        assert [d.id for d in inactive] == [silent.id]
@@ -0,0 +1,179 @@
+"""
+Tests for readings partition management.
+
+The PostgreSQL tests run against a scratch database when TEST_POSTGRES_URL is set
+and are skipped otherwise.
+"""
+
+import os
+import pytest
+import pytest_asyncio
+from datetime import UTC, datetime
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.api_service.crud.crud_device import device as crud_device
+from src.db.partitions import (
+    DEFAULT_PARTITION,
+    create_partition_statements,
+    drop_expired_partitions,
+    ensure_partitions,
+    list_partitions,
+    next_period,
+    parse_bounds,
+    partition_name,
+    period_start,
+)
+from src.models.base import Base
+from src.models.reading import Reading, ReadingType
+from src.schemas.device import DeviceCreate
+
+# The partitioned table as created by migration e4a7c1d93f26, without partitions
+PARTITIONED_READINGS = """
+    CREATE TABLE readings (
+        id serial,
+        device_id integer NOT NULL REFERENCES devices (id),
+        reading_type readingtype NOT NULL,
+        value double precision NOT NULL,
+        "timestamp" timestamp with time zone NOT NULL DEFAULT now(),
+        CONSTRAINT readings_pkey PRIMARY KEY (id, "timestamp")
+    ) PARTITION BY RANGE ("timestamp")
+"""
+
+
+class TestPeriods:
+    @pytest.mark.parametrize("interval, expected", [
+        ("day", datetime(2024, 2, 29, tzinfo=UTC)),
+        ("week", datetime(2024, 2, 26, tzinfo=UTC)),
+        ("month", datetime(2024, 2, 1, tzinfo=UTC)),
+    ])
+    def test_period_start(self, interval, expected):
+        assert period_start(datetime(2024, 2, 29, 17, 30, tzinfo=UTC), interval) == expected
+
+    def test_next_month_rolls_over_year(self):
+        assert next_period(datetime(2024, 12, 1, tzinfo=UTC), "month") == datetime(2025, 1, 1, tzinfo=UTC)
+
+    def test_invalid_interval(self):
+        with pytest.raises(ValueError):
+            period_start(datetime(2024, 1, 1), "year")
+
+    def test_partition_name(self):
+        assert partition_name(datetime(2024, 3, 1, tzinfo=UTC)) == "readings_p20240301"
+
+    def test_create_partition_statements(self):
+        start, end = datetime(2024, 3, 1, tzinfo=UTC), datetime(2024, 4, 1, tzinfo=UTC)
+
+        (create,) = create_partition_statements(
+            "readings_p20240301", start, end, move_from_default=False
+        )
+        assert create.startswith('CREATE TABLE IF NOT EXISTS "readings_p20240301" PARTITION OF readings')
+
+        statements = create_partition_statements(
+            "readings_p20240301", start, end, move_from_default=True
+        )
+        # The default partition is detached before the new partition is created and
+        # reattached only once its rows in the range have been moved out
+        assert statements[0] == f'ALTER TABLE readings DETACH PARTITION "{DEFAULT_PARTITION}"'
+        assert statements[1] == create
+        assert statements[2].startswith("INSERT INTO readings")
+        assert statements[3].startswith(f'DELETE FROM "{DEFAULT_PARTITION}"')
+        assert statements[-1] == f'ALTER TABLE readings ATTACH PARTITION "{DEFAULT_PARTITION}" DEFAULT'
+
+    def test_parse_bounds(self):
+        bounds = parse_bounds(
+            "FOR VALUES FROM ('2024-03-01 00:00:00+00') TO ('2024-04-01 00:00:00+00')"
+        )
+        assert bounds == (datetime(2024, 3, 1, tzinfo=UTC), datetime(2024, 4, 1, tzinfo=UTC))
+        assert parse_bounds("DEFAULT") is None
+
+
+@pytest.mark.asyncio
+class TestNonPostgres:
+    async def test_maintenance_is_noop_on_sqlite(self, db_session):
+        """SQLite uses an unpartitioned table, so maintenance does nothing."""
+        assert await ensure_partitions(db_session, interval="month", periods_ahead=3) == []
+        assert await drop_expired_partitions(db_session, interval="month", retention_periods=1) == []
+
+
+@pytest_asyncio.fixture
+async def pg_session():
+    url = os.getenv("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL not set")
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(text("DROP TABLE readings"))
+        await conn.execute(text(PARTITIONED_READINGS))
+    async with sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        yield session
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+async def add_readings(session: AsyncSession, *timestamps: datetime) -> None:
+    device = await crud_device.create(session, obj_in=DeviceCreate(device_id="partitioned", name="Partitioned"))
+    session.add_all(
+        Reading(device_id=device.id, reading_type=ReadingType.TEMPERATURE, value=20.0, timestamp=timestamp)
+        for timestamp in timestamps
+    )
+    await session.commit()
+
+
+async def count(session: AsyncSession, table: str) -> int:
+    return await session.scalar(text(f'SELECT count(*) FROM "{table}"'))
+
+
+@pytest.mark.asyncio
+class TestPostgres:
+    async def test_ensure_partitions_creates_periods_and_default(self, pg_session):
+        created = await ensure_partitions(
+            pg_session, interval="month", periods_ahead=1, now=datetime(2024, 3, 15, tzinfo=UTC)
+        )
+
+        assert created == ["readings_p20240301", "readings_p20240401"]
+        assert [p.name for p in await list_partitions(pg_session)] == created
+        assert await ensure_partitions(
+            pg_session, interval="month", periods_ahead=1, now=datetime(2024, 3, 15, tzinfo=UTC)
+        ) == []
+
+        # A reading outside every range partition lands in the default partition
+        await add_readings(pg_session, datetime(2023, 6, 10, tzinfo=UTC), datetime(2024, 3, 20, tzinfo=UTC))
+        assert await count(pg_session, DEFAULT_PARTITION) == 1
+        assert await count(pg_session, "readings_p20240301") == 1
+
+    async def test_new_partition_takes_its_rows_from_default(self, pg_session):
+        await ensure_partitions(pg_session, interval="month", periods_ahead=0, now=datetime(2024, 3, 15, tzinfo=UTC))
+        await add_readings(pg_session, datetime(2023, 6, 10, tzinfo=UTC), datetime(2023, 7, 10, tzinfo=UTC))
+
+        created = await ensure_partitions(
+            pg_session, interval="month", periods_ahead=0, now=datetime(2023, 6, 1, tzinfo=UTC)
+        )
+
+        assert created == ["readings_p20230601"]
+        assert await count(pg_session, "readings_p20230601") == 1
+        assert await count(pg_session, DEFAULT_PARTITION) == 1
+        assert await pg_session.scalar(select(func.count(Reading.id))) == 2
+
+    async def test_expired_partitions_are_detached_and_dropped(self, pg_session):
+        await ensure_partitions(pg_session, interval="month", periods_ahead=2, now=datetime(2024, 1, 15, tzinfo=UTC))
+        await add_readings(
+            pg_session,
+            datetime(2023, 6, 10, tzinfo=UTC),
+            datetime(2024, 1, 10, tzinfo=UTC),
+            datetime(2024, 3, 10, tzinfo=UTC),
+        )
+
+        dropped = await drop_expired_partitions(
+            pg_session, interval="month", retention_periods=1, now=datetime(2024, 3, 10, tzinfo=UTC)
+        )
+
+        assert dropped == ["readings_p20240101"]
+        assert [p.name for p in await list_partitions(pg_session)] == ["readings_p20240201", "readings_p20240301"]
+        assert await pg_session.scalar(text("SELECT to_regclass('readings_p20240101')")) is None
+        # The default partition is never dropped
+        assert await count(pg_session, DEFAULT_PARTITION) == 1
+        assert await pg_session.scalar(select(func.count(Reading.id))) == 2
@@ -0,0 +1,189 @@
+import pytest
+import random
+from datetime import UTC, datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api_service.crud.crud_device import device as crud_device
+from src.api_service.crud.crud_reading import reading as crud_reading
+from src.db.functions import not_nan
+from src.db.rollups import rebuild_rollups, rollup_segments
+from src.ingestion_service.batch_writer import BatchWriter
+from src.models.reading import Reading, ReadingType
+from src.models.rollup import ReadingRollup
+from src.schemas.device import DeviceCreate
+from src.schemas.reading import ReadingCreate
+
+START = datetime(2024, 1, 1)
+
+
+async def create_device(db: AsyncSession, device_id: str):
+    return await crud_device.create(db, obj_in=DeviceCreate(device_id=device_id, name=device_id))
+
+
+async def insert_random_readings(db: AsyncSession, device_ids: list[int], count: int) -> None:
+    rng = random.Random(7)
+    timestamps = set()
+    while len(timestamps) < count:
+        timestamps.add(START + timedelta(seconds=rng.randrange(3 * 86400)))
+    for timestamp in sorted(timestamps):
+        db.add(Reading(
+            device_id=rng.choice(device_ids),
+            reading_type=ReadingType.TEMPERATURE,
+            value=round(rng.uniform(-10, 40), 2),
+            timestamp=timestamp,
+        ))
+    await db.commit()
+
+
+@pytest.mark.parametrize("dialect, expected", [
+    (postgresql.dialect(), "(readings.value <> 'NaN'::float8)"),
+    (sqlite.dialect(), "(readings.value = readings.value)"),
+])
+def test_not_nan_compiles_per_dialect(dialect, expected):
+    """PostgreSQL considers NaN equal to itself, so `x = x` would not exclude it there."""
+    assert str(not_nan(Reading.value).compile(dialect=dialect)) == expected
+
+
+class TestRollupSegments:
+    def test_segments_tile_the_range(self):
+        """Segments are contiguous, aligned to their resolution and coarse in the middle."""
+        start = datetime(2024, 1, 1, 10, 7, 30, tzinfo=UTC)
+        end = datetime(2024, 1, 4, 3, 16, 5, tzinfo=UTC)
+
+        segments = rollup_segments(start, end)
+
+        assert segments[0][1] == start and segments[-1][2] == end
+        for (_, _, hi), (_, lo, _) in zip(segments, segments[1:]):
+            assert hi == lo
+        for resolution, lo, hi in segments:
+            if resolution is not None:
+                assert lo.timestamp() % resolution == 0 and hi.timestamp() % resolution == 0
+        assert (86400, datetime(2024, 1, 2, tzinfo=UTC), datetime(2024, 1, 4, tzinfo=UTC)) in segments
+        assert [s[0] for s in segments] == [None, 60, 900, 3600, 86400, 3600, 900, 60, None]
+
+    def test_open_ended_range_uses_daily_buckets(self):
+        assert rollup_segments(None, None) == [(86400, None, None)]
+
+
+@pytest.mark.asyncio
+class TestRollupMaintenance:
+    async def test_writer_maintains_rollups_once_per_reading(self, db_session: AsyncSession, session_factory):
+        """Re-written rows (e.g. spool replays) are not counted twice."""
+        device = await create_device(db_session, "rollup-writer")
+        writer = BatchWriter(session_factory, batch_size=100, flush_interval=60.0, maintain_rollups=True)
+        rows = [
+            (device.id, ReadingType.HUMIDITY, value, START + timedelta(seconds=20 * i))
+            for i, value in enumerate([50.0, 52.0, 49.0])
+        ]
+
+        await writer.write_rows(rows)
+        await writer.write_rows(rows)
+        # A late-arriving reading is folded into the existing bucket
+        await writer.write_rows([(device.id, ReadingType.HUMIDITY, 45.0, START + timedelta(seconds=10))])
+
+        rollups = await crud_reading.get_rollups(db_session, device_id=device.id, resolution=60)
+        assert len(rollups) == 1
+        minute = rollups[0]
+        assert (minute.min_value, minute.max_value, minute.sum_value, minute.count) == (45.0, 52.0, 196.0, 4)
+        assert (minute.first_value, minute.last_value) == (50.0, 49.0)
+
+    async def test_create_with_device_updates_rollups_on_request(self, db_session: AsyncSession):
+        device = await create_device(db_session, "rollup-api")
+
+        for minute, maintain_rollups in ((0, False), (1, True)):
+            await crud_reading.create_with_device(
+                db_session,
+                obj_in=ReadingCreate(
+                    device_id=device.device_id,
+                    reading_type=ReadingType.TEMPERATURE,
+                    value=21.0,
+                    timestamp=START + timedelta(minutes=minute),
+                ),
+                device_id=device.id,
+                maintain_rollups=maintain_rollups,
+            )
+
+        result = await db_session.execute(select(ReadingRollup).where(ReadingRollup.resolution == 60))
+        assert [rollup.count for rollup in result.scalars()] == [1]
+
+        result = await db_session.execute(select(ReadingRollup))
+        assert {rollup.resolution for rollup in result.scalars()} == {60, 900, 3600, 86400}
+
+
+@pytest.mark.asyncio
+class TestRollupQueries:
+    async def test_statistics_match_raw_readings(self, db_session: AsyncSession):
+        """Statistics served from rollups equal aggregating the raw readings."""
+        device = await create_device(db_session, "rollup-stats")
+        await insert_random_readings(db_session, [device.id], 2000)
+        await rebuild_rollups(db_session)
+
+        for start, end in [
+            (START + timedelta(hours=5, seconds=13), START + timedelta(days=2, minutes=47)),
+            (None, START + timedelta(days=1)),
+            (START + timedelta(minutes=1), None),
+        ]:
+            raw = await crud_reading.get_statistics(
+                db_session, device_id=device.id, reading_type=ReadingType.TEMPERATURE,
+                start_date=start, end_date=end,
+            )
+            rolled = await crud_reading.get_statistics(
+                db_session, device_id=device.id, reading_type=ReadingType.TEMPERATURE,
+                start_date=start, end_date=end, use_rollups=True,
+            )
+            assert rolled["count"] == raw["count"]
+            assert rolled["min"] == raw["min"] and rolled["max"] == raw["max"]
+            assert rolled["avg"] == pytest.approx(raw["avg"])
+
+    @pytest.mark.parametrize("span, expected", [
+        (timedelta(hours=8), None),  # Under 500 minutes: raw readings
+        (timedelta(hours=9), 60),  # 540 one-minute buckets; 15-minute ones would give 36
+        (timedelta(days=10), 900),
+        (timedelta(days=1000), 86400),
+    ])
+    async def test_select_resolution(self, span, expected):
+        assert crud_reading._select_resolution(span, 500) == expected
+
+    async def test_series_from_rollups_has_threshold_points(self, db_session: AsyncSession):
+        """A range just past the raw limit is averaged from one-minute rollups, not coarser tiers."""
+        device = await create_device(db_session, "rollup-series")
+        db_session.add_all(
+            Reading(
+                device_id=device.id,
+                reading_type=ReadingType.TEMPERATURE,
+                value=float(i),
+                timestamp=START + timedelta(minutes=i),
+            )
+            for i in range(9 * 60)
+        )
+        await db_session.commit()
+        await rebuild_rollups(db_session)
+
+        series = await crud_reading.get_by_device(
+            db_session, device_id=device.id, start_date=START,
+            end_date=START + timedelta(hours=9), threshold=500, use_rollups=True,
+        )
+
+        values = [reading.value for reading in series]
+        assert 490 <= len(values) <= 500
+        assert values == sorted(values)
+        assert values[0] <= 1.0 and values[-1] >= 538.0
+
+    async def test_device_averages_match_raw_readings(self, db_session: AsyncSession):
+        devices = [await create_device(db_session, f"rollup-avg-{i}") for i in range(3)]
+        await insert_random_readings(db_session, [d.id for d in devices], 1500)
+        await rebuild_rollups(db_session)
+        start, end = START + timedelta(hours=7, minutes=3), START + timedelta(days=2, hours=1)
+
+        raw = await crud_reading.get_device_averages(
+            db_session, reading_type=ReadingType.TEMPERATURE, start_date=start, end_date=end
+        )
+        rolled = await crud_reading.get_device_averages(
+            db_session, reading_type=ReadingType.TEMPERATURE, start_date=start, end_date=end,
+            use_rollups=True,
+        )
+
+        assert [r[:3] for r in rolled] == [r[:3] for r in raw]
+        assert [r.average for r in rolled] == pytest.approx([r.average for r in raw])
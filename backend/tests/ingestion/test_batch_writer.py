@@ -0,0 +1,58 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api_service.crud.crud_device import device as crud_device
+from src.ingestion_service.batch_writer import BatchWriter
+from src.models.reading import Reading, ReadingType
+from src.schemas.device import DeviceCreate
+
+pytestmark = pytest.mark.asyncio
+
+
+async def count_readings(db: AsyncSession) -> int:
+    result = await db.execute(select(func.count(Reading.id)))
+    return result.scalar_one()
+
+
+def make_row(device_id: int, i: int) -> tuple:
+    return (device_id, ReadingType.TEMPERATURE, 20.0 + i, datetime(2024, 1, 1) + timedelta(seconds=i))
+
+
+class TestBatchWriter:
+    async def test_flushes_when_batch_size_reached(self, db_session: AsyncSession, session_factory):
+        """Rows are buffered until the batch size is reached, then written together."""
+        device = await crud_device.create(
+            db_session, obj_in=DeviceCreate(device_id="batch-device", name="Batch")
+        )
+        writer = BatchWriter(session_factory, batch_size=3, flush_interval=60.0)
+
+        await writer.add(make_row(device.id, 0))
+        await writer.add(make_row(device.id, 1))
+        assert writer.pending == 2
+        assert await count_readings(db_session) == 0
+
+        await writer.add(make_row(device.id, 2))
+        assert writer.pending == 0
+        assert await count_readings(db_session) == 3
+
+    async def test_close_flushes_remaining_rows(self, db_session: AsyncSession, session_factory):
+        """Closing the writer flushes a partial batch."""
+        device = await crud_device.create(
+            db_session, obj_in=DeviceCreate(device_id="batch-close", name="Batch")
+        )
+        writer = BatchWriter(session_factory, batch_size=100, flush_interval=60.0)
+
+        for i in range(5):
+            await writer.add(make_row(device.id, i))
+        assert await count_readings(db_session) == 0
+
+        await writer.close()
+        assert writer.pending == 0
+        assert await count_readings(db_session) == 5
+
+    async def test_flush_empty_buffer(self, session_factory):
+        """Flushing with nothing buffered is a no-op."""
+        writer = BatchWriter(session_factory, batch_size=10, flush_interval=60.0)
+        assert await writer.flush() == 0
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+from src.ingestion_service.deadband import DeadbandFilter
+from src.models.reading import ReadingType
+
+START = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def make_reading(value: float, seconds: int = 0, device_id: str = "62ba71", reading_type=ReadingType.TEMPERATURE) -> tuple:
+    return (device_id, reading_type, value, START + timedelta(seconds=seconds))
+
+
+class TestDeadbandFilter:
+    def test_suppresses_values_within_threshold(self):
+        """Only changes larger than the threshold are persisted."""
+        deadband = DeadbandFilter(thresholds={"temperature": 0.2}, heartbeat=300.0)
+
+        readings = [make_reading(v, i) for i, v in enumerate([21.0, 21.1, 21.2, 21.3, 21.0])]
+        kept = deadband.filter(readings)
+
+        # 21.1 and 21.2 stay within 0.2 of 21.0; 21.3 does not; 21.0 is then 0.3 away
+        assert [r[2] for r in kept] == [21.0, 21.3, 21.0]
+        assert deadband.stats() == {"passed": 3, "suppressed": {"temperature": 2}}
+
+    def test_heartbeat_persists_unchanged_value(self):
+        """A flat value is still stored once per heartbeat interval."""
+        deadband = DeadbandFilter(thresholds={"temperature": 0.5}, heartbeat=60.0)
+
+        kept = deadband.filter([make_reading(21.0, s) for s in (0, 30, 59, 60, 90, 121)])
+
+        assert [r[3] for r in kept] == [
+            START, START + timedelta(seconds=60), START + timedelta(seconds=121)
+        ]
+
+    def test_unconfigured_reading_type_is_not_filtered(self):
+        """Reading types without a threshold pass through untouched."""
+        deadband = DeadbandFilter(thresholds={"temperature": 1.0}, heartbeat=300.0)
+
+        kept = deadband.filter([make_reading(50.0, i, reading_type=ReadingType.HUMIDITY) for i in range(3)])
+
+        assert len(kept) == 3
+
+    def test_device_override_and_independent_state(self):
+        """Per-device thresholds override the global one, and devices do not share state."""
+        deadband = DeadbandFilter(
+            thresholds={"temperature": 1.0},
+            device_thresholds={"aaaaaa": {"temperature": 0.1}},
+            heartbeat=300.0,
+        )
+
+        kept = deadband.filter([
+            make_reading(20.0, 0, device_id="aaaaaa"),
+            make_reading(20.0, 0, device_id="bbbbbb"),
+            make_reading(20.5, 1, device_id="aaaaaa"),
+            make_reading(20.5, 1, device_id="bbbbbb"),
+        ])
+
+        assert [(r[0], r[2]) for r in kept] == [
+            ("aaaaaa", 20.0), ("bbbbbb", 20.0), ("aaaaaa", 20.5)
+        ]
@@ -0,0 +1,32 @@
+import pytest
+from datetime import datetime
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api_service.crud.crud_device import device as crud_device
+from src.ingestion_service.batch_writer import BatchWriter
+from src.models.reading import Reading, ReadingType
+from src.schemas.device import DeviceCreate
+
+TIMESTAMP = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def make_row(device_id: int, value: float = 21.5, reading_type=ReadingType.TEMPERATURE) -> tuple:
+    return (device_id, reading_type, value, TIMESTAMP)
+
+
+@pytest.mark.asyncio
+class TestIdempotentWrites:
+    async def test_write_rows_ignores_existing_natural_keys(self, db_session: AsyncSession, session_factory):
+        """Re-inserting a batch, e.g. on spool replay, does not duplicate readings."""
+        device = await crud_device.create(
+            db_session, obj_in=DeviceCreate(device_id="dedup-device", name="Dedup")
+        )
+        writer = BatchWriter(session_factory, batch_size=100, flush_interval=60.0)
+        rows = [make_row(device.id), make_row(device.id, reading_type=ReadingType.HUMIDITY)]
+
+        await writer.write_rows(rows)
+        await writer.write_rows(rows)
+
+        result = await db_session.execute(select(func.count(Reading.id)))
+        assert result.scalar_one() == 2
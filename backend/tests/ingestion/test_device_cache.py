@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api_service.crud.crud_device import device as crud_device
+from src.ingestion_service.device_cache import DeviceCache
+from src.models.device import Device
+from src.schemas.device import DeviceCreate
+
+pytestmark = pytest.mark.asyncio
+
+
+class TestDeviceCache:
+    async def test_resolve_creates_device_then_hits(self, db_session: AsyncSession):
+        """A new device is created on first sight and served from cache afterwards."""
+        cache = DeviceCache(max_size=10)
+
+        pk = await cache.resolve(db_session, "62ba71")
+        assert cache.stats()["misses"] == 1
+
+        again = await cache.resolve(db_session, "62ba71")
+        assert again == pk
+        assert cache.stats()["hits"] == 1
+
+        result = await db_session.execute(
+            select(func.count(Device.id)).where(Device.device_id == "62ba71")
+        )
+        assert result.scalar_one() == 1
+
+    async def test_resolve_existing_device(self, db_session: AsyncSession):
+        """Resolving a device that already exists returns its primary key."""
+        device = await crud_device.create(
+            db_session, obj_in=DeviceCreate(device_id="existing", name="Existing")
+        )
+        cache = DeviceCache(max_size=10)
+
+        assert await cache.resolve(db_session, "existing") == device.id
+
+    async def test_warm_preloads_devices(self, db_session: AsyncSession):
+        """Warming loads existing devices so the first lookup is a hit."""
+        devices = [
+            await crud_device.create(
+                db_session, obj_in=DeviceCreate(device_id=f"warm-{i}", name="Warm")
+            )
+            for i in range(3)
+        ]
+        cache = DeviceCache(max_size=10)
+
+        assert await cache.warm(db_session) == 3
+        assert await cache.resolve(db_session, "warm-1") == devices[1].id
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 0
+
+    async def test_lru_eviction(self):
+        """The least recently used entry is evicted when the cache is full."""
+        cache = DeviceCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
@@ -0,0 +1,213 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from src.config import settings
+from src.ingestion_service.mqtt_client import MQTTClientService
+
+pytestmark = pytest.mark.asyncio
+
+
+def make_message(topic: str, payload: bytes, retain: bool = False) -> SimpleNamespace:
+    return SimpleNamespace(topic=SimpleNamespace(value=topic), payload=payload, retain=retain)
+
+
+class FakeClient:
+    """Stand-in for aiomqtt.Client that yields a fixed list of messages."""
+
+    def __init__(self, messages):
+        self._messages = messages
+
+    @property
+    async def messages(self):
+        for message in self._messages:
+            yield message
+
+
+def make_service(**overrides) -> MQTTClientService:
+    test_settings = settings.model_copy(update=overrides)
+    writer = MagicMock(pending=0, flush_latency=0.0)
+    device_cache = MagicMock()
+    return MQTTClientService(
+        settings=test_settings,
+        session_factory=MagicMock(),
+        writer=writer,
+        device_cache=device_cache,
+    )
+
+
+TOPIC = "harvco/harvco-temp-sensor-{}/sensor/temperature/state"
+
+
+class TestPartitionedQueues:
+    async def test_receive_loop_drops_when_queue_full(self):
+        """Messages beyond the partition capacity are dropped and counted."""
+        service = make_service(INGEST_QUEUE_SIZE=2, INGEST_WORKERS=1)
+        client = FakeClient([make_message(TOPIC.format("62ba71"), b"21.5") for _ in range(5)])
+
+        await service.receive_loop(client)
+
+        stats = service.stats()
+        assert stats["received"] == 5
+        assert stats["queue_depth"] == 2
+        assert stats["dropped"] == 3
+
+    async def test_receive_loop_ignores_non_reading_topics(self):
+        """Topics that are not sensor states never reach a partition."""
+        service = make_service()
+        client = FakeClient([make_message("harvco/harvco-temp-sensor-62ba71/_devicename", b"x")])
+
+        await service.receive_loop(client)
+
+        assert service.stats()["ignored"] == 1
+        assert service.stats()["queue_depth"] == 0
+
+    async def test_receive_loop_ignores_non_finite_values(self):
+        """NaN and infinite payloads are never queued."""
+        service = make_service()
+        client = FakeClient([
+            make_message(TOPIC.format("62ba71"), payload)
+            for payload in (b"nan", b"inf", b"-inf", b"21.5")
+        ])
+
+        await service.receive_loop(client)
+
+        assert service.stats()["ignored"] == 3
+        assert service.stats()["queue_depth"] == 1
+
+    async def test_receive_loop_skips_retained_messages(self):
+        """Retained messages replayed by the broker on subscribe are not ingested again."""
+        service = make_service()
+        client = FakeClient([
+            make_message(TOPIC.format("62ba71"), b"21.5", retain=True),
+            make_message(TOPIC.format("62ba71"), b"21.6"),
+        ])
+
+        await service.receive_loop(client)
+
+        assert service.stats()["retained_skipped"] == 1
+        assert service.stats()["queue_depth"] == 1
+
+    async def test_device_always_routed_to_same_partition(self):
+        """All messages of one device land on one partition, in arrival order."""
+        service = make_service(INGEST_WORKERS=4)
+        messages = [
+            make_message(TOPIC.format(device), str(i).encode())
+            for i in range(10)
+            for device in ("aaaaaa", "bbbbbb", "cccccc")
+        ]
+
+        await service.receive_loop(FakeClient(messages))
+
+        for device in ("aaaaaa", "bbbbbb", "cccccc"):
+            queue = service.queues[service.partition_for(device)]
+            values = [reading[2] for reading in list(queue._queue) if reading[0] == device]
+            assert values == list(range(10))
+
+    async def test_worker_preserves_per_device_order(self, db_session, session_factory):
+        """Readings of a device are written in the order they were received."""
+        from sqlalchemy import select
+        from src.ingestion_service.batch_writer import BatchWriter
+        from src.ingestion_service.device_cache import DeviceCache
+        from src.models.reading import Reading
+
+        service = make_service(INGEST_WORKERS=2)
+        service.session_factory = session_factory
+        service.writer = BatchWriter(session_factory, batch_size=7, flush_interval=60.0)
+        service.device_cache = DeviceCache(max_size=10)
+
+        messages = [
+            make_message(TOPIC.format(device), str(float(i)).encode())
+            for i in range(20)
+            for device in ("aaaaaa", "bbbbbb")
+        ]
+        await service.receive_loop(FakeClient(messages))
+
+        workers = [
+            asyncio.create_task(service.message_worker(i)) for i in range(len(service.queues))
+        ]
+        await asyncio.wait_for(asyncio.gather(*(q.join() for q in service.queues)), timeout=5)
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        await service.writer.close()
+
+        for device in ("aaaaaa", "bbbbbb"):
+            pk = service.device_cache.get(device)
+            result = await db_session.execute(
+                select(Reading.value).where(Reading.device_id == pk).order_by(Reading.id)
+            )
+            assert list(result.scalars()) == [float(i) for i in range(20)]
+
+    async def test_shutdown_drains_queued_readings(self, db_session, session_factory):
+        """Readings already queued when the service is stopped are still written."""
+        from sqlalchemy import func, select
+        from src.ingestion_service.batch_writer import BatchWriter
+        from src.ingestion_service.device_cache import DeviceCache
+        from src.ingestion_service.local_broker import LocalBroker
+        from src.models.reading import Reading
+
+        broker = LocalBroker()
+        service = make_service(INGEST_WORKERS=2, INGEST_WORKER_BATCH_SIZE=1)
+        service.client_factory = broker.client
+        service.session_factory = session_factory
+        service.writer = BatchWriter(session_factory, batch_size=1000, flush_interval=60.0)
+        service.device_cache = DeviceCache(max_size=10)
+
+        handle_messages = service.handle_messages
+
+        async def slow_handle_messages(*args):
+            await asyncio.sleep(0.001)
+            await handle_messages(*args)
+
+        service.handle_messages = slow_handle_messages
+        task = asyncio.create_task(service.subscribe())
+        while not broker.clients:
+            await asyncio.sleep(0)
+        for i in range(200):
+            broker.publish(TOPIC.format(("aaaaaa", "bbbbbb")[i % 2]), str(float(i)).encode())
+        while service.received < 200:
+            await asyncio.sleep(0)
+        assert service.stats()["queue_depth"] > 0
+
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await service.writer.close()
+
+        assert service.stats()["queue_depth"] == 0
+        count = await db_session.scalar(select(func.count()).select_from(Reading))
+        assert count == 200
+
+
+class TestSharedSubscription:
+    async def test_subscription_topic(self):
+        """A shared group wraps the topic filter in a $share subscription."""
+        assert make_service(MQTT_SHARED_GROUP=None).subscription_topic == settings.MQTT_TOPIC
+        assert (
+            make_service(MQTT_SHARED_GROUP="ingest").subscription_topic
+            == f"$share/ingest/{settings.MQTT_TOPIC}"
+        )
+
+    async def test_replicas_split_messages(self):
+        """Replicas in a shared group each receive a share of the messages exactly once."""
+        from src.ingestion_service.local_broker import LocalBroker
+
+        broker = LocalBroker()
+        replicas = [make_service(MQTT_SHARED_GROUP="ingest") for _ in range(3)]
+        for replica in replicas:
+            replica.client_factory = broker.client
+        tasks = [asyncio.create_task(replica.consume()) for replica in replicas]
+        while sum(len(g.members) for g in broker._groups.values()) < len(replicas):
+            await asyncio.sleep(0)
+
+        for i in range(300):
+            broker.publish(TOPIC.format(f"{i:06x}"), b"21.5")
+        while sum(replica.received for replica in replicas) < 300:
+            await asyncio.sleep(0)
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert [replica.received for replica in replicas] == [100, 100, 100]
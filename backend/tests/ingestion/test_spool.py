@@ -0,0 +1,154 @@
+import pytest
+from datetime import datetime, timedelta, UTC
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy import select, func
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api_service.crud.crud_device import device as crud_device
+from src.ingestion_service.batch_writer import BatchWriter
+from src.ingestion_service.spool import Spool, SpoolReplayer
+from src.models.reading import Reading, ReadingType
+from src.schemas.device import DeviceCreate
+
+pytestmark = pytest.mark.asyncio
+
+
+def make_rows(device_id: int, count: int) -> list[tuple]:
+    base_time = datetime(2024, 1, 1, tzinfo=UTC)
+    return [
+        (device_id, ReadingType.HUMIDITY, 50.0 + i, base_time + timedelta(seconds=i))
+        for i in range(count)
+    ]
+
+
+def failing_session_factory() -> MagicMock:
+    """Session factory whose sessions fail every statement, as if the database were down."""
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=OperationalError("INSERT", {}, Exception("down")))
+    session.rollback = AsyncMock()
+    factory = MagicMock()
+    factory.return_value.__aenter__ = AsyncMock(return_value=session)
+    return factory
+
+
+class TestSpool:
+    async def test_round_trip_and_rotation(self, tmp_path):
+        """Rows survive a round trip through segment files, which rotate by size."""
+        spool = Spool(str(tmp_path), segment_bytes=100, fsync="never")
+        rows = make_rows(1, 6)
+
+        await spool.append(rows[:3])
+        await spool.append(rows[3:])
+        segments = await spool.seal()
+
+        assert len(segments) >= 2
+        replayed = [row for path in segments for row in Spool.read_segment(path)]
+        assert replayed == rows
+
+    async def test_skips_torn_line(self, tmp_path):
+        """A partially written trailing line is skipped when reading a segment."""
+        spool = Spool(str(tmp_path), segment_bytes=1 << 20)
+        await spool.append(make_rows(1, 2))
+        (path,) = await spool.seal()
+        with open(path, "a") as f:
+            f.write('{"device_id": 1, "read')
+
+        assert len(Spool.read_segment(path)) == 2
+
+    async def test_numbering_continues_after_restart(self, tmp_path):
+        """A new spool over an existing directory never overwrites old segments."""
+        spool = Spool(str(tmp_path), segment_bytes=1 << 20)
+        await spool.append(make_rows(1, 1))
+        spool.close()
+
+        restarted = Spool(str(tmp_path), segment_bytes=1 << 20)
+        await restarted.append(make_rows(1, 1))
+
+        assert len(await restarted.seal()) == 2
+
+
+class TestSpoolReplay:
+    async def test_failed_flush_is_spooled_and_replayed(
+        self, db_session: AsyncSession, session_factory, tmp_path
+    ):
+        """Rows from a failed flush go to the spool and are replayed once the DB is back."""
+        device = await crud_device.create(
+            db_session, obj_in=DeviceCreate(device_id="spool-device", name="Spool")
+        )
+        spool = Spool(str(tmp_path), segment_bytes=1 << 20)
+        writer = BatchWriter(
+            failing_session_factory(), batch_size=100, flush_interval=60.0, spool=spool
+        )
+
+        await writer.add_many(make_rows(device.id, 5))
+        assert await writer.flush() == 0
+        assert spool.stats()["spooled"] == 5
+
+        writer.session_factory = session_factory
+        replayer = SpoolReplayer(spool, writer, batch_size=2, interval=60.0)
+        assert await replayer.replay_once() == 5
+
+        result = await db_session.execute(select(func.count(Reading.id)))
+        assert result.scalar_one() == 5
+        assert spool.stats()["segments"] == 0
+
+    async def test_replay_keeps_segment_while_db_down(self, tmp_path):
+        """A segment is kept if its rows cannot be committed."""
+        spool = Spool(str(tmp_path), segment_bytes=1 << 20)
+        await spool.append(make_rows(1, 3))
+        writer = BatchWriter(failing_session_factory(), batch_size=100, flush_interval=60.0)
+
+        replayer = SpoolReplayer(spool, writer, batch_size=10, interval=60.0)
+        assert await replayer.replay_once() == 0
+        assert spool.stats()["segments"] == 1
+
+
+class TestRejectedRows:
+    @staticmethod
+    def with_bad_row(rows: list[tuple], index: int) -> list[tuple]:
+        """Replace one row with one violating the NOT NULL constraint on value."""
+        device_id, reading_type, _, timestamp = rows[index]
+        return rows[:index] + [(device_id, reading_type, None, timestamp)] + rows[index + 1:]
+
+    async def test_rejected_rows_are_dead_lettered_not_spooled(
+        self, db_session: AsyncSession, session_factory, tmp_path
+    ):
+        """A batch the database rejects is bisected; only the bad row is set aside."""
+        device = await crud_device.create(
+            db_session, obj_in=DeviceCreate(device_id="reject-device", name="Reject")
+        )
+        spool = Spool(str(tmp_path), segment_bytes=1 << 20)
+        writer = BatchWriter(session_factory, batch_size=100, flush_interval=60.0, spool=spool)
+        rows = self.with_bad_row(make_rows(device.id, 10), 6)
+
+        await writer.add_many(rows)
+        assert await writer.flush() == 9
+
+        assert spool.stats()["spooled"] == 0
+        assert spool.stats()["dead_lettered"] == 1
+        assert Spool.read_segment(spool.dead_letter_path) == [rows[6]]
+        result = await db_session.execute(select(func.count(Reading.id)))
+        assert result.scalar_one() == 9
+
+    async def test_replay_skips_past_rejected_rows(
+        self, db_session: AsyncSession, session_factory, tmp_path
+    ):
+        """A segment with a bad row is replayed and removed instead of blocking the spool."""
+        device = await crud_device.create(
+            db_session, obj_in=DeviceCreate(device_id="replay-reject", name="Replay")
+        )
+        spool = Spool(str(tmp_path), segment_bytes=1 << 20)
+        rows = make_rows(device.id, 8)
+        await spool.append(self.with_bad_row(rows[:4], 0))
+        await spool.seal()
+        await spool.append(rows[4:])
+
+        writer = BatchWriter(session_factory, batch_size=100, flush_interval=60.0, spool=spool)
+        replayer = SpoolReplayer(spool, writer, batch_size=10, interval=60.0)
+        assert await replayer.replay_once() == 7
+
+        assert spool.stats()["segments"] == 0
+        assert spool.stats()["dead_lettered"] == 1
+        result = await db_session.execute(select(func.count(Reading.id)))
+        assert result.scalar_one() == 7